@@ -0,0 +1,144 @@
+"""Converted pages, saved to be reused by the next conversions of the same document.
+
+Each page is saved with a key that fingerprints everything its conversion depends on: the page
+nodes and the nodes they reference (symbols, styles, prototype destinations...), including the
+images they use, the options that change the output, the salt and the converter code. So only
+the pages that changed since the last conversion have to be converted again.
+
+The page data is saved as written to the document, next to a JSON file with everything else
+needed to merge the page in the document (see convert.PageResult.to_json)"""
+import dataclasses
+import functools
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from .config import config
+from .selection import required_nodes
+from pathlib import Path
+from sketchformat.serialize import serialize
+from typing import TYPE_CHECKING, IO, Any, Callable, Dict, Optional, Sequence
+
+if TYPE_CHECKING:
+    from .convert import PageResult
+
+# Options that do not change the converted pages
+IGNORED_OPTIONS = {"compact_nodes", "pages", "shard", "jobs", "cache_dir"}
+
+
+class PageCache:
+    def __init__(self, directory: str, id_map: Dict[Sequence[int], dict]):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self._id_map = id_map
+        self._node_digests: Dict[Sequence[int], bytes] = {}
+
+        options = {
+            f.name: getattr(config, f.name)
+            for f in dataclasses.fields(config)
+            if f.name not in IGNORED_OPTIONS
+        }
+        self._fingerprint = _code_fingerprint() + repr(sorted(options.items())).encode()
+
+    def key(self, fig_page: dict) -> str:
+        """The fingerprint of a page. Must be called before converting any page, as converted
+        pages are released"""
+        digest = hashlib.sha256(self._fingerprint)
+        for guid in sorted(required_nodes([fig_page], self._id_map), key=tuple):
+            digest.update(self._node_digest(self._id_map[guid]))
+        return digest.hexdigest()
+
+    def contains(self, key: str) -> bool:
+        # Written last
+        return os.path.exists(self._path(key, "json"))
+
+    def load(self, key: str) -> Optional["PageResult"]:
+        from .convert import PageResult
+
+        try:
+            with open(self._path(key, "json"), "rb") as f:
+                obj = json.load(f)
+            with open(self._path(key, "page"), "rb") as f:
+                return PageResult.from_json(obj, f.read())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            # Written by an incompatible version, or corrupted. It will be replaced
+            logging.debug(f"Could not load cached page {key}: {e}")
+            return None
+
+    def store(self, key: str, result: "PageResult") -> None:
+        self._write(key, "page", lambda f: f.write(result.data))
+        self._write(key, "json", lambda f: serialize(result.to_json(), f))
+
+    def _write(self, key: str, extension: str, write: Callable[[IO[bytes]], Any]) -> None:
+        # Write to a temporary file first, so concurrent conversions never see partial files
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp_path, self._path(key, extension))
+        except:
+            os.unlink(tmp_path)
+            raise
+
+    def _path(self, key: str, extension: str) -> str:
+        return os.path.join(self.directory, f"{key}.{extension}")
+
+    def _node_digest(self, node: dict) -> bytes:
+        # Symbols and styles are used by many pages, only digest them once
+        digest = self._node_digests.get(node["guid"])
+        if digest is None:
+            node_digest = hashlib.sha256()
+            for key in sorted(node.keys()):
+                node_digest.update(key.encode())
+                if key == "children":
+                    # Children are nodes of their own, only their order matters here
+                    _update_digest(node_digest, [child["guid"] for child in node[key]])
+                else:
+                    _update_digest(node_digest, node[key])
+            digest = self._node_digests[node["guid"]] = node_digest.digest()
+
+        return digest
+
+
+def _update_digest(digest: Any, value: Any) -> None:
+    """Add a property value to a digest. Unlike its repr, the digest covers every element of
+    large arrays (NumPy abbreviates them)"""
+    if isinstance(value, dict):
+        digest.update(b"{")
+        for key in sorted(value.keys()):
+            digest.update(repr(key).encode())
+            _update_digest(digest, value[key])
+        digest.update(b"}")
+    elif isinstance(value, (list, tuple)):
+        digest.update(b"[")
+        for item in value:
+            _update_digest(digest, item)
+        digest.update(b"]")
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        data = bytes(value)
+        digest.update(b"b%d:" % len(data))
+        digest.update(data)
+    elif hasattr(value, "tobytes"):
+        # NumPy arrays
+        data = value.tobytes()
+        digest.update(f"a{value.dtype}{value.shape}{len(data)}:".encode())
+        digest.update(data)
+    else:
+        digest.update(repr(value).encode())
+        digest.update(b",")
+
+
+@functools.lru_cache(maxsize=None)
+def _code_fingerprint() -> bytes:
+    """Digest of the converter code, so that updating it invalidates the cached pages"""
+    root = Path(__file__).parent.parent
+    digest = hashlib.sha256()
+    for package in ["converter", "figformat", "sketchformat"]:
+        for path in sorted((root / package).rglob("*.py")):
+            digest.update(path.relative_to(root).as_posix().encode())
+            digest.update(path.read_bytes())
+
+    return digest.digest()
@@ -1,10 +1,25 @@
 import random
 from dataclasses import dataclass
+from typing import List, Optional, Tuple
 
 
 @dataclass
 class Config:
     can_detach: bool = True
+    subset_fonts: bool = False
+    force_convert_images: bool = False
+    # Link layers with identical styles to shared layer styles
+    shared_styles: bool = False
+    # Store the fig nodes in compact objects instead of dicts, using less memory
+    compact_nodes: bool = False
+    # Names, guids or indexes of the pages to convert. All pages if not set
+    pages: Optional[List[str]] = None
+    # Only convert one in every count pages, starting at index (starting at 1): (index, count)
+    shard: Optional[Tuple[int, int]] = None
+    # Number of processes converting pages
+    jobs: int = 1
+    # Where to save the converted pages, to reuse them when converting the document again
+    cache_dir: Optional[str] = None
     salt: bytes = random.randbytes(16)
 
 
@@ -1,33 +1,103 @@
 import logging
-from . import component, page, font
-from sketchformat.document import Swatch
-from typing import Sequence, Tuple, Optional, Dict, IO, List
+from . import component, page, font, selection
+from .profiling import profiler
+from dataclasses import dataclass
+from sketchformat.document import SharedStyle, Swatch
+from sketchformat.layer_group import Page, SymbolMaster
+from sketchformat.serialize.decode import decode
+from typing import Sequence, Tuple, Optional, Dict, IO, List, Set, cast
 
 
 def find_symbols(node: dict) -> List[Sequence[int]]:
-    if node["type"] == "SYMBOL":
-        return [node["guid"]]
-
     found = []
-    for child in node.get("children", []):
-        found += find_symbols(child)
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node["type"] == "SYMBOL":
+            found.append(node["guid"])
+        else:
+            # Reversed, so children are visited in order
+            stack.extend(reversed(node.get("children", [])))
 
     return found
 
 
+@dataclass
+class PageState:
+    """Document-wide data produced while converting a page, to be merged in the document"""
+
+    symbols: List[SymbolMaster]
+    swatches: List[Tuple[Sequence[int], Swatch]]
+    # Font descriptor -> (font name, whether the font file was found)
+    fonts: Dict[Tuple[str, str], Tuple[str, bool]]
+    codepoints: Dict[Tuple[str, str], Set[int]]
+    shared_styles: List[SharedStyle]
+    shared_text_styles: List[SharedStyle]
+
+    def to_json(self) -> dict:
+        """The state as JSON types, with the Sketch objects written by the serializers"""
+        return {
+            "symbols": self.symbols,
+            "swatches": [[cid, swatch] for cid, swatch in self.swatches],
+            "fonts": [[*descriptor, *font] for descriptor, font in self.fonts.items()],
+            "codepoints": [
+                [*descriptor, sorted(codepoints)]
+                for descriptor, codepoints in self.codepoints.items()
+            ],
+            "shared_styles": self.shared_styles,
+            "shared_text_styles": self.shared_text_styles,
+        }
+
+    @staticmethod
+    def from_json(obj: dict) -> "PageState":
+        return PageState(
+            symbols=[decode(SymbolMaster, symbol) for symbol in obj["symbols"]],
+            swatches=[(tuple(cid), decode(Swatch, swatch)) for cid, swatch in obj["swatches"]],
+            fonts={(family, style): (name, found) for family, style, name, found in obj["fonts"]},
+            codepoints={
+                (family, style): set(codepoints) for family, style, codepoints in obj["codepoints"]
+            },
+            shared_styles=[decode(SharedStyle, s) for s in obj["shared_styles"]],
+            shared_text_styles=[decode(SharedStyle, s) for s in obj["shared_text_styles"]],
+        )
+
+
 class Context:
-    def init(self, components_page: Optional[dict], id_map: Dict[Sequence[int], dict]) -> None:
+    def init(
+        self,
+        components_page: Optional[dict],
+        id_map: Dict[Sequence[int], dict],
+        skipped_pages: List[dict] = [],
+    ) -> None:
         self._sketch_components: Dict[Sequence[int], Swatch] = {}
-        self.symbols_page = None
+        self.symbols_page: Optional[Page] = None
         self._node_by_id = id_map
-        self._used_fonts: Dict[Tuple[str, str], Tuple[IO[bytes], str]] = {}
-        self._component_symbols = (
-            {s: False for s in find_symbols(components_page)} if components_page else {}
-        )
+        # Nodes that release_page must keep. No node is released until find_shared_nodes
+        self._shared_nodes: Optional[Set[Sequence[int]]] = None
+        self._used_fonts: Dict[Tuple[str, str], Tuple[Optional[IO[bytes]], str]] = {}
+        # Characters rendered with each font, in the document and in the page being converted
+        self._font_codepoints: Dict[Tuple[str, str], Set[int]] = {}
+        self._page_codepoints: Dict[Tuple[str, str], Set[int]] = {}
+        self._shared_styles: Dict[str, SharedStyle] = {}
+        self._shared_text_styles: Dict[str, SharedStyle] = {}
+        # Symbols that are not converted as part of a page, and are only converted if used
+        self._unconverted_symbols = {
+            s: False
+            for fig_page in [components_page, *skipped_pages]
+            if fig_page
+            for s in find_symbols(fig_page)
+        }
+        self._component_symbols = dict(self._unconverted_symbols)
+
+        # Symbols and swatches of the pages merged so far
+        self._merged_symbols: Dict[str, SymbolMaster] = {}
+        self._merged_components: Dict[Sequence[int], Swatch] = {}
+        self._merged_shared_styles: Dict[str, SharedStyle] = {}
+        self._merged_shared_text_styles: Dict[str, SharedStyle] = {}
 
         # Where to position symbols of the specified width
         # width -> (x, y)
-        self._symbol_position = {0: [0, 0]}
+        self._symbol_position: Dict[float, List[float]] = {0: [0, 0]}
 
     def component(self, cid: Sequence[int]) -> Tuple[dict, Optional[Swatch]]:
         fig_component = self.fig_node(cid)
@@ -44,7 +114,19 @@ class Context:
     def sketch_components(self) -> List[Swatch]:
         return list(self._sketch_components.values())
 
-    def add_symbol(self, sketch_symbol):
+    def add_shared_style(self, shared_style: SharedStyle) -> None:
+        self._shared_styles.setdefault(shared_style.do_objectID, shared_style)
+
+    def shared_styles(self) -> List[SharedStyle]:
+        return list(self._shared_styles.values())
+
+    def add_shared_text_style(self, shared_style: SharedStyle) -> None:
+        self._shared_text_styles.setdefault(shared_style.do_objectID, shared_style)
+
+    def shared_text_styles(self) -> List[SharedStyle]:
+        return list(self._shared_text_styles.values())
+
+    def add_symbol(self, sketch_symbol: SymbolMaster) -> None:
         if not self.symbols_page:
             self.symbols_page = page.symbols_page()
 
@@ -54,14 +136,44 @@ class Context:
     def fig_node(self, fid: Sequence[int]) -> dict:
         return self._node_by_id[fid]
 
-    def record_font(self, fig_font_name):
+    def find_shared_nodes(self, fig_pages: List[dict]) -> None:
+        """Find the nodes that other pages use, so they are kept by release_page"""
+        self._shared_nodes = selection.shared_nodes(fig_pages, self._node_by_id)
+
+    def release_page(self, fig_page: dict) -> None:
+        """Forget the nodes of a converted page, except the ones other pages still need.
+
+        The page subtree is unlinked too, so the released nodes can be freed right away"""
+        shared = self._shared_nodes
+        page_children, fig_page["children"] = fig_page["children"], []
+        if shared is None:
+            return
+
+        stack = list(page_children)
+        while stack:
+            node = stack.pop()
+            stack.extend(node.get("children", []))
+            if node["guid"] in shared:
+                # Other pages only read the shared children, the rest can be freed
+                children = node.get("children")
+                if children and any(c["guid"] not in shared for c in children):
+                    node["children"] = [c for c in children if c["guid"] in shared]
+                continue
+
+            self._node_by_id.pop(node["guid"], None)
+            override_key = node.get("overrideKey")
+            if override_key is not None and self._node_by_id.get(override_key) is node:
+                del self._node_by_id[override_key]
+
+    def record_font(self, fig_font_name: dict) -> str:
         font_descriptor = (fig_font_name["family"], fig_font_name["style"])
         font_info = self._used_fonts.get(font_descriptor)
         if font_info:
             return font_info[1]
 
         try:
-            font_file, font_name = font.get_webfont(*font_descriptor)
+            with profiler.phase("fonts.fetch", font_descriptor[0]):
+                font_file, font_name = font.get_webfont(*font_descriptor)
         except:
             logging.warning(f"Could not download font {font_descriptor}")
             font_file = None
@@ -73,9 +185,96 @@ class Context:
         self._used_fonts[font_descriptor] = (font_file, font_name)
         return font_name
 
-    def used_fonts(self) -> Dict[Tuple[str, str], Tuple[IO[bytes], str]]:
+    def used_fonts(self) -> Dict[Tuple[str, str], Tuple[Optional[IO[bytes]], str]]:
         return self._used_fonts
 
+    def add_font(
+        self, font_descriptor: Tuple[str, str], font_file: Optional[IO[bytes]], font_name: str
+    ) -> None:
+        """Add a font fetched by another conversion, e.g. a shard. Fonts that were found take
+        precedence over the ones that were not"""
+        font_info = self._used_fonts.get(font_descriptor)
+        if font_info is None or (font_info[0] is None and font_file is not None):
+            self._used_fonts[font_descriptor] = (font_file, font_name)
+
+    def record_font_characters(self, fig_font_name: dict, characters: str) -> None:
+        font_descriptor = (fig_font_name["family"], fig_font_name["style"])
+        codepoints = self._page_codepoints.setdefault(font_descriptor, set())
+        codepoints.update(ord(c) for c in characters)
+
+    def font_codepoints(self, font_descriptor: Tuple[str, str]) -> Optional[Set[int]]:
+        return self._font_codepoints.get(font_descriptor)
+
+    def start_page(self) -> None:
+        """Forget the symbols and swatches converted by previous pages.
+
+        The page is converted as if it was the first one, so the result does not depend on
+        which pages were converted before in the same process (see convert._independent_pages)"""
+        self.symbols_page = None
+        self._sketch_components = {}
+        self._shared_styles = {}
+        self._shared_text_styles = {}
+        self._component_symbols = dict(self._unconverted_symbols)
+        self._page_codepoints = {}
+
+    def page_state(self) -> PageState:
+        return PageState(
+            # The symbols page only has symbol masters
+            symbols=cast(List[SymbolMaster], self.symbols_page.layers)
+            if self.symbols_page
+            else [],
+            swatches=list(self._sketch_components.items()),
+            fonts={
+                descriptor: (font_name, font_file is not None)
+                for descriptor, (font_file, font_name) in self._used_fonts.items()
+            },
+            codepoints=self._page_codepoints,
+            shared_styles=self.shared_styles(),
+            shared_text_styles=self.shared_text_styles(),
+        )
+
+    def merge_page(self, state: PageState) -> None:
+        """Add the symbols, swatches, shared styles and fonts used by a page, in page order.
+        The first page using a symbol, a swatch or a shared style decides its position in the
+        document"""
+        for symbol in state.symbols:
+            self._merged_symbols.setdefault(symbol.do_objectID, symbol)
+
+        for cid, swatch in state.swatches:
+            self._merged_components.setdefault(cid, swatch)
+
+        for shared_style in state.shared_styles:
+            self._merged_shared_styles.setdefault(shared_style.do_objectID, shared_style)
+
+        for shared_style in state.shared_text_styles:
+            self._merged_shared_text_styles.setdefault(shared_style.do_objectID, shared_style)
+
+        for descriptor, (font_name, found) in state.fonts.items():
+            if descriptor in self._used_fonts:
+                continue
+
+            # Converted in another process. The font is already in the fonts cache
+            font_file = None
+            if found:
+                try:
+                    font_file, font_name = font.get_webfont(*descriptor)
+                except:
+                    logging.warning(f"Could not load font {descriptor}")
+            self._used_fonts[descriptor] = (font_file, font_name)
+
+        for descriptor, codepoints in state.codepoints.items():
+            self._font_codepoints.setdefault(descriptor, set()).update(codepoints)
+
+    def finish_pages(self) -> None:
+        """Build the symbols page, the swatches and the shared styles from all the merged pages"""
+        self._sketch_components = self._merged_components
+        self._shared_styles = self._merged_shared_styles
+        self._shared_text_styles = self._merged_shared_text_styles
+        self.symbols_page = None
+        self._symbol_position = {0: [0, 0]}
+        for symbol in self._merged_symbols.values():
+            self.add_symbol(symbol)
+
     def find_symbol(self, sid: Sequence[int]) -> dict:
         symbol = self.fig_node(sid)
         sid = symbol["guid"]
@@ -89,7 +288,7 @@ class Context:
 
         return symbol
 
-    def _position_symbol(self, sketch_symbol):
+    def _position_symbol(self, sketch_symbol: SymbolMaster) -> None:
         # Mimics Sketch positioning algorith:
         #   All symbols of the same width go in the same column
         #   Each different width goes into a new column
@@ -1,24 +1,50 @@
+import io
+import logging
+import multiprocessing
 import zipfile
-from . import document, meta, tree, user
-from .context import context
+from . import document, meta, shared_style, tree, user, utils
+from .cache import PageCache
+from .config import config
+from .context import context, PageState
+from .page import PageSummary, add_page_background, summarize
+from .profiling import profiler
+from .selection import select_pages, separate_pages
+from sketchformat.archive import SketchArchive
 from sketchformat.layer_group import Page
 from sketchformat.serialize import serialize
-from typing import Dict, Sequence, List, Tuple, Optional
+from dataclasses import dataclass
+from typing import Dict, Iterator, Sequence, List, Tuple, Optional, cast
 
 
 def convert_fig_tree_to_sketch(
     fig: dict, id_map: Dict[Sequence[int], dict], output: zipfile.ZipFile
 ) -> None:
+    fig_pages, page_cache = init_context(fig, id_map)
+
+    # Convert all normal pages
+    sketch_pages: List[PageSummary] = convert_pages(fig_pages, output, page_cache)
+
+    write_document(sketch_pages, output)
+
+
+def init_context(
+    fig: dict, id_map: Dict[Sequence[int], dict]
+) -> Tuple[List[dict], Optional[PageCache]]:
+    """Prepare the context to convert the selected pages. Returns the pages to convert, and the
+    cache to load them from, if enabled"""
     fig_pages, components_page = separate_pages(fig["document"]["children"])
+    fig_pages, skipped_pages = select_pages(fig_pages, config.pages, config.shard)
 
     # We should either bring the fonts to the same indexed_components to pass
     # them as parameter or move the indexed components to the component file
     # and store there the components, for consistency purposes
-    context.init(components_page, id_map)
+    context.init(components_page, id_map, skipped_pages)
+
+    page_cache = PageCache(config.cache_dir, id_map) if config.cache_dir else None
+    return fig_pages, page_cache
 
-    # Convert all normal pages
-    sketch_pages: List[Page] = convert_pages(fig_pages, output)
 
+def write_document(sketch_pages: List[PageSummary], output: zipfile.ZipFile) -> None:
     sketch_document = document.convert(sketch_pages, output)
     sketch_user = user.convert(sketch_pages)
     sketch_meta = meta.convert(sketch_pages)
@@ -26,38 +52,237 @@ def convert_fig_tree_to_sketch(
     write_sketch_file(sketch_document, sketch_user, sketch_meta, output)
 
 
-def separate_pages(fig_pages: List[dict]) -> Tuple[List[dict], Optional[dict]]:
-    components_page = None
-    pages = []
+@dataclass
+class PageResult:
+    """A converted and serialized page, with everything that has to be merged in the document"""
 
-    for fig_page in fig_pages:
-        if "internalOnly" in fig_page and fig_page["internalOnly"]:
-            components_page = fig_page
+    summary: PageSummary
+    data: bytes
+    state: PageState
+    # Only set when converted in a worker process
+    warnings: Optional[Dict[Tuple[int, int], List[str]]] = None
+    profile: Optional[tuple] = None
+
+    def to_json(self) -> dict:
+        """Everything but the page data and the profile, as JSON types"""
+        return {
+            "summary": self.summary.to_json(),
+            "state": self.state.to_json(),
+            "warnings": (
+                [[guid, codes] for guid, codes in self.warnings.items()]
+                if self.warnings is not None
+                else None
+            ),
+        }
+
+    @staticmethod
+    def from_json(obj: dict, data: bytes) -> "PageResult":
+        return PageResult(
+            summary=PageSummary.from_json(obj["summary"]),
+            data=data,
+            state=PageState.from_json(obj["state"]),
+            warnings=(
+                {tuple(guid): codes for guid, codes in obj["warnings"]}  # type: ignore [misc]
+                if obj["warnings"] is not None
+                else None
+            ),
+        )
+
+
+def convert_pages(
+    fig_pages: List[dict], output: zipfile.ZipFile, page_cache: Optional[PageCache] = None
+) -> List[PageSummary]:
+    pages = [add_page(result, output) for result in page_results(fig_pages, output, page_cache)]
+    return pages + finish_pages(output)
+
+
+def add_page(result: PageResult, output: zipfile.ZipFile) -> PageSummary:
+    """Merge a converted page in the document, in page order, and write it to the output"""
+    context.merge_page(result.state)
+    if result.warnings is not None:
+        utils.merge_warnings(result.warnings)
+    if result.profile is not None:
+        profiler.merge(result.profile)
+
+    with profiler.phase("zip.write"):
+        with output.open(f"pages/{result.summary.do_objectID}.json", "w") as f:
+            f.write(result.data)
+
+    return result.summary
+
+
+def finish_pages(output: zipfile.ZipFile) -> List[PageSummary]:
+    """Write the symbols page, once all the pages are merged"""
+    context.finish_pages()
+    if context.symbols_page:
+        return [write_page(context.symbols_page, output)]
+
+    return []
+
+
+def page_results(
+    fig_pages: List[dict], output: zipfile.ZipFile, page_cache: Optional[PageCache] = None
+) -> Iterator[PageResult]:
+    """Convert the pages, or load them from the cache if enabled, yielding the results in page
+    order. The results are written to the output as they are yielded"""
+    if page_cache is None:
+        yield from converted_pages(fig_pages, fig_pages, output)
+        return
+
+    with profiler.phase("cache.fingerprint"):
+        keys = [page_cache.key(fig_page) for fig_page in fig_pages]
+    cached = [page_cache.contains(key) for key in keys]
+    logging.info(f"Reusing {sum(cached)} of {len(fig_pages)} pages from the cache")
+
+    converted = converted_pages(
+        [fig_page for fig_page, hit in zip(fig_pages, cached) if not hit], fig_pages, output
+    )
+    for fig_page, key, hit in zip(fig_pages, keys, cached):
+        if hit:
+            with profiler.phase("cache.load"):
+                result = page_cache.load(key)
+            if result is None:
+                logging.warning(f"Could not load page {fig_page['name']} from the cache")
+                result = _convert_page_with_warnings(fig_page)
+                page_cache.store(key, result)
+            elif result.warnings is not None:
+                # Before the page nodes are released
+                utils.log_cached_warnings(result.warnings, context.fig_node)
+            context.release_page(fig_page)
         else:
-            pages.append(fig_page)
+            result = next(converted)
+            with profiler.phase("cache.store"):
+                page_cache.store(key, result)
+
+        yield result
+
+
+def converted_pages(
+    fig_pages: List[dict], all_pages: List[dict], output: zipfile.ZipFile
+) -> Iterator[PageResult]:
+    """Convert the pages, in worker processes if enabled, yielding the results in page order.
+    Nodes are only released when no page in all_pages uses them"""
+    if config.jobs > 1 and len(fig_pages) > 1:
+        if "fork" in multiprocessing.get_all_start_methods():
+            return _convert_pages_in_workers(fig_pages, output)
 
-    return pages, components_page
+        logging.warning("Converting pages in parallel is not supported in this platform")
 
+    # Before converting any page, as they are released
+    if len(all_pages) > 1:
+        with profiler.phase("tree.references"):
+            context.find_shared_nodes(all_pages)
 
-def convert_pages(fig_pages: List[dict], output: zipfile.ZipFile) -> List[Page]:
-    pages = []
+    return _convert_pages(fig_pages)
 
+
+def _convert_pages(fig_pages: List[dict]) -> Iterator[PageResult]:
     for fig_page in fig_pages:
-        page = tree.convert_node(fig_page, "DOCUMENT")
-        serialize(page, output.open(f"pages/{page.do_objectID}.json", "w"))
-        pages.append(page)
+        if config.cache_dir or config.shard:
+            yield _convert_page_with_warnings(fig_page)
+        else:
+            yield convert_page(fig_page)
 
-    if context.symbols_page:
-        page = context.symbols_page
-        serialize(page, output.open(f"pages/{page.do_objectID}.json", "w"))
-        pages.append(page)
+        # Only the page summary is needed from now on. Release the fig nodes of the page that
+        # the next pages will not use
+        context.release_page(fig_page)
+
+
+def _convert_pages_in_workers(
+    fig_pages: List[dict], output: zipfile.ZipFile
+) -> Iterator[PageResult]:
+    global _worker_pages
+    _worker_pages = fig_pages
+
+    # Workers are forked when the first result is needed, after some entries may have been
+    # written. The compression threads must not be running when forking
+    if isinstance(output, SketchArchive):
+        output.stop_threads()
+
+    jobs = min(config.jobs, len(fig_pages))
+    with multiprocessing.get_context("fork").Pool(jobs, _start_worker) as pool:
+        yield from pool.imap(_convert_page_in_worker, range(len(fig_pages)))
+
+
+def convert_page(fig_page: dict) -> PageResult:
+    if _independent_pages():
+        context.start_page()
+
+    with profiler.phase("convert.page", fig_page["name"]):
+        page = cast(Page, tree.convert_node(fig_page, "DOCUMENT"))
+        bbox = add_page_background(fig_page, page)
+
+    if config.shared_styles:
+        with profiler.phase("shared_styles", page.name):
+            symbols = context.symbols_page.layers if context.symbols_page else []
+            shared_style.share_repeated_styles([page, *symbols])
+
+    data = io.BytesIO()
+    with profiler.phase("serialize.page", page.name):
+        serialize(page, data)
+
+    return PageResult(
+        summary=summarize(page, bbox), data=data.getvalue(), state=context.page_state()
+    )
+
+
+def _independent_pages() -> bool:
+    """Whether each page must be converted as if it was the first one. Otherwise, pages reuse
+    the symbols, swatches and shared styles converted by the previous ones, and merge_page
+    skips them.
+
+    Pages are independent when they are stored (in the cache or in a shard), converted in
+    worker processes, or when their repeated styles are shared, which looks at the symbols they
+    convert"""
+    return bool(config.cache_dir or config.shard or config.jobs > 1 or config.shared_styles)
+
+
+def _convert_page_with_warnings(fig_page: dict) -> PageResult:
+    """Convert a page, keeping its warnings in the result to be merged in the document, or
+    saved with it to the cache or to a shard"""
+    utils.page_warnings = {}
+    try:
+        result = convert_page(fig_page)
+        result.warnings = utils.page_warnings
+    finally:
+        utils.page_warnings = None
+
+    return result
+
+
+# Pages to convert in worker processes. Workers are forked, so they inherit these along with the
+# context and the configuration
+_worker_pages: List[dict] = []
+
+
+def _start_worker() -> None:
+    # Forget the measurements inherited from the parent, they are already in its profile
+    profiler.take_state()
+
+
+def _convert_page_in_worker(index: int) -> PageResult:
+    result = _convert_page_with_warnings(_worker_pages[index])
+    result.profile = profiler.take_state()
+    return result
+
+
+def write_page(page: Page, output: zipfile.ZipFile) -> PageSummary:
+    f = output.open(f"pages/{page.do_objectID}.json", "w")
+    with profiler.phase("serialize.page", page.name):
+        serialize(page, f)
+    with profiler.phase("zip.write"):
+        f.close()
 
-    return pages  # type: ignore
+    return summarize(page)
 
 
 def write_sketch_file(
     sketch_document: dict, sketch_user: dict, sketch_meta: dict, output: zipfile.ZipFile
 ) -> None:
-    serialize(sketch_document, output.open("document.json", "w"))
-    serialize(sketch_user, output.open("user.json", "w"))
-    serialize(sketch_meta, output.open("meta.json", "w"))
+    for name, obj in [
+        ("document.json", sketch_document),
+        ("user.json", sketch_user),
+        ("meta.json", sketch_meta),
+    ]:
+        with profiler.phase("zip.write"), output.open(name, "w") as f:
+            serialize(obj, f)
@@ -2,11 +2,11 @@ from converter import utils
 import zipfile
 from . import font
 from .context import context
-from sketchformat.layer_group import Page
+from .page import PageSummary
 from typing import List
 
 
-def convert(pages: List[Page], output_zip: zipfile.ZipFile) -> dict:
+def convert(pages: List[PageSummary], output_zip: zipfile.ZipFile) -> dict:
     return {
         "_class": "document",
         "do_objectID": utils.gen_object_id((0, 0), b"document"),
@@ -30,7 +30,7 @@ def convert(pages: List[Page], output_zip: zipfile.ZipFile) -> dict:
         "layerStyles": {
             "_class": "sharedStyleContainer",
             "do_objectID": utils.gen_object_id((0, 0), b"sharedStyleContainer"),
-            "objects": [],
+            "objects": context.shared_styles(),
         },
         "layerSymbols": {
             "_class": "symbolContainer",
@@ -40,7 +40,7 @@ def convert(pages: List[Page], output_zip: zipfile.ZipFile) -> dict:
         "layerTextStyles": {
             "_class": "sharedTextStyleContainer",
             "do_objectID": utils.gen_object_id((0, 0), b"sharedTextStyleContainer"),
-            "objects": [],
+            "objects": context.shared_text_styles(),
         },
         "perDocumentLibraries": [],
         "sharedSwatches": {
@@ -50,7 +50,9 @@ def convert(pages: List[Page], output_zip: zipfile.ZipFile) -> dict:
         },
         "fontReferences": sorted(
             [
-                font.convert(name, font_file, postscript, output_zip)
+                font.convert(
+                    name, font_file, postscript, output_zip, context.font_codepoints(name)
+                )
                 for name, (font_file, postscript) in context.used_fonts().items()
                 if font_file
             ],
@@ -1,33 +1,57 @@
 import appdirs
+import functools
+import hashlib
+import io
+import logging
 import os
 from converter import utils
-import urllib.request
-import urllib.parse
-from fontTools.ttLib import TTFont
+from converter.profiling import profiler
 from sketchformat.document import FontReference, JsonFileReference
-from typing import IO, Tuple
+from typing import IO, Dict, Tuple, Optional, Set
 from zipfile import ZipFile
 
+# fontTools, urllib and ssl take a while to import, so they are only loaded when needed
 fonts_cache_dir = appdirs.user_cache_dir("Fig2Sketch", "Sketch") + "/fonts"
-os.makedirs(fonts_cache_dir, exist_ok=True)
 
 
 class FontError(Exception):
     pass
 
 
-def retrieve_webfont(family):
+@functools.cache
+def setup_tls_certificates() -> None:
+    import ssl
+
+    # Load SSL certificates in OSs where Python does not use system defaults
+    if not ssl.create_default_context().get_ca_certs():
+        import certifi
+
+        os.environ["SSL_CERT_FILE"] = certifi.where()
+        logging.debug("Loaded TLS certificates from certifi")
+    else:
+        logging.debug("Using system TLS certificates")
+
+
+def retrieve_webfont(family: str) -> ZipFile:
+    import urllib.parse
+    import urllib.request
+
     WEB_FONT_BASE_URL = "http://fonts.google.com/download?family="
     font_url = WEB_FONT_BASE_URL + urllib.parse.quote(family)
     font_file = f"{fonts_cache_dir}/{family}.zip"
 
     if not os.path.exists(font_file):
-        urllib.request.urlretrieve(font_url, font_file)
+        setup_tls_certificates()
+        os.makedirs(fonts_cache_dir, exist_ok=True)
+        # Download to a temporary file, other processes may be reading the same font
+        tmp_file = f"{font_file}.{os.getpid()}.tmp"
+        urllib.request.urlretrieve(font_url, tmp_file)
+        os.replace(tmp_file, font_file)
 
     return ZipFile(font_file)
 
 
-def get_webfont(family, subfamily):
+def get_webfont(family: str, subfamily: str) -> Tuple[IO[bytes], str]:
     font_zip = retrieve_webfont(family)
     for fi in font_zip.infolist():
         if not fi.filename.endswith((".ttf", ".otf")):
@@ -46,13 +70,22 @@ def get_webfont(family, subfamily):
 
 
 def convert(
-    name: Tuple[str, str], font_file: IO[bytes], postscript: str, output_zip: ZipFile
+    name: Tuple[str, str],
+    font_file: IO[bytes],
+    postscript: str,
+    output_zip: ZipFile,
+    codepoints: Optional[Set[int]] = None,
 ) -> FontReference:
     family, subfamily = name
     data = font_file.read()
+    if codepoints:
+        with profiler.phase("fonts.subset", family):
+            data = subset_font(data, codepoints)
+
     sha = utils.generate_file_ref(data)
     path = f"fonts/{sha}"
-    output_zip.open(path, "w").write(data)
+    with profiler.phase("zip.write"), output_zip.open(path, "w") as f:
+        f.write(data)
 
     return FontReference(
         do_objectID=utils.gen_object_id((0, 0), bytes.fromhex(sha)),
@@ -63,7 +96,57 @@ def convert(
     )
 
 
-def extract_names(font_file):
+def subset_font(data: bytes, codepoints: Set[int]) -> bytes:
+    """Reduce a font to the glyphs needed to render the given codepoints.
+
+    Subsets are cached on disk by (font hash, codepoints hash), so converting the same
+    document again does not need to subset the fonts again"""
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+
+    font_sha = utils.generate_file_ref(data)
+    codepoints_sha = hashlib.sha1(
+        ",".join(str(c) for c in sorted(codepoints)).encode()
+    ).hexdigest()
+    subsets_dir = f"{fonts_cache_dir}/subsets"
+    cache_file = f"{subsets_dir}/{font_sha}-{codepoints_sha}"
+
+    if os.path.exists(cache_file):
+        with open(cache_file, "rb") as f:
+            return f.read()
+
+    # Keep all the font metadata and layout features, so the font behaves the same in Sketch.
+    # Timestamps are not updated so that the same subset always produces the same file
+    options = subset.Options()
+    options.layout_features = ["*"]
+    options.name_IDs = ["*"]
+    options.name_languages = ["*"]
+    options.name_legacy = True
+    options.notdef_outline = True
+    options.glyph_names = True
+    options.legacy_kern = True
+
+    font = TTFont(io.BytesIO(data), recalcTimestamp=False)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=codepoints)
+    subsetter.subset(font)
+
+    out = io.BytesIO()
+    font.save(out)
+    subset_data = out.getvalue()
+
+    os.makedirs(subsets_dir, exist_ok=True)
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(subset_data)
+    os.replace(tmp_file, cache_file)
+
+    return subset_data
+
+
+def extract_names(font_file: IO[bytes]) -> Dict[str, str]:
+    from fontTools.ttLib import TTFont
+
     font = TTFont(font_file)
     return {
         "family": font["name"].getBestFamilyName(),
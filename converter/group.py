@@ -1,3 +1,4 @@
+import dataclasses
 from converter import utils
 from . import base, positioning, rectangle
 from sketchformat.layer_group import (
@@ -79,7 +80,7 @@ def convert_frame_style(fig_group: dict, sketch_group: AbstractLayerGroup) -> Ab
 
         style.fills = []
         style.borders = []
-        style.blur.isEnabled = False
+        style.blur = dataclasses.replace(style.blur, isEnabled=False)
         style.innerShadows = []
 
     # Blur goes in a rectangle with bgblur at the top
@@ -91,7 +92,7 @@ def convert_frame_style(fig_group: dict, sketch_group: AbstractLayerGroup) -> Ab
 
         # Foreground blur, add as a layer at the top of the group
         sketch_group.layers.append(blur)
-        style.blur.isEnabled = False
+        style.blur = dataclasses.replace(style.blur, isEnabled=False)
 
     # Inner shadows apply to each child (if they were not put in the background rect earlier)
     # Normal shadows are untouched
@@ -105,9 +106,13 @@ def convert_frame_style(fig_group: dict, sketch_group: AbstractLayerGroup) -> Ab
 
 
 def apply_inner_shadow(layer: AbstractStyledLayer, shadow: InnerShadow) -> None:
-    if isinstance(layer, Group):
-        for child in layer.layers:
-            if isinstance(child, AbstractStyledLayer):
-                apply_inner_shadow(child, shadow)
-    else:
-        layer.style.innerShadows.append(shadow)
+    stack = [layer]
+    while stack:
+        layer = stack.pop()
+        if isinstance(layer, Group):
+            stack.extend(
+                child for child in reversed(layer.layers) if isinstance(child, AbstractStyledLayer)
+            )
+        else:
+            # Replaced instead of appended to, as styles may share their lists
+            layer.style.innerShadows = [*layer.style.innerShadows, shadow]
@@ -1,11 +1,11 @@
 import copy
 from converter import utils
-from . import base, group
+from . import base, group, text
 from .context import context
 from .config import config
 from sketchformat.layer_group import SymbolInstance, OverrideValue
 from sketchformat.style import Style
-from typing import Optional, List, Tuple
+from typing import Optional, List, Sequence, Tuple
 
 
 def convert(fig_instance):
@@ -108,7 +108,7 @@ def convert_override(override: dict) -> Tuple[List[OverrideValue], List[str]]:
     unsupported_overrides = []
 
     # Convert uuids in the path from top symbol to child instance
-    sketch_path = [utils.gen_object_id(guid) for guid in override["guidPath"]["guids"]]
+    sketch_path = utils.gen_object_ids(override["guidPath"]["guids"])
     sketch_path_str = "/".join(sketch_path)
 
     for prop, value in override.items():
@@ -126,6 +126,8 @@ def convert_override(override: dict) -> Tuple[List[OverrideValue], List[str]]:
                     value=value["characters"],
                 )
             )
+            if config.subset_fonts:
+                record_override_characters(override["guidPath"]["guids"][-1], value["characters"])
         elif prop == "overriddenSymbolID":
             sketch_overrides.append(
                 OverrideValue(
@@ -144,6 +146,27 @@ def convert_override(override: dict) -> Tuple[List[OverrideValue], List[str]]:
     return sketch_overrides, unsupported_overrides
 
 
+def record_override_characters(text_guid: Sequence[int], characters: str) -> None:
+    """Text overrides are rendered with the fonts of the overridden text layer, so they must be
+    kept when subsetting those fonts"""
+    try:
+        fig_text = context.fig_node(text_guid)
+    except KeyError:
+        return
+
+    if "fontName" in fig_text:
+        context.record_font_characters(
+            fig_text["fontName"], text.rendered_characters(characters, fig_text.get("textCase"))
+        )
+
+    for style_override in fig_text.get("textData", {}).get("styleOverrideTable", []):
+        if "fontName" in style_override:
+            text_case = style_override.get("textCase", fig_text.get("textCase"))
+            context.record_font_characters(
+                style_override["fontName"], text.rendered_characters(characters, text_case)
+            )
+
+
 def find_symbol_master(root_symbol, guid_path, overrides):
     current_symbol = root_symbol
     path = []
@@ -190,14 +213,16 @@ def convert_properties_to_overrides(fig_master, properties, guid_path=[]):
 
 def find_refs(node, ref_id):
     """Find all usages of a property in a symbol, recursively"""
-    refs = [
-        (ref, node["guid"])
-        for ref in node.get("componentPropRefs", [])
-        if ref["defID"] == ref_id and not ref["isDeleted"]
-    ]
-
-    for ch in node.get("children", []):
-        refs += find_refs(ch, ref_id)
+    refs = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        refs += [
+            (ref, node["guid"])
+            for ref in node.get("componentPropRefs", [])
+            if ref["defID"] == ref_id and not ref["isDeleted"]
+        ]
+        stack.extend(reversed(node.get("children", [])))
 
     return refs
 
@@ -215,6 +240,17 @@ def detach_symbol(fig_instance, all_overrides):
 
 
 def apply_overrides(fig_node, instance_id, overrides, derived_symbol_data):
+    stack = [fig_node]
+    while stack:
+        fig_node = stack.pop()
+        apply_node_overrides(fig_node, instance_id, overrides, derived_symbol_data)
+
+        # Instances pass the overrides down to their symbol, other nodes to their children
+        if fig_node["type"] != "INSTANCE":
+            stack.extend(reversed(fig_node.get("children", [])))
+
+
+def apply_node_overrides(fig_node, instance_id, overrides, derived_symbol_data):
     guid = fig_node.get("overrideKey", fig_node["guid"])
 
     # Apply overrides
@@ -251,10 +287,7 @@ def apply_overrides(fig_node, instance_id, overrides, derived_symbol_data):
     # Generate a unique ID by concatenating instance_id + node_id
     fig_node["guid"] = tuple(j for i in (instance_id, guid) for j in i)
 
-    # If it's an instance, pass the overrides down. Otherwise, convert the children
+    # If it's an instance, pass the overrides down
     if fig_node["type"] == "INSTANCE":
         fig_node["symbolData"]["symbolOverrides"] += child_overrides
         fig_node["derivedSymbolData"] += child_derived_data
-    else:
-        for c in fig_node.get("children", []):
-            apply_overrides(c, instance_id, overrides, derived_symbol_data)
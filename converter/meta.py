@@ -1,17 +1,16 @@
-from sketchformat.layer_group import Page, Artboard, SymbolMaster
 from typing import List
+from .page import PageSummary
 
 
-def convert(pages: List[Page]) -> dict:
+def convert(pages: List[PageSummary]) -> dict:
     return {
         "commit": "1899e24f63af087a9dd3c66f73b492b72c27c2c8",
         "pagesAndArtboards": {
             page.do_objectID: {
                 "name": page.name,
                 "artboards": {
-                    artboard.do_objectID: {"name": artboard.name}
-                    for artboard in page.layers
-                    if isinstance(artboard, Artboard) or isinstance(artboard, SymbolMaster)
+                    artboard_id: {"name": artboard_name}
+                    for artboard_id, artboard_name in page.artboards
                 },
             }
             for page in pages
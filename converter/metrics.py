@@ -0,0 +1,49 @@
+import json
+from . import utils
+from .context import context
+from .profiling import profiler
+from collections import Counter
+from typing import Sequence
+from zipfile import ZipFile
+
+
+def collect(output: ZipFile, images_converted: int) -> dict:
+    """Gather conversion metrics. Must be called after the output has been closed"""
+    report = profiler.report()
+
+    nodes: Counter[str] = Counter()
+    for (type_, _), stats in profiler.node_types.items():
+        nodes[type_] += stats.count
+
+    used_fonts = context.used_fonts().values()
+
+    return {
+        "nodes": dict(nodes.most_common()),
+        "warnings": {
+            code: {
+                "count": count,
+                "message": utils.WARNING_MESSAGES[code],
+                "sample_guids": [_guid(guid) for guid in utils.warning_samples[code]],
+            }
+            for code, count in utils.warning_counts.most_common()
+        },
+        "images": images_converted,
+        "fonts": {
+            "embedded": len([font_file for font_file, _ in used_fonts if font_file]),
+            "missing": len([font_file for font_file, _ in used_fonts if not font_file]),
+        },
+        "entries": {
+            info.filename: {"size": info.file_size, "compressed_size": info.compress_size}
+            for info in output.infolist()
+        },
+        **report,
+    }
+
+
+def write(path: str, output: ZipFile, images_converted: int) -> None:
+    with open(path, "w") as f:
+        json.dump(collect(output, images_converted), f, indent=2)
+
+
+def _guid(guid: Sequence[int]) -> str:
+    return ":".join(str(i) for i in guid)
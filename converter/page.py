@@ -1,9 +1,40 @@
 from converter import utils
+from dataclasses import dataclass
 from . import style, positioning
 from sketchformat.layer_group import *
 from sketchformat.layer_shape import Rectangle
 from sketchformat.style import Fill
-from typing import Sequence
+from typing import Sequence, Tuple, List, Optional
+
+
+@dataclass
+class PageSummary:
+    """What is needed from a page after it has been written to the output.
+    This allows to free the layers of each page as soon as it is converted"""
+
+    do_objectID: str
+    name: str
+    # (do_objectID, name) of each artboard and symbol master
+    artboards: List[Tuple[str, str]]
+    # Bounding box of all layers, None if the page is empty
+    bbox: Optional[Tuple[float, float, float, float]]
+
+    def to_json(self) -> dict:
+        return {
+            "do_objectID": self.do_objectID,
+            "name": self.name,
+            "artboards": self.artboards,
+            "bbox": self.bbox,
+        }
+
+    @staticmethod
+    def from_json(obj: dict) -> "PageSummary":
+        return PageSummary(
+            do_objectID=obj["do_objectID"],
+            name=obj["name"],
+            artboards=[(object_id, name) for object_id, name in obj["artboards"]],
+            bbox=tuple(obj["bbox"]) if obj["bbox"] is not None else None,  # type: ignore [arg-type]
+        )
 
 
 def convert(fig_canvas: dict) -> Page:
@@ -28,35 +59,70 @@ def make_page(guid: Sequence[int], name: str, suffix: bytes = b"") -> Page:
     )
 
 
+def summarize(
+    sketch_page: Page, bbox: Optional[Tuple[float, float, float, float]] = None
+) -> PageSummary:
+    """Summarize a page, with the bounding box of its layers if it is already known"""
+    return PageSummary(
+        do_objectID=sketch_page.do_objectID,
+        name=sketch_page.name,
+        artboards=[
+            (layer.do_objectID, layer.name)
+            for layer in sketch_page.layers
+            if isinstance(layer, Artboard)
+        ],
+        bbox=bbox or page_bbox(sketch_page),
+    )
+
+
+def page_bbox(sketch_page: Page) -> Optional[Tuple[float, float, float, float]]:
+    return positioning.group_bbox(sketch_page.layers) if sketch_page.layers else None
+
+
 DEFAULT_CANVAS_BACKGROUND = Color(
     red=0.9607843160629272, green=0.9607843160629272, blue=0.9607843160629272, alpha=1
 )
 
 
-def add_page_background(fig_canvas, sketch_page):
+def add_page_background(
+    fig_canvas: dict, sketch_page: Page
+) -> Optional[Tuple[float, float, float, float]]:
+    """Add the background of the page, if it is not the default one. Returns the bounding box of
+    the page layers, background included"""
     background_color = style.convert_color(
         fig_canvas["backgroundColor"], fig_canvas["backgroundOpacity"]
     )
+    bbox = page_bbox(sketch_page)
     if background_color != DEFAULT_CANVAS_BACKGROUND:
-        page_bbox = positioning.group_bbox(sketch_page.layers)
-        sketch_page.layers.insert(
-            0,
-            Rectangle(
-                do_objectID=utils.gen_object_id(fig_canvas["guid"], b"background"),
-                name="Page background",
-                style=Style(
-                    do_objectID=utils.gen_object_id(fig_canvas["guid"], b"background_style"),
-                    fills=[Fill.Color(background_color)],
-                ),
-                resizingConstraint=0,
-                rotation=0,
-                frame=Rect(
-                    x=page_bbox[0] - 1000,
-                    y=page_bbox[2] - 1000,
-                    width=(page_bbox[1] - page_bbox[0]) + 2000,
-                    height=(page_bbox[3] - page_bbox[2]) + 2000,
-                ),
+        layers_bbox = bbox or (0, 0, 0, 0)
+        background = Rectangle(
+            do_objectID=utils.gen_object_id(fig_canvas["guid"], b"background"),
+            name="Page background",
+            style=Style(
+                do_objectID=utils.gen_object_id(fig_canvas["guid"], b"background_style"),
+                fills=[Fill.Color(background_color)],
+            ),
+            resizingConstraint=0,
+            rotation=0,
+            frame=Rect(
+                x=layers_bbox[0] - 1000,
+                y=layers_bbox[2] - 1000,
+                width=(layers_bbox[1] - layers_bbox[0]) + 2000,
+                height=(layers_bbox[3] - layers_bbox[2]) + 2000,
             ),
         )
+        sketch_page.layers.insert(0, background)
+
+        # Same result as group_bbox of the page layers, which start with the background
+        background_bbox = positioning.bbox_from_frame(background)
+        if bbox is None:
+            bbox = background_bbox
+        else:
+            bbox = (
+                min(background_bbox[0], bbox[0]),
+                max(background_bbox[1], bbox[1]),
+                min(background_bbox[2], bbox[2]),
+                max(background_bbox[3], bbox[3]),
+            )
 
-    return sketch_page
+    return bbox
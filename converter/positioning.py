@@ -82,20 +82,19 @@ def convert(fig_item: dict) -> _Positioning:
 def transform_frame(item: dict, size: dict = {}) -> Vector:
     if not size:
         size = item["size"]
-    # Calculate relative position
-    relative_position = Vector(item["transform"][0][2], item["transform"][1][2])
+    tr = item["transform"]
 
     # Vector from rotation center to origin (0,0)
-    vco = Vector(size["x"] / 2, size["y"] / 2)
+    vco_x = size["x"] / 2
+    vco_y = size["y"] / 2
 
-    # Apply rotation to vector
-    vco_rotated = apply_transform(item, vco)
-
-    # Calculate translation of origin
-    origin_translation = vco_rotated - vco
+    # Apply rotation to the vector and calculate the translation of the origin. Same as
+    # apply_transform(item, vco) - vco, without the intermediate vectors
+    origin_x = (tr[0][0] * vco_x + tr[0][1] * vco_y) - vco_x
+    origin_y = (tr[1][0] * vco_x + tr[1][1] * vco_y) - vco_y
 
     # Return origin coordinates after translation and relative to parent
-    return relative_position + origin_translation
+    return Vector(tr[0][2] + origin_x, tr[1][2] + origin_y)
 
 
 def apply_transform(item: dict, vector: Vector) -> Vector:
@@ -149,27 +148,33 @@ def group_bbox(children: Sequence[AbstractLayer]) -> Tuple[float, float, float,
 # TODO: Extract this and share code with positioning (after tests are created)
 def bbox_from_frame(child: AbstractLayer) -> Tuple[float, float, float, float]:
     frame = child.frame
-    theta = math.radians(child.rotation)
-    c, s = math.cos(theta), math.sin(theta)
-    matrix = Matrix([[c, -s], [s, c]])
-    # Rotate the frame to the original position and calculate corners
     x1 = frame.x
     x2 = x1 + frame.width
     y1 = frame.y
     y2 = y1 + frame.height
 
+    if child.rotation == 0:
+        # Rotating by 0 degrees leaves the corners where they are. Adding 0.0 turns -0.0 into
+        # 0.0, like adding the (zero) rotation offsets does
+        x1, x2, y1, y2 = 0.0 + x1, 0.0 + x2, 0.0 + y1, 0.0 + y2
+        return (min(x1, x2), max(x1, x2), min(y1, y2), max(y1, y2))
+
+    # Rotate the frame to the original position and calculate corners
+    theta = math.radians(child.rotation)
+    c, s = math.cos(theta), math.sin(theta)
     w2 = frame.width / 2
     h2 = frame.height / 2
-    points = [
-        matrix.dot2(Vector(-w2, -h2)) - Vector(-w2, -h2) + Vector(x1, y1),
-        matrix.dot2(Vector(w2, -h2)) - Vector(w2, -h2) + Vector(x2, y1),
-        matrix.dot2(Vector(w2, h2)) - Vector(w2, h2) + Vector(x2, y2),
-        matrix.dot2(Vector(-w2, h2)) - Vector(-w2, h2) + Vector(x1, y2),
+    xs = [
+        (c * -w2 - s * -h2) - -w2 + x1,
+        (c * w2 - s * -h2) - w2 + x2,
+        (c * w2 - s * h2) - w2 + x2,
+        (c * -w2 - s * h2) - -w2 + x1,
+    ]
+    ys = [
+        (s * -w2 + c * -h2) - -h2 + y1,
+        (s * w2 + c * -h2) - -h2 + y1,
+        (s * w2 + c * h2) - h2 + y2,
+        (s * -w2 + c * h2) - h2 + y2,
     ]
 
-    return (
-        min(p[0] for p in points),
-        max(p[0] for p in points),
-        min(p[1] for p in points),
-        max(p[1] for p in points),
-    )
+    return (min(xs), max(xs), min(ys), max(ys))
@@ -0,0 +1,262 @@
+import heapq
+import itertools
+import json
+import logging
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field, asdict
+from typing import TYPE_CHECKING, Callable, ContextManager, Dict, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import cProfile
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None  # type: ignore [assignment]
+
+# Returned by disabled phases. nullcontext is reentrant, so one instance serves all of them
+_NO_PHASE = nullcontext()
+
+
+@dataclass
+class PhaseStats:
+    wall: float = 0.0
+    cpu: float = 0.0
+    calls: int = 0
+    max_rss_kb: Optional[int] = None
+    items: Dict[str, "PhaseStats"] = field(default_factory=dict)
+
+    def add(self, wall: float, cpu: float, max_rss_kb: Optional[int]) -> None:
+        self.wall += wall
+        self.cpu += cpu
+        self.calls += 1
+        if max_rss_kb is not None:
+            self.max_rss_kb = max(self.max_rss_kb or 0, max_rss_kb)
+
+
+@dataclass
+class NodeStats:
+    count: int = 0
+    self_time: float = 0.0
+    total_time: float = 0.0
+
+
+class Profiler:
+    """Collects wall and CPU time, call counts and peak memory of the conversion phases.
+
+    Phases are measured inclusively: time spent in nested phases is also counted in the
+    enclosing one. When disabled, `phase()` is a no-op"""
+
+    def __init__(self, slowest_nodes: int = 20) -> None:
+        self.enabled = False
+        self.phases: Dict[str, PhaseStats] = {}
+        self.cprofile_phase: Optional[str] = None
+        self._cprofile: Optional["cProfile.Profile"] = None
+        self._cprofile_depth = 0
+
+        # (node type, converter) -> stats
+        self.node_types: Dict[Tuple[str, str], NodeStats] = {}
+        self.slowest_nodes = slowest_nodes
+        # Min-heap of (self time, sequence, node info), keeping the slowest nodes
+        self._slowest: List[Tuple[float, int, dict]] = []
+        self._sequence = itertools.count()
+        # Object ID cache (hits, misses) merged from other processes, and the counts of this
+        # process when its measurements were last taken
+        self._object_ids = (0, 0)
+        self._object_ids_taken = (0, 0)
+
+        # [start time, time spent in children, previous page] of the nodes being converted
+        self._nodes: List[list] = []
+        self._page = ""
+
+    def enable(self, cprofile_phase: Optional[str] = None) -> None:
+        self.enabled = True
+        self.cprofile_phase = cprofile_phase
+        if cprofile_phase:
+            import cProfile
+
+            self._cprofile = cProfile.Profile()
+
+    def phase(self, name: str, item: Optional[str] = None) -> ContextManager:
+        if not self.enabled:
+            return _NO_PHASE
+
+        return self._measure(name, item)
+
+    @contextmanager
+    def _measure(self, name: str, item: Optional[str]) -> Iterator[None]:
+        cprofile = self._cprofile if name == self.cprofile_phase else None
+        if cprofile:
+            # The phase may be re-entered (e.g. symbols converted while converting a page)
+            if self._cprofile_depth == 0:
+                cprofile.enable()
+            self._cprofile_depth += 1
+
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            max_rss = _max_rss_kb()
+
+            if cprofile:
+                self._cprofile_depth -= 1
+                if self._cprofile_depth == 0:
+                    cprofile.disable()
+
+            stats = self.phases.setdefault(name, PhaseStats())
+            stats.add(wall, cpu, max_rss)
+            if item is not None:
+                stats.items.setdefault(item, PhaseStats()).add(wall, cpu, max_rss)
+
+    def start_node(self, fig_node: dict, type_: str) -> None:
+        """Start measuring the conversion of a node. Nodes started while this one is being
+        converted are its children, and their time is not counted as self time"""
+        self._nodes.append([time.perf_counter(), 0.0, self._page])
+        if type_ == "CANVAS":
+            self._page = fig_node["name"]
+
+    def end_node(self, fig_node: dict, type_: str, converter: Callable) -> None:
+        start, children_time, page = self._nodes.pop()
+        total_time = time.perf_counter() - start
+        self_time = total_time - children_time
+        if self._nodes:
+            self._nodes[-1][1] += total_time
+
+        key = (type_, f"{converter.__module__}.{converter.__qualname__}")
+        stats = self.node_types.get(key)
+        if stats is None:
+            stats = self.node_types[key] = NodeStats()
+        stats.count += 1
+        stats.self_time += self_time
+        stats.total_time += total_time
+
+        if len(self._slowest) < self.slowest_nodes or self_time > self._slowest[0][0]:
+            info = {
+                "guid": ":".join(str(i) for i in fig_node["guid"]),
+                "name": fig_node["name"],
+                "type": type_,
+                "page": self._page,
+                "children": len(fig_node.get("children", [])),
+                "self_time": self_time,
+                "total_time": total_time,
+            }
+            entry = (self_time, next(self._sequence), info)
+            if len(self._slowest) < self.slowest_nodes:
+                heapq.heappush(self._slowest, entry)
+            else:
+                heapq.heapreplace(self._slowest, entry)
+
+        self._page = page
+
+    def take_state(self) -> tuple:
+        """Return the measurements taken so far and reset them, to be merged in another process"""
+        hits, misses = _object_id_counts()
+        object_ids = (hits - self._object_ids_taken[0], misses - self._object_ids_taken[1])
+        self._object_ids_taken = (hits, misses)
+
+        state = (self.phases, self.node_types, self._slowest, object_ids)
+        self.phases = {}
+        self.node_types = {}
+        self._slowest = []
+        return state
+
+    def merge(self, state: tuple) -> None:
+        phases, node_types, slowest, (hits, misses) = state
+        self._object_ids = (self._object_ids[0] + hits, self._object_ids[1] + misses)
+        for name, other in phases.items():
+            stats = self.phases.setdefault(name, PhaseStats())
+            _merge_stats(stats, other)
+            for item, other_item in other.items.items():
+                _merge_stats(stats.items.setdefault(item, PhaseStats()), other_item)
+
+        for key, other_node in node_types.items():
+            node_stats = self.node_types.setdefault(key, NodeStats())
+            node_stats.count += other_node.count
+            node_stats.self_time += other_node.self_time
+            node_stats.total_time += other_node.total_time
+
+        for self_time, _, info in slowest:
+            entry = (self_time, next(self._sequence), info)
+            if len(self._slowest) < self.slowest_nodes:
+                heapq.heappush(self._slowest, entry)
+            elif self_time > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, entry)
+
+    def report(self) -> dict:
+        phases = {}
+        for name, stats in self.phases.items():
+            phase = asdict(stats)
+            if not phase["items"]:
+                del phase["items"]
+            phases[name] = phase
+
+        hits, misses = _object_id_counts()
+        hits += self._object_ids[0] - self._object_ids_taken[0]
+        misses += self._object_ids[1] - self._object_ids_taken[1]
+
+        report: dict = {
+            "phases": phases,
+            "object_ids": {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0,
+            },
+        }
+        if self.node_types:
+            report["node_types"] = [
+                {"type": type_, "converter": converter, **asdict(stats)}
+                for (type_, converter), stats in sorted(
+                    self.node_types.items(), key=lambda item: -item[1].self_time
+                )
+            ]
+            report["slowest_nodes"] = [info for _, _, info in sorted(self._slowest, reverse=True)]
+
+        return report
+
+    def write_report(self, path: str) -> None:
+        report = json.dumps(self.report(), indent=2)
+        if path == "-":
+            print(report)
+        else:
+            with open(path, "w") as f:
+                f.write(report)
+
+    def write_cprofile(self, path: str) -> None:
+        if not self._cprofile:
+            return
+
+        self._cprofile.dump_stats(path)
+        logging.info(f"Saved profile of phase {self.cprofile_phase} to {path}")
+
+
+def _object_id_counts() -> Tuple[int, int]:
+    from . import utils
+
+    info = utils.object_id_cache_info()
+    return info.hits, info.misses
+
+
+def _merge_stats(stats: PhaseStats, other: PhaseStats) -> None:
+    stats.wall += other.wall
+    stats.cpu += other.cpu
+    stats.calls += other.calls
+    if other.max_rss_kb is not None:
+        stats.max_rss_kb = max(stats.max_rss_kb or 0, other.max_rss_kb)
+
+
+def _max_rss_kb() -> Optional[int]:
+    if not resource:
+        return None
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports kilobytes
+    return max_rss // 1024 if sys.platform == "darwin" else max_rss
+
+
+profiler = Profiler()
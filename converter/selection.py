@@ -0,0 +1,162 @@
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+# Keys that link a node to its position in the tree, rather than referencing other nodes
+STRUCTURAL_KEYS = {"guid", "parent", "overrideKey", "children"}
+
+# Keys whose guids reference other nodes: symbols, shared styles (see base.py), prototype
+# destinations, and the guid paths of the nodes that overrides apply to
+REFERENCE_KEYS = {
+    "symbolID",
+    "overriddenSymbolID",
+    "inheritFillStyleID",
+    "inheritFillStyleIDForStroke",
+    "inheritFillStyleIDForBackground",
+    "inheritStrokeStyleID",
+    "inheritTextStyleID",
+    "inheritExportStyleID",
+    "inheritEffectStyleID",
+    "inheritGridStyleID",
+    "transitionNodeID",
+    "guids",
+}
+
+
+class PageNotFound(Exception):
+    pass
+
+
+def separate_pages(fig_pages: List[dict]) -> Tuple[List[dict], Optional[dict]]:
+    components_page = None
+    pages = []
+
+    for fig_page in fig_pages:
+        if "internalOnly" in fig_page and fig_page["internalOnly"]:
+            components_page = fig_page
+        else:
+            pages.append(fig_page)
+
+    return pages, components_page
+
+
+def select_pages(
+    fig_pages: List[dict],
+    selectors: Optional[List[str]],
+    shard: Optional[Tuple[int, int]] = None,
+) -> Tuple[List[dict], List[dict]]:
+    """Split the pages into (selected, skipped), keeping the document order.
+
+    Each selector is matched against the page names first, then against the page guids
+    (as "sessionID:localID") and finally against the page indexes (starting at 0).
+
+    Given a shard (index, count), only one in every count selected pages is kept, starting
+    with the index-th one (starting at 1)"""
+    if not selectors and not shard:
+        return fig_pages, []
+
+    selected = fig_pages
+    if selectors:
+        selected_ids = set()
+        for selector in selectors:
+            page = _find_page(fig_pages, selector)
+            if page is None:
+                raise PageNotFound(f"Could not find page '{selector}'")
+            selected_ids.add(id(page))
+        selected = [p for p in fig_pages if id(p) in selected_ids]
+
+    if shard:
+        index, count = shard
+        selected = selected[index - 1 :: count]
+
+    selected_ids = {id(p) for p in selected}
+    skipped = [p for p in fig_pages if id(p) not in selected_ids]
+    return selected, skipped
+
+
+def _find_page(fig_pages: List[dict], selector: str) -> Optional[dict]:
+    for page in fig_pages:
+        if page["name"] == selector:
+            return page
+
+    for page in fig_pages:
+        if ":".join(str(i) for i in page["guid"]) == selector:
+            return page
+
+    if selector.isdigit() and int(selector) < len(fig_pages):
+        return fig_pages[int(selector)]
+
+    return None
+
+
+def required_nodes(fig_pages: List[dict], id_map: Dict[Sequence[int], dict]) -> Set[Sequence[int]]:
+    """Find the guids of all the nodes needed to convert the given pages.
+
+    That is, the pages subtrees plus every node they reference (symbols, shared styles,
+    prototype destinations...), transitively. Referenced symbols are needed with their whole
+    subtree, other referenced nodes are only read"""
+    required = set()
+    # A node can be first reached as a reference, and later as a child of a required node
+    expanded = set()
+    stack = [(page, True) for page in fig_pages]
+
+    while stack:
+        node, with_children = stack.pop()
+        guid = node["guid"]
+        with_children = with_children or node["type"] == "SYMBOL"
+        if guid in expanded or (guid in required and not with_children):
+            continue
+
+        if with_children:
+            expanded.add(guid)
+            stack.extend((child, True) for child in node.get("children", []))
+
+        if guid in required:
+            continue
+        required.add(guid)
+
+        for ref in _references(node):
+            target = id_map.get(ref)
+            if target is not None and target["guid"] not in required:
+                stack.append((target, False))
+
+    return required
+
+
+def shared_nodes(fig_pages: List[dict], id_map: Dict[Sequence[int], dict]) -> Set[Sequence[int]]:
+    """Find the guids of the nodes that must outlive the conversion of their page.
+
+    Those are the pages themselves and every node of a page that is needed to convert another
+    page (symbols with their subtree, shared styles, prototype destinations...), plus their
+    parents"""
+    page_of = {}
+    for i, fig_page in enumerate(fig_pages):
+        stack = [fig_page]
+        while stack:
+            node = stack.pop()
+            page_of[node["guid"]] = i
+            stack.extend(node.get("children", []))
+
+    shared = {fig_page["guid"] for fig_page in fig_pages}
+    for i, fig_page in enumerate(fig_pages):
+        for guid in required_nodes([fig_page], id_map):
+            # Converting a frame or a symbol reads its parent (see prototype.py)
+            node = id_map[guid]
+            parent = node["parent"]["guid"] if "parent" in node else guid
+
+            # Nodes outside the pages (e.g. in the internal page) are never released
+            shared.update(g for g in (guid, parent) if page_of.get(g, i) != i)
+
+    return shared
+
+
+def _references(node: dict) -> Iterator[Sequence[int]]:
+    stack = [(k, v) for k, v in node.items() if k not in STRUCTURAL_KEYS]
+    while stack:
+        key, value = stack.pop()
+        if type(value) is tuple:
+            if key in REFERENCE_KEYS:
+                yield value
+        elif type(value) is dict:
+            stack.extend(value.items())
+        elif type(value) is list and value and type(value[0]) in (dict, list, tuple):
+            # Items of a list are found under the key of the list
+            stack.extend((key, item) for item in value)
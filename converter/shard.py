@@ -0,0 +1,190 @@
+"""Conversion of a document in shards, each of them converting some of its pages, possibly in
+different machines.
+
+Each shard writes a partial archive with its pages, the images they use, the files of the fonts
+they use and a manifest with everything else its pages add to the document: symbols, swatches,
+shared styles, fonts and warnings. Merging the shards adds their pages to the document in page
+order, like a conversion of the whole document does, so the result is the same. Object IDs match
+as long as all the shards use the same salt"""
+import dataclasses
+import io
+import json
+import logging
+import zipfile
+from . import convert, utils
+from .cache import _code_fingerprint
+from .config import config
+from .context import context
+from .profiling import profiler
+from dataclasses import dataclass
+from sketchformat.serialize import serialize
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+MANIFEST = "shard/manifest.json"
+FONTS_DIR = "shard/fonts"
+
+# Options that do not need to match in all the shards
+SHARD_OPTIONS = {"compact_nodes", "shard", "jobs", "cache_dir"}
+
+
+class ShardError(Exception):
+    pass
+
+
+@dataclass
+class ShardManifest:
+    index: int
+    count: int
+    # Hex digest of the converter code
+    code: str
+    # Configuration of the conversion, as JSON types
+    options: Dict[str, Any]
+    # Position of the page in the document -> converted page, without its data
+    pages: List[Tuple[int, "convert.PageResult"]]
+    # Font descriptor -> (font name, font file in the shard if the font was found)
+    fonts: Dict[Tuple[str, str], Tuple[str, Optional[str]]]
+
+    def to_json(self) -> dict:
+        return {
+            "index": self.index,
+            "count": self.count,
+            "code": self.code,
+            "options": self.options,
+            "pages": [[position, result.to_json()] for position, result in self.pages],
+            "fonts": [
+                [family, style, font_name, file_name]
+                for (family, style), (font_name, file_name) in self.fonts.items()
+            ],
+        }
+
+    @staticmethod
+    def from_json(obj: dict) -> "ShardManifest":
+        return ShardManifest(
+            index=obj["index"],
+            count=obj["count"],
+            code=obj["code"],
+            options=obj["options"],
+            # The page data is in the pages/ entries of the shard
+            pages=[
+                (position, convert.PageResult.from_json(result, b""))
+                for position, result in obj["pages"]
+            ],
+            fonts={
+                (family, style): (font_name, file_name)
+                for family, style, font_name, file_name in obj["fonts"]
+            },
+        )
+
+
+def convert_shard(fig: dict, id_map: Dict[Sequence[int], dict], output: zipfile.ZipFile) -> None:
+    assert config.shard
+    index, count = config.shard
+    fig_pages, page_cache = convert.init_context(fig, id_map)
+
+    pages = []
+    for i, result in enumerate(convert.page_results(fig_pages, output, page_cache)):
+        convert.add_page(result, output)
+        pages.append((index - 1 + i * count, result))
+
+    # Fonts are stored as found, they are only subset when merging all the shards
+    fonts = {}
+    for descriptor, (font_file, font_name) in context.used_fonts().items():
+        file_name = None
+        if font_file:
+            data = font_file.read()
+            file_name = utils.generate_file_ref(data)
+            with profiler.phase("zip.write"), output.open(f"{FONTS_DIR}/{file_name}", "w") as f:
+                f.write(data)
+        fonts[descriptor] = (font_name, file_name)
+
+    manifest = ShardManifest(
+        index=index,
+        count=count,
+        code=_code_fingerprint().hex(),
+        options=_shard_options(),
+        pages=pages,
+        fonts=fonts,
+    )
+    with profiler.phase("zip.write"), output.open(MANIFEST, "w") as f:
+        serialize(manifest.to_json(), f)
+
+
+def merge(shard_files: List[str], output: zipfile.ZipFile) -> None:
+    """Combine the archives of all the shards of a document into a .sketch document"""
+    shards = []
+    for shard_file in shard_files:
+        try:
+            shard_zip = zipfile.ZipFile(shard_file)
+            with shard_zip.open(MANIFEST) as f:
+                manifest = ShardManifest.from_json(json.load(f))
+        except Exception as e:
+            raise ShardError(f"{shard_file} is not a fig2sketch shard: {e}")
+        shards.append((shard_file, shard_zip, manifest))
+
+    shards.sort(key=lambda shard: shard[2].index)
+    _check_shards([(shard_file, manifest) for shard_file, _, manifest in shards])
+
+    options = shards[0][2].options
+    config.salt = bytes.fromhex(options["salt"])
+    config.subset_fonts = options["subset_fonts"]
+    context.init(None, {})
+
+    pages = []
+    copied = set()
+    for _, shard_zip, manifest in shards:
+        # Images are named after their hash, so shards using the same image have the same entry
+        for name in shard_zip.namelist():
+            if name.startswith("shard/") or name in copied:
+                continue
+            with profiler.phase("zip.write"), output.open(name, "w") as f:
+                f.write(shard_zip.read(name))
+            copied.add(name)
+
+        for descriptor, (font_name, file_name) in manifest.fonts.items():
+            font_file = None
+            if file_name:
+                font_file = io.BytesIO(shard_zip.read(f"{FONTS_DIR}/{file_name}"))
+            context.add_font(descriptor, font_file, font_name)
+
+        pages += manifest.pages
+        shard_zip.close()
+
+    logging.info(f"Merging {len(pages)} pages from {len(shards)} shards")
+    sketch_pages = []
+    for _, result in sorted(pages, key=lambda page: page[0]):
+        context.merge_page(result.state)
+        if result.warnings is not None:
+            utils.merge_warnings(result.warnings)
+        sketch_pages.append(result.summary)
+
+    sketch_pages += convert.finish_pages(output)
+    convert.write_document(sketch_pages, output)
+
+
+def _shard_options() -> Dict[str, Any]:
+    options = {
+        f.name: getattr(config, f.name)
+        for f in dataclasses.fields(config)
+        if f.name not in SHARD_OPTIONS
+    }
+    options["salt"] = config.salt.hex()
+    return options
+
+
+def _check_shards(shards: List[Tuple[str, ShardManifest]]) -> None:
+    first = shards[0][1]
+    for shard_file, manifest in shards:
+        if manifest.count != first.count:
+            raise ShardError(f"{shard_file} is one of {manifest.count} shards, not {first.count}")
+        if manifest.code != first.code:
+            raise ShardError("The shards were converted by different versions of fig2sketch")
+        if manifest.options != first.options:
+            raise ShardError("The shards were converted with different options or salts")
+
+    indexes = [manifest.index for _, manifest in shards]
+    expected = list(range(1, first.count + 1))
+    if indexes != expected:
+        missing = [f"{i}/{first.count}" for i in expected if i not in indexes]
+        if missing:
+            raise ShardError(f"Missing shards {', '.join(missing)}")
+        raise ShardError(f"Expected {first.count} different shards, got {len(shards)}")
@@ -0,0 +1,167 @@
+import dataclasses
+import hashlib
+import operator
+from . import utils
+from .context import context
+from sketchformat.common import Point
+from sketchformat.document import SharedStyle
+from sketchformat.layer_common import AbstractLayer, AbstractStyledLayer
+from sketchformat.layer_group import Group, ShapeGroup
+from sketchformat.layer_shape import AbstractShapeLayer
+from sketchformat.serialize.json import dumps
+from sketchformat.style import Style
+from sketchformat.text import Text
+from typing import Any, Callable, Dict, List, Sequence
+
+# Layers that can use a shared layer style. Text layers use shared text styles, and the rest
+# (pages, artboards, symbols and instances) do not use shared styles in Sketch
+SHAREABLE_LAYERS = (AbstractShapeLayer, ShapeGroup, Group)
+
+
+def share_repeated_styles(layers: List[AbstractLayer]) -> None:
+    """Find layers with identical styles and link them to a shared style.
+
+    Only styles used more than once in these layers (a page and the symbols it uses) are
+    shared. The shared style ID is derived from the style contents, so pages converted
+    separately agree on the shared style of the same style"""
+    by_style: Dict[tuple, List[AbstractStyledLayer]] = {}
+    by_text_style: Dict[tuple, List[AbstractStyledLayer]] = {}
+    stack = list(reversed(layers))
+    while stack:
+        layer = stack.pop()
+        if isinstance(layer, SHAREABLE_LAYERS):
+            key = _style_key(layer.style)
+            if key != _DEFAULT_STYLE_KEY:
+                by_style.setdefault(key, []).append(layer)
+        elif isinstance(layer, Text) and not layer.sharedStyleID:
+            by_text_style.setdefault(_style_key(layer.style), []).append(layer)
+
+        # Reversed, so layers are visited in order
+        stack.extend(reversed(getattr(layer, "layers", [])))
+
+    for style_layers in by_style.values():
+        if len(style_layers) > 1:
+            shared_style = _shared_style((0, 0), b"sharedStyle", style_layers[0])
+            context.add_shared_style(shared_style)
+            for layer in style_layers:
+                layer.sharedStyleID = shared_style.do_objectID
+
+    for style_layers in by_text_style.values():
+        if len(style_layers) > 1:
+            shared_style = _shared_style((0, 0), b"sharedTextStyle", style_layers[0])
+            context.add_shared_text_style(shared_style)
+            for layer in style_layers:
+                layer.sharedStyleID = shared_style.do_objectID
+
+
+def share_text_style(fig_text: dict, text: Text) -> None:
+    """Link a text using a text style of the fig document to a shared text style.
+
+    Texts using the same text style can still have different colors or other properties, so
+    each variation of the text style gets its own shared text style"""
+    inherit_id = fig_text.get("inheritTextStyleID")
+    if not inherit_id or inherit_id[0] == 4294967295:
+        return
+
+    try:
+        fig_text_style = context.fig_node(inherit_id)
+    except KeyError:
+        # Already reported when copying the text style properties
+        return
+
+    shared_style = _shared_style(inherit_id, b"sharedTextStyle", text, fig_text_style["name"])
+    context.add_shared_text_style(shared_style)
+    text.sharedStyleID = shared_style.do_objectID
+
+
+def _shared_style(
+    fig_id: Sequence[int], kind: bytes, layer: AbstractStyledLayer, name: str = ""
+) -> SharedStyle:
+    contents = _style_contents(layer.style)
+    shared_id = utils.gen_object_id(fig_id, kind + hashlib.sha1(contents.encode()).digest())
+    return SharedStyle(
+        do_objectID=shared_id,
+        name=name or layer.name,
+        value=dataclasses.replace(
+            layer.style, do_objectID=utils.gen_object_id((0, 0), shared_id.encode())
+        ),
+    )
+
+
+def _style_key(style: Style) -> tuple:
+    """The style fields, without its ID, to group identical styles. Cheaper than serializing
+    every style, which is only done for the shared ones"""
+    return _freeze_style_fields(style)
+
+
+def _style_contents(style: Style) -> str:
+    """The style JSON, without its ID. Shared style IDs are derived from it"""
+    object_id = style.do_objectID
+    style.do_objectID = ""
+    try:
+        return dumps(style)
+    finally:
+        style.do_objectID = object_id
+
+
+# Freezers turn a value into a hashable one that is equal for values written as the same JSON.
+# They are compiled for each type, like the encoders of the serializer
+Freezer = Callable[[Any], Any]
+
+_freezers: Dict[type, Freezer] = {}
+# Types whose values are already hashable, and are used as they are
+_HASHABLE = {str, int, bool, type(None)}
+
+
+def _freeze(value: Any) -> Any:
+    freezer = _freezers.get(type(value))
+    if freezer is None:
+        freezer = _freezers[type(value)] = _make_freezer(type(value))
+
+    return freezer(value)
+
+
+def _make_freezer(cls: type) -> Freezer:
+    if cls is list:
+        return lambda value: tuple([_freeze(item) for item in value])
+    elif cls is dict:
+        return lambda value: tuple([(key, _freeze(item)) for key, item in value.items()])
+    elif cls is float:
+        # 1.0 == 1 and -0.0 == 0.0, but they are written differently. Other floats are only
+        # equal when they are written the same
+        return lambda value: (float, float.__repr__(value)) if value.is_integer() else value
+    elif cls is Point:
+        return Point.to_json
+    elif dataclasses.is_dataclass(cls):
+        return _dataclass_freezer(cls, [f.name for f in dataclasses.fields(cls)])
+    else:
+        # Enums and other hashable values
+        _HASHABLE.add(cls)
+        return lambda value: value
+
+
+def _dataclass_freezer(cls: type, names: List[str]) -> Freezer:
+    get_fields = _fields_getter(names)
+    hashable = _HASHABLE
+
+    def freeze_dataclass(value: Any) -> tuple:
+        return (
+            cls,
+            *[v if type(v) in hashable else _freeze(v) for v in get_fields(value)],
+        )
+
+    return freeze_dataclass
+
+
+def _fields_getter(names: List[str]) -> Callable[[Any], tuple]:
+    if len(names) > 1:
+        return operator.attrgetter(*names)
+
+    # attrgetter only returns a tuple when getting several attributes
+    return lambda value: tuple([getattr(value, name) for name in names])
+
+
+_freeze_style_fields = _dataclass_freezer(
+    Style, [f.name for f in dataclasses.fields(Style) if f.name != "do_objectID"]
+)
+_DEFAULT_STYLE_KEY = _style_key(Style(do_objectID=""))
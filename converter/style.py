@@ -1,3 +1,4 @@
+import functools
 import math
 from converter import utils
 from sketchformat.style import *
@@ -60,15 +61,7 @@ BLEND_MODE = {
 def convert(fig_node: dict) -> Style:
     sketch_style = Style(
         do_objectID=utils.gen_object_id(fig_node["guid"], b"style"),
-        borderOptions=BorderOptions(
-            lineCapStyle=LINE_CAP_STYLE[fig_node["strokeCap"]]
-            if "strokeCap" in fig_node
-            else BorderOptions.__dict__["lineCapStyle"],
-            lineJoinStyle=LINE_JOIN_STYLE[fig_node["strokeJoin"]]
-            if "strokeJoin" in fig_node
-            else BorderOptions.__dict__["lineCapStyle"],
-            dashPattern=fig_node.get("dashPattern", []),
-        ),
+        borderOptions=border_options(fig_node),
         borders=[convert_border(fig_node, b) for b in fig_node["strokePaints"]]
         if "strokePaints" in fig_node
         else [],
@@ -81,6 +74,25 @@ def convert(fig_node: dict) -> Style:
     return sketch_style
 
 
+def border_options(fig_node: dict) -> BorderOptions:
+    if (
+        "strokeCap" not in fig_node
+        and "strokeJoin" not in fig_node
+        and not fig_node.get("dashPattern")
+    ):
+        return DEFAULT_BORDER_OPTIONS
+
+    return BorderOptions(
+        lineCapStyle=LINE_CAP_STYLE[fig_node["strokeCap"]]
+        if "strokeCap" in fig_node
+        else LineCapStyle.BUTT,
+        lineJoinStyle=LINE_JOIN_STYLE[fig_node["strokeJoin"]]
+        if "strokeJoin" in fig_node
+        else LineJoinStyle.MITER,
+        dashPattern=fig_node.get("dashPattern", []),
+    )
+
+
 def convert_border(fig_node: dict, fig_border: dict) -> Border:
     return Border.from_fill(
         convert_fill(fig_node, fig_border),
@@ -290,4 +302,10 @@ def context_settings(fig_node: dict) -> ContextSettings:
         # Sketch interprets normal at 100% opacity as pass-through
         opacity = 0.99
 
+    return _context_settings(blend_mode, opacity)
+
+
+# Context settings are frozen, and most layers use one of a few combinations
+@functools.lru_cache(maxsize=1024)
+def _context_settings(blend_mode: BlendMode, opacity: float) -> ContextSettings:
     return ContextSettings(blendMode=blend_mode, opacity=opacity)
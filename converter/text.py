@@ -1,7 +1,9 @@
 import copy
 import itertools
 from converter import utils
-from . import base, style
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from . import base, shared_style, style
+from .config import config
 from .context import context
 from sketchformat.text import *
 
@@ -25,6 +27,14 @@ TextCase = {
     "TITLE": TextTransform.NONE,
 }
 
+# Characters rendered by each text case, besides the original ones. Title case upper-cases the
+# first letter of each word and lower-cases the rest
+CASE_CHARACTERS: Dict[str, Callable[[str], str]] = {
+    "UPPER": str.upper,
+    "LOWER": str.lower,
+    "TITLE": lambda characters: characters.title() + characters.lower(),
+}
+
 TEXT_BEHAVIOUR = {
     "NONE": TextBehaviour.FIXED_WIDTH_AND_HEIGHT,
     "WIDTH_AND_HEIGHT": TextBehaviour.FLEXIBLE_WIDTH,
@@ -90,10 +100,22 @@ def convert(fig_text):
     if len(obj.attributedString.attributes) > 1:
         obj.style.fills = []
 
+    if config.shared_styles:
+        shared_style.share_text_style(fig_text, obj)
+
     return obj
 
 
-def text_style(fig_text):
+def text_style(fig_text: dict) -> TextStyle:
+    """Convert the text style of a node into a new style, which the caller can modify"""
+    return copy.deepcopy(_cached_text_style(fig_text))
+
+
+def _cached_text_style(fig_text: dict) -> TextStyle:
+    """Convert the text style of a node, shared with other nodes with the same style.
+
+    Text styles are converted for every character of every text, but documents only use a few
+    distinct ones. The returned style must not be modified, use text_style() to get a copy"""
     if fig_text["fontName"]["family"] == EMOJI_FONT:
         font_name = EMOJI_FONT
     else:
@@ -108,22 +130,55 @@ def text_style(fig_text):
         utils.log_conversion_warning("TXT002", fig_text)
 
     if fills[0]["type"] == "SOLID":
-        color = style.convert_color(fills[0]["color"])
+        fig_color = fills[0]["color"]
     else:
         # Text fill is not solid (gradient or image). Sketch doesn't support this
         utils.log_conversion_warning("TXT003", fig_text)
         if fills[0].get("stops", []):
-            color = style.convert_color(fills[0]["stops"][0]["color"])
+            fig_color = fills[0]["stops"][0]["color"]
         else:
-            color = Color.Black()
+            fig_color = None
+
+    if fig_text.get("textCase") == "TITLE":
+        utils.log_conversion_warning("TXT004", fig_text)
+
+    key = (
+        font_name,
+        fig_text["fontSize"],
+        (fig_color["r"], fig_color["g"], fig_color["b"], fig_color["a"]) if fig_color else None,
+        fig_text["textAlignVertical"],
+        fig_text["textAlignHorizontal"],
+        fig_text.get("textCase"),
+        fig_text.get("textDecoration"),
+        _units_value(fig_text.get("letterSpacing")),
+        _units_value(fig_text.get("lineHeight")),
+        fig_text.get("paragraphSpacing", 0),
+    )
+    obj = _text_styles.get(key)
+    if obj is None:
+        obj = _text_styles[key] = _convert_text_style(fig_text, font_name, fig_color)
+
+    return obj
+
 
+# Converted text styles, by the properties of the text they depend on
+_text_styles: Dict[tuple, TextStyle] = {}
+
+
+def _units_value(spacing: Optional[dict]) -> Optional[tuple]:
+    return (spacing["units"], spacing["value"]) if spacing else None
+
+
+def _convert_text_style(fig_text: dict, font_name: str, fig_color: Optional[dict]) -> TextStyle:
     obj = TextStyle(
         encodedAttributes=EncodedAttributes(
             **text_transformation(fig_text),
             MSAttributedStringFontAttribute=FontDescriptor(
                 name=font_name, size=fig_text["fontSize"]
             ),
-            MSAttributedStringColorAttribute=color,
+            MSAttributedStringColorAttribute=style.convert_color(fig_color)
+            if fig_color
+            else Color.Black(),
             textStyleVerticalAlignmentKey=AlignVertical[fig_text["textAlignVertical"]],
             **text_decoration(fig_text),
             kerning=kerning(fig_text),
@@ -167,9 +222,12 @@ def override_characters_style(fig_text):
     current_glyph, next_glyph = next(glyph_pairs)
 
     # Keep track of what the previous style was and when it started
-    last_style = text_style(fig_text)
+    last_style = _cached_text_style(fig_text)
     first_pos = 0
 
+    # Characters rendered with each font, used to subset the embedded fonts
+    font_characters: Dict[Tuple[str, str], List[str]] = {}
+
     # Lengths in .fig docs are given in codepoints. In Sketch, they are given in UTF16 code-units
     # So we keep the Sketch position independently, taking into account UTF16 encoding
     sketch_pos = 0
@@ -208,19 +266,26 @@ def override_characters_style(fig_text):
                 style_override["fontSize"] = scaled_font_size
 
         # If the style changed (as seen by Sketch), convert the previous style run
-        current_style = text_style({**fig_text, **style_override})
+        current_node = {**fig_text, **style_override}
+        current_style = _cached_text_style(current_node)
         if current_style != last_style and pos != 0:
             attributes.append(
                 StringAttribute(
                     location=first_pos,
                     length=sketch_pos - first_pos,
-                    attributes=last_style.encodedAttributes,
+                    attributes=copy.deepcopy(last_style.encodedAttributes),
                 )
             )
             first_pos = sketch_pos
 
         last_style = current_style
 
+        if config.subset_fonts and not is_emoji:
+            font_name = current_node["fontName"]
+            font_characters.setdefault((font_name["family"], font_name["style"]), []).append(
+                rendered_characters(character, current_node.get("textCase"))
+            )
+
         # Characters from supplementary planes are encoded in UTF16 as 2 code units
         # Advance the Sketch position accordingly
         if ord(character) > 0xFFFF:
@@ -233,14 +298,23 @@ def override_characters_style(fig_text):
         StringAttribute(
             location=first_pos,
             length=sketch_pos - first_pos,
-            attributes=last_style.encodedAttributes,
+            attributes=copy.deepcopy(last_style.encodedAttributes),
         )
     )
 
+    for (family, style), characters in font_characters.items():
+        context.record_font_characters({"family": family, "style": style}, "".join(characters))
+
     return attributes
 
 
-def text_decoration(fig_text):
+def rendered_characters(characters: str, text_case: Optional[str]) -> str:
+    """The characters that a text with the given case can render, for font subsetting"""
+    case_characters = CASE_CHARACTERS.get(text_case)  # type: ignore [arg-type]
+    return characters + case_characters(characters) if case_characters else characters
+
+
+def text_decoration(fig_text: dict) -> Dict[str, Any]:
     decoration = {}
 
     if "textDecoration" in fig_text:
@@ -253,7 +327,7 @@ def text_decoration(fig_text):
     return decoration
 
 
-def kerning(fig_text):
+def kerning(fig_text: dict) -> float:
     if "letterSpacing" in fig_text:
         match fig_text["letterSpacing"]:
             case {"units": "PIXELS", "value": pixels}:
@@ -266,7 +340,7 @@ def kerning(fig_text):
         return 0
 
 
-def line_height(fig_text):
+def line_height(fig_text: dict) -> Dict[str, Any]:
     if "lineHeight" in fig_text:
         match fig_text["lineHeight"]["units"]:
             case "PIXELS":
@@ -311,10 +385,8 @@ def line_height(fig_text):
         return {}
 
 
-def text_transformation(fig_text):
+def text_transformation(fig_text: dict) -> Dict[str, Any]:
     if "textCase" in fig_text:
-        if fig_text["textCase"] == "TITLE":
-            utils.log_conversion_warning("TXT004", fig_text)
         return {"MSAttributedStringTextTransformAttribute": TextCase[fig_text["textCase"]]}
     else:
         return {}
@@ -14,9 +14,9 @@ from converter import (
 import logging
 from sketchformat.layer_common import AbstractLayer
 from sketchformat.layer_group import AbstractLayerGroup
-from typing import Dict, Callable, Any
-import traceback
+from typing import Dict, Callable, Any, List
 from .errors import Fig2SketchWarning
+from .profiling import profiler
 from . import utils
 
 CONVERTERS: Dict[str, Callable[[dict], AbstractLayer]] = {
@@ -43,40 +43,105 @@ POST_PROCESSING: Dict[str, Callable[[dict, Any], AbstractLayer]] = {
     "GROUP": group.post_process_frame,
     "ARTBOARD": artboard.post_process_frame,
     "INSTANCE": instance.post_process,
-    "CANVAS": page.add_page_background,
 }
 
 
+class _Frame:
+    """A node being converted, waiting for its children to be converted"""
+
+    __slots__ = ["fig_node", "type_", "sketch_item", "children", "layers", "next_child"]
+
+    def __init__(self, fig_node: dict, type_: str, sketch_item: AbstractLayer):
+        self.fig_node = fig_node
+        self.type_ = type_
+        self.sketch_item = sketch_item
+        self.children: List[dict] = fig_node.get("children", [])
+        self.layers: List[AbstractLayer] = []
+        self.next_child = 0
+
+
 def convert_node(fig_node: dict, parent_type: str) -> AbstractLayer:
-    name = fig_node["name"]
+    """Convert a fig node and its subtree.
+
+    The tree is walked with an explicit stack, so deeply nested documents do not hit the
+    recursion limit. Errors converting a child are logged and the child is skipped, errors
+    converting this node are raised"""
+    # Checked once per walk instead of formatting a debug message for every node
+    log_debug = logging.root.isEnabledFor(logging.DEBUG)
+    stack = [_start_node(fig_node, parent_type, log_debug)]
+
+    while True:
+        frame = stack[-1]
+
+        if frame.next_child < len(frame.children):
+            child = frame.children[frame.next_child]
+            frame.next_child += 1
+            try:
+                stack.append(_start_node(child, frame.fig_node["type"], log_debug))
+            except Exception as e:
+                _child_failed(frame.fig_node, child, e)
+            continue
+
+        stack.pop()
+        try:
+            sketch_item = _finish_node(frame)
+        except Exception as e:
+            if not stack:
+                raise
+            _child_failed(stack[-1].fig_node, frame.fig_node, e)
+            continue
+
+        if not stack:
+            return sketch_item
+
+        stack[-1].layers.append(sketch_item)
+
+
+def _start_node(fig_node: dict, parent_type: str, log_debug: bool) -> _Frame:
     type_ = get_node_type(fig_node, parent_type)
-    logging.debug(f"{type_}: {name}")
+    if log_debug:
+        logging.debug("%s: %s", type_, fig_node["name"])
 
-    sketch_item = CONVERTERS[type_](fig_node)
+    if profiler.enabled:
+        profiler.start_node(fig_node, type_)
+        try:
+            sketch_item = CONVERTERS[type_](fig_node)
+        except:
+            profiler.end_node(fig_node, type_, CONVERTERS[type_])
+            raise
+    else:
+        sketch_item = CONVERTERS[type_](fig_node)
 
     if fig_node.get("layoutGrids", []) and type_ != "ARTBOARD":
         utils.log_conversion_warning("GRD001", fig_node)
 
-    children = []
-    for child in fig_node.get("children", []):
-        try:
-            children.append(convert_node(child, fig_node["type"]))
-        except Fig2SketchWarning as w:
-            utils.log_conversion_warning(w.code, fig_node)
-        except Exception as e:
-            logging.error(
-                f'An unexpected error occurred when converting {child["type"]}: {child["name"]}. It will be skipped\n'
-                + "".join(traceback.format_exception(e))
-            )
+    return _Frame(fig_node, type_, sketch_item)
+
+
+def _finish_node(frame: _Frame) -> AbstractLayer:
+    try:
+        sketch_item = frame.sketch_item
+        if frame.layers and isinstance(sketch_item, AbstractLayerGroup):
+            sketch_item.layers = frame.layers
 
-    if children and isinstance(sketch_item, AbstractLayerGroup):
-        sketch_item.layers = children
+        post_process = POST_PROCESSING.get(frame.type_)
+        if post_process:
+            sketch_item = post_process(frame.fig_node, sketch_item)
 
-    post_process = POST_PROCESSING.get(type_)
-    if post_process:
-        sketch_item = post_process(fig_node, sketch_item)
+        return sketch_item
+    finally:
+        if profiler.enabled:
+            profiler.end_node(frame.fig_node, frame.type_, CONVERTERS[frame.type_])
 
-    return sketch_item
+
+def _child_failed(fig_node: dict, child: dict, e: Exception) -> None:
+    if isinstance(e, Fig2SketchWarning):
+        utils.log_conversion_warning(e.code, fig_node)
+    else:
+        logging.error(
+            f'An unexpected error occurred when converting {child["type"]}: {child["name"]}. It will be skipped',
+            exc_info=e,
+        )
 
 
 def get_node_type(fig_node: dict, parent_type: str) -> str:
@@ -1,13 +1,13 @@
-from sketchformat.layer_group import Page, Point
+from sketchformat.common import Point
 from typing import List
-from . import positioning
+from .page import PageSummary
 
 
 # Default area in pixels of the canvas. This is taken from a macbook 16" as a mid-sized device
 CANVAS_RESOLUTION = (1200, 900)
 
 
-def convert(pages: List[Page]) -> dict:
+def convert(pages: List[PageSummary]) -> dict:
     return {
         "document": {
             "pageListHeight": 200,
@@ -20,11 +20,11 @@ def convert(pages: List[Page]) -> dict:
     }
 
 
-def default_viewport(page: Page) -> dict:
-    if not page.layers:
+def default_viewport(page: PageSummary) -> dict:
+    bbox = page.bbox
+    if bbox is None:
         return {"scrollOrigin": Point(0, 0), "zoomValue": 1}
 
-    bbox = positioning.group_bbox(page.layers)
     w = bbox[1] - bbox[0]
     h = bbox[3] - bbox[2]
 
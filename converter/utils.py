@@ -1,16 +1,40 @@
+import functools
 import hashlib
 import logging
 import struct
 import uuid
 from .config import config
-from typing import Sequence, Dict
+from collections import Counter
+from typing import Callable, Iterable, List, Optional, Sequence, Dict
 
 issued_warnings: Dict[tuple[int, int], list[str]] = {}
 
+# Warnings issued by the page being converted, when they are saved with it (see cache.py).
+# Unlike issued_warnings, it includes the warnings already issued by previous pages
+page_warnings: Optional[Dict[tuple[int, int], list[str]]] = None
+
+# Number of nodes issuing each warning, and a few of those nodes
+warning_counts: Counter[str] = Counter()
+warning_samples: Dict[str, list[Sequence[int]]] = {}
+WARNING_SAMPLE_SIZE = 10
+
 
 def gen_object_id(fig_id: Sequence[int], suffix: bytes = b"") -> str:
+    return _object_id(config.salt, fig_id if type(fig_id) is tuple else tuple(fig_id), suffix)
+
+
+def gen_object_ids(fig_ids: Iterable[Sequence[int]]) -> List[str]:
+    """Generate the object IDs of a list of guids, like an override path"""
+    salt = config.salt
+    return [_object_id(salt, tuple(fig_id), b"") for fig_id in fig_ids]
+
+
+# The same IDs are generated many times (symbol IDs, override paths, styles...). Memoize them,
+# with the salt as part of the key so that changing it does not return stale IDs
+@functools.lru_cache(maxsize=65536)
+def _object_id(salt: bytes, fig_id: tuple, suffix: bytes) -> str:
     # Generate UUIDs by hashing the fig GUID with a salt
-    salted_id = config.salt + struct.pack("<" + "I" * len(fig_id), *fig_id) + suffix
+    salted_id = salt + struct.pack("<" + "I" * len(fig_id), *fig_id) + suffix
     uuid_bytes = bytearray(hashlib.shake_128(salted_id).digest(16))
 
     # Override bits to match UUIDv4
@@ -20,6 +44,10 @@ def gen_object_id(fig_id: Sequence[int], suffix: bytes = b"") -> str:
     return str(uuid.UUID(bytes=bytes(uuid_bytes))).upper()
 
 
+def object_id_cache_info() -> functools._CacheInfo:
+    return _object_id.cache_info()
+
+
 def generate_file_ref(data: bytes) -> str:
     return hashlib.sha1(hashlib.sha1(data).digest()).hexdigest()
 
@@ -71,12 +99,73 @@ WARNING_MESSAGES = {
 
 
 def log_conversion_warning(warning_code: str, fig_node: dict, **kw: list) -> None:
+    if page_warnings is not None:
+        codes = page_warnings.setdefault(fig_node["guid"], [])
+        if warning_code not in codes:
+            codes.append(warning_code)
+
     if fig_node["guid"] not in issued_warnings:
         issued_warnings[fig_node["guid"]] = [warning_code]
     elif warning_code not in issued_warnings[fig_node["guid"]]:
         issued_warnings[fig_node["guid"]].append(warning_code)
     else:
         return
+
+    warning_counts[warning_code] += 1
+    samples = warning_samples.setdefault(warning_code, [])
+    if len(samples) < WARNING_SAMPLE_SIZE:
+        samples.append(fig_node["guid"])
+
+    if not logging.root.isEnabledFor(logging.INFO):
+        return
+
     logging.info(
-        f"[{warning_code}] {fig_node['type']} '{fig_node['name']}' {WARNING_MESSAGES[warning_code].format(**kw)}"
+        "[%s] %s '%s' %s",
+        warning_code,
+        fig_node["type"],
+        fig_node["name"],
+        WARNING_MESSAGES[warning_code].format(**kw),
     )
+
+
+def log_cached_warnings(
+    warnings: Dict[tuple[int, int], list[str]], fig_node: Callable[[Sequence[int]], dict]
+) -> None:
+    """Log the warnings of a page loaded from the cache, which were only logged when the page was
+    converted. Their properties are not cached. They are counted by merge_warnings"""
+    if not logging.root.isEnabledFor(logging.INFO):
+        return
+
+    for guid, codes in warnings.items():
+        issued = issued_warnings.get(guid, [])
+        for code in codes:
+            if code in issued:
+                continue
+            try:
+                node = fig_node(guid)
+                node_type, node_name = node["type"], node["name"]
+            except KeyError:
+                # Warnings of symbol overrides are issued by nodes that are not in the tree
+                node_type, node_name = "NODE", f"{guid}"
+            logging.info(
+                "[%s] %s '%s' %s",
+                code,
+                node_type,
+                node_name,
+                WARNING_MESSAGES[code].format(props="(not cached)"),
+            )
+
+
+def merge_warnings(warnings: Dict[tuple[int, int], list[str]]) -> None:
+    """Count warnings issued in another process, or by a page loaded from the cache. They are
+    logged where they are issued, or by log_cached_warnings"""
+    for guid, codes in warnings.items():
+        issued = issued_warnings.setdefault(guid, [])
+        for code in codes:
+            if code in issued:
+                continue
+            issued.append(code)
+            warning_counts[code] += 1
+            samples = warning_samples.setdefault(code, [])
+            if len(samples) < WARNING_SAMPLE_SIZE:
+                samples.append(guid)
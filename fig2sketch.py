@@ -1,12 +1,16 @@
 #!/usr/bin/env python3
 
 import argparse
-import json
 import logging
-from zipfile import ZipFile
-import ssl
 import sys
-from typing import List
+from figformat.dump import LAYOUTS
+from sketchformat.archive import (
+    COMPRESSION_METHODS,
+    MAX_DEFLATE_LEVEL,
+    MAX_ZSTD_LEVEL,
+    SketchArchive,
+)
+from typing import List, Tuple
 
 try:
     from version import VERSION
@@ -15,7 +19,14 @@ except:
 
 
 def parse_args(args: List[str] = sys.argv[1:]) -> argparse.Namespace:
-    parser = argparse.ArgumentParser(description="Converts a .fig document to .sketch")
+    if args and args[0] == "merge":
+        return parse_merge_args(args[1:])
+
+    parser = argparse.ArgumentParser(
+        description="Converts a .fig document to .sketch",
+        epilog="Documents converted with --shard are combined with: %(prog)s merge --help",
+    )
+    parser.set_defaults(command="convert")
     parser.add_argument("fig_file")
     parser.add_argument("sketch_file")
 
@@ -31,6 +42,59 @@ def parse_args(args: List[str] = sys.argv[1:]) -> argparse.Namespace:
         action="store_true",
         help="try to convert corrupted images",
     )
+    group.add_argument(
+        "--subset-fonts",
+        action="store_true",
+        help="only embed the glyphs used by the document texts, reducing the size of the output",
+    )
+    group.add_argument(
+        "--shared-styles",
+        action="store_true",
+        help="create shared layer and text styles for text styles and for styles used by more than one layer in a page",
+    )
+
+    group.add_argument(
+        "--compact-nodes",
+        action="store_true",
+        help="store the fig document in less memory, at the cost of a slower conversion",
+    )
+
+    group.add_argument(
+        "--pages",
+        action="append",
+        metavar="PAGE",
+        help="only convert this page, given by name, guid (e.g. 0:1) or index (starting at 0). Can be repeated",
+    )
+
+    group.add_argument(
+        "--shard",
+        type=parse_shard,
+        metavar="INDEX/COUNT",
+        help="only convert one in every COUNT pages, starting at page INDEX (starting at 1), to a partial archive. Run %(prog)s merge to combine all the shards into a .sketch document. Requires --salt",
+    )
+
+    group.add_argument(
+        "--jobs",
+        "-j",
+        type=parse_jobs,
+        default=1,
+        help="number of pages to convert in parallel, using separate processes (default = 1)",
+    )
+
+    group.add_argument(
+        "--cache-dir",
+        metavar="DIR",
+        help="save the converted pages in this directory, and reuse the ones that did not change when converting the document again. Requires --salt",
+    )
+
+    group = parser.add_argument_group("output options")
+    add_compression_arguments(group)
+
+    group.add_argument(
+        "--metrics-json",
+        metavar="PATH",
+        help="write conversion metrics (layers, warnings, images, fonts, sizes and timings) as json",
+    )
 
     group = parser.add_argument_group("debug options")
     group.add_argument(
@@ -42,64 +106,231 @@ def parse_args(args: List[str] = sys.argv[1:]) -> argparse.Namespace:
     group.add_argument("--salt", type=str, help="salt used to generate ids, defaults to random")
     group.add_argument(
         "--dump-fig-json",
-        type=argparse.FileType("w"),
+        metavar="PATH",
         help="output a fig representation in json for debugging purposes",
     )
+    group.add_argument(
+        "--dump-fig-layout",
+        choices=LAYOUTS,
+        default="nested",
+        help="how to write the fig representation: nested nodes, a flat list of nodes, one json node per line or msgpack (default = nested)",
+    )
+    group.add_argument(
+        "--dump-fig-blobs",
+        metavar="DIR",
+        help="save the byte arrays of the fig representation as files in this directory, instead of inlining them as base64",
+    )
+    group.add_argument(
+        "--profile",
+        nargs="?",
+        const="-",
+        metavar="PATH",
+        help="write the time and memory used by each conversion phase as json (default = stdout)",
+    )
+    group.add_argument(
+        "--cprofile",
+        metavar="PHASE",
+        help="profile a single phase with cProfile, e.g. convert.page (implies --profile)",
+    )
+    group.add_argument(
+        "--cprofile-output",
+        default="fig2sketch.prof",
+        metavar="PATH",
+        help="where to save the cProfile stats (default = fig2sketch.prof)",
+    )
 
     parser.add_argument("--version", action="version", version=f"%(prog)s {VERSION}")
 
-    return parser.parse_args(args)
+    parsed = parser.parse_args(args)
+    check_compression_arguments(parser, parsed)
+    return parsed
 
 
-def run(args: argparse.Namespace) -> None:
+def parse_merge_args(args: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog=f"{sys.argv[0]} merge",
+        description="Combines the shards of a .fig document, converted with --shard, into a .sketch document",
+    )
+    parser.set_defaults(command="merge")
+    parser.add_argument("sketch_file")
+    parser.add_argument("shard_files", nargs="+", metavar="shard_file")
+
+    group = parser.add_argument_group("output options")
+    add_compression_arguments(group)
+
+    group = parser.add_argument_group("debug options")
+    group.add_argument(
+        "-v",
+        action="count",
+        dest="verbosity",
+        help="return more details, can be repeated",
+    )
+
+    parsed = parser.parse_args(args)
+    check_compression_arguments(parser, parsed)
+    return parsed
+
+
+def add_compression_arguments(group: argparse._ArgumentGroup) -> None:
+    group.add_argument(
+        "--compression",
+        choices=COMPRESSION_METHODS,
+        default="deflate",
+        help="how to compress the entries of the .sketch file (default = deflate)",
+    )
+    group.add_argument(
+        "--compression-level",
+        type=parse_compression_level,
+        help="compression level, from 1 (fastest) to 9 for deflate or 22 for zstd",
+    )
+
+
+def check_compression_arguments(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    if (
+        args.compression == "deflate"
+        and args.compression_level is not None
+        and args.compression_level > MAX_DEFLATE_LEVEL
+    ):
+        parser.error(f"argument --compression-level: deflate levels go up to {MAX_DEFLATE_LEVEL}")
+
+
+def parse_compression_level(value: str) -> int:
+    try:
+        level = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid compression level '{value}'")
+
+    if not 1 <= level <= MAX_ZSTD_LEVEL:
+        raise argparse.ArgumentTypeError(
+            f"invalid compression level '{value}', must be 1 to {MAX_ZSTD_LEVEL}"
+        )
+
+    return level
+
+
+def parse_jobs(value: str) -> int:
+    try:
+        jobs = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number of jobs '{value}'")
+
+    if jobs < 1:
+        raise argparse.ArgumentTypeError(f"invalid number of jobs '{value}', must be at least 1")
+
+    return jobs
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    try:
+        index, count = [int(n) for n in value.split("/")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid shard '{value}', expected INDEX/COUNT")
+
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"invalid shard '{value}', INDEX must be 1 to COUNT")
+
+    return index, count
+
+
+def setup_logging(verbosity: int) -> None:
     # Set default log level
     level = logging.WARNING
-    if args.verbosity:
-        level = logging.INFO if args.verbosity == 1 else logging.DEBUG
+    if verbosity:
+        level = logging.INFO if verbosity == 1 else logging.DEBUG
 
     logging.basicConfig(level=level)
 
+
+def run(args: argparse.Namespace) -> None:
+    if args.command == "merge":
+        return run_merge(args)
+
+    setup_logging(args.verbosity)
+
     # Import these after setting the log level
-    from figformat import fig2tree
-    from converter import convert
+    from figformat import dump, fig2tree
+    from converter import convert, shard
     from converter.config import config
+    from converter.profiling import profiler
+    from converter.selection import PageNotFound
 
     if args.salt:
         config.salt = args.salt.encode("utf8")
 
-    if args.force_convert_images:
-        from PIL import ImageFile
-
-        ImageFile.LOAD_TRUNCATED_IMAGES = True
-
     config.can_detach = args.instance_override == "detach"
+    config.subset_fonts = args.subset_fonts
+    config.shared_styles = args.shared_styles
+    config.compact_nodes = args.compact_nodes
+    config.force_convert_images = args.force_convert_images
+    config.pages = args.pages
+    config.shard = args.shard
+    config.jobs = args.jobs
+    config.cache_dir = args.cache_dir
+
+    if args.cache_dir and not args.salt:
+        # With a random salt, object IDs and the cached pages change in every conversion
+        logging.warning("--cache-dir has no effect without --salt")
 
-    # Load SSL certificates in OSs where Python does not use system defaults
-    if not ssl.create_default_context().get_ca_certs():
-        import certifi
-        import os
+    if args.shard and not args.salt:
+        # All the shards must generate the same object IDs
+        logging.critical("--shard requires --salt")
+        sys.exit(1)
 
-        os.environ["SSL_CERT_FILE"] = certifi.where()
-        logging.debug("Loaded TLS certificates from certifi")
-    else:
-        logging.debug("Using system TLS certificates")
+    if args.cprofile and not args.profile:
+        args.profile = "-"
+    if args.profile or args.metrics_json:
+        profiler.enable(args.cprofile)
 
     logging.debug(config)
     logging.debug(f"Version {VERSION}")
 
-    with ZipFile(args.sketch_file, "w") as output:
-        fig_tree, id_map = fig2tree.convert_fig(args.fig_file, output)
+    with SketchArchive(args.sketch_file, args.compression, args.compression_level) as output:
+        try:
+            fig_tree, id_map = fig2tree.convert_fig(args.fig_file, output)
+        except PageNotFound as e:
+            logging.critical(e)
+            sys.exit(1)
 
         if args.dump_fig_json:
-            json.dump(
-                fig_tree,
-                args.dump_fig_json,
-                indent=2,
-                ensure_ascii=False,
-                default=lambda x: x.tolist(),
-            )
-
-        convert.convert_fig_tree_to_sketch(fig_tree, id_map, output)
+            try:
+                with profiler.phase("dump"):
+                    dump.dump(
+                        fig_tree, args.dump_fig_json, args.dump_fig_layout, args.dump_fig_blobs
+                    )
+            except ImportError as e:
+                logging.critical(f"Could not write the {args.dump_fig_layout} dump: {e}")
+                sys.exit(1)
+
+        if config.shard:
+            shard.convert_shard(fig_tree, id_map, output)
+        else:
+            convert.convert_fig_tree_to_sketch(fig_tree, id_map, output)
+
+        # Write the entries still being compressed and the zip directory
+        with profiler.phase("zip.write"):
+            output.close()
+
+    if args.profile:
+        profiler.write_report(args.profile)
+    if args.cprofile:
+        profiler.write_cprofile(args.cprofile_output)
+    if args.metrics_json:
+        from converter import metrics
+
+        metrics.write(args.metrics_json, output, len(fig2tree.converted_images))
+
+
+def run_merge(args: argparse.Namespace) -> None:
+    setup_logging(args.verbosity)
+
+    from converter import shard
+
+    with SketchArchive(args.sketch_file, args.compression, args.compression_level) as output:
+        try:
+            shard.merge(args.shard_files, output)
+        except shard.ShardError as e:
+            logging.critical(e)
+            sys.exit(1)
 
 
 if __name__ == "__main__":
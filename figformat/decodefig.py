@@ -2,6 +2,7 @@ import io
 import zipfile
 from . import kiwi
 from converter.positioning import Matrix
+from converter.profiling import profiler
 import logging
 
 
@@ -14,23 +15,26 @@ def decode(path):
     }
 
     # Open file and check if it's a zip
-    fig_zip = None
-    reader = open(path, "rb")
-    header = reader.read(2)
-    reader.seek(0)
-    if header == b"PK":
-        fig_zip = zipfile.ZipFile(reader)
+    with profiler.phase("container.open"):
+        fig_zip = None
+        reader = open(path, "rb")
+        header = reader.read(2)
+        reader.seek(0)
+        if header == b"PK":
+            fig_zip = zipfile.ZipFile(reader)
 
     try:
         import fig_kiwi
 
         logging.debug("Using fast (rust) kiwi reader")
-        return fig_kiwi.decode(path, type_converters), fig_zip
+        with profiler.phase("kiwi.decode"):
+            return fig_kiwi.decode(path, type_converters), fig_zip
 
     except ImportError:
         logging.debug("Falling back to slow (python) kiwi reader")
 
     if fig_zip:
-        reader = fig_zip.open("canvas.fig")
+        with profiler.phase("container.open"):
+            reader = fig_zip.open("canvas.fig")
 
     return kiwi.decode(reader, type_converters), fig_zip
@@ -0,0 +1,190 @@
+"""Write the decoded fig document, for debugging and for external tools.
+
+The document is written one node at a time, in one of these layouts:
+- nested: a json object with the document node, each node containing its children
+- flat: a json object with the list of nodes, each node referencing its children by guid
+- ndjson: the flat list of nodes, one json node per line
+- msgpack: the flat list of nodes, one MessagePack object after another
+
+Byte arrays (image hashes, font digests...) are written as {"base64": ...}, or as
+{"blob": <file name>} when saved to a directory. In MessagePack they are binary values"""
+import base64
+import hashlib
+import json
+import os
+from .fignode import FigNode
+from typing import Any, Callable, IO, Iterator, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore [assignment]
+
+LAYOUTS = ["nested", "flat", "ndjson", "msgpack"]
+
+# Byte arrays, that the kiwi decoder returns as lists of ints
+BYTE_ARRAY_KEYS = {"hash", "fontDigest", "bytes"}
+
+
+def dump(
+    fig_tree: dict, path: str, layout: str = "nested", blobs_dir: Optional[str] = None
+) -> None:
+    if layout == "msgpack":
+        # Optional dependency, fail before creating the file
+        import msgpack  # type: ignore [import-not-found]
+
+        encode: Callable[[Any], bytes] = msgpack.Packer(default=_default).pack
+    else:
+        encode = _json_encoder()
+
+    save_blob = _blob_writer(blobs_dir, binary=layout == "msgpack")
+
+    with open(path, "wb") as f:
+        if layout == "nested":
+            _write_nested(fig_tree["document"], f, encode, save_blob)
+        elif layout == "flat":
+            f.write(b'{"nodes":[')
+            for i, node in enumerate(_iter_nodes(fig_tree["document"])):
+                if i:
+                    f.write(b",")
+                f.write(encode(_flat_node(node, save_blob)))
+            f.write(b"]}")
+        elif layout == "ndjson":
+            for node in _iter_nodes(fig_tree["document"]):
+                f.write(encode(_flat_node(node, save_blob)))
+                f.write(b"\n")
+        elif layout == "msgpack":
+            for node in _iter_nodes(fig_tree["document"]):
+                f.write(encode(_flat_node(node, save_blob)))
+        else:
+            raise ValueError(f"Unknown dump layout {layout}")
+
+
+def _write_nested(
+    root: dict,
+    f: IO[bytes],
+    encode: Callable[[Any], bytes],
+    save_blob: Callable[[bytes], Any],
+) -> None:
+    f.write(b'{"document":')
+
+    # Nodes to write, and the separators and closing brackets between them
+    stack: list = [root]
+    while stack:
+        item = stack.pop()
+        if type(item) is bytes:
+            f.write(item)
+            continue
+
+        data = encode(_with_blobs(_without_children(item), save_blob))
+        if "children" not in item:
+            f.write(data)
+            continue
+
+        # Open the children list before the closing bracket of the node
+        f.write(data[:-1])
+        f.write(b',"children":[' if len(data) > 2 else b'"children":[')
+        stack.append(b"]}")
+        children = item["children"]
+        for i in reversed(range(len(children))):
+            stack.append(children[i])
+            if i:
+                stack.append(b",")
+
+    f.write(b"}")
+
+
+def _iter_nodes(root: dict) -> Iterator[dict]:
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        yield node
+        # Reversed, so children are visited in order
+        stack.extend(reversed(node.get("children", [])))
+
+
+def _without_children(node: dict) -> dict:
+    node = dict(node)
+    node.pop("children", None)
+    return node
+
+
+def _flat_node(node: dict, save_blob: Callable[[bytes], Any]) -> dict:
+    flat = _with_blobs(_without_children(node), save_blob)
+    if "children" in node:
+        flat["children"] = [child["guid"] for child in node["children"]]
+    return flat
+
+
+def _with_blobs(value: Any, save_blob: Callable[[bytes], Any]) -> Any:
+    """The value with its byte arrays encoded. Only the containers that change are copied"""
+    if type(value) is dict or type(value) is FigNode:
+        changed = None
+        for key, item in value.items():
+            if key in BYTE_ARRAY_KEYS and type(item) is list:
+                try:
+                    new_item = save_blob(bytes(item))
+                except (TypeError, ValueError):
+                    # Not a byte array after all
+                    new_item = item
+            else:
+                new_item = _with_blobs(item, save_blob)
+
+            if new_item is not item:
+                if changed is None:
+                    changed = dict(value)
+                changed[key] = new_item
+
+        return value if changed is None else changed
+
+    if type(value) is list:
+        # Lists of numbers (e.g. vector network coordinates) cannot contain byte arrays
+        if not value or type(value[0]) not in (dict, list):
+            return value
+
+        new_value = [_with_blobs(item, save_blob) for item in value]
+        if all(a is b for a, b in zip(new_value, value)):
+            return value
+        return new_value
+
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return save_blob(bytes(value))
+
+    return value
+
+
+def _blob_writer(blobs_dir: Optional[str], binary: bool) -> Callable[[bytes], Any]:
+    if blobs_dir is None:
+        if binary:
+            return lambda data: data
+        return lambda data: {"base64": base64.b64encode(data).decode("ascii")}
+
+    # Bound separately, the None check above does not narrow the type inside save_blob
+    directory = blobs_dir
+    os.makedirs(directory, exist_ok=True)
+    saved = set()
+
+    def save_blob(data: bytes) -> Any:
+        name = hashlib.sha1(data).hexdigest()
+        if name not in saved:
+            with open(os.path.join(directory, name), "wb") as f:
+                f.write(data)
+            saved.add(name)
+        return {"blob": name}
+
+    return save_blob
+
+
+def _json_encoder() -> Callable[[Any], bytes]:
+    if orjson is not None:
+        return lambda obj: orjson.dumps(obj, default=_default)
+
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=_default)
+    return lambda obj: encoder.encode(obj).encode()
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, FigNode):
+        return dict(obj)
+    # Arrays returned by the rust kiwi decoder
+    return obj.tolist()
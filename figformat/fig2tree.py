@@ -4,54 +4,74 @@ import logging
 import shutil
 from typing import Tuple, Sequence, Dict, IO
 from converter import utils
+from converter.config import config
+from converter.profiling import profiler
+from converter.selection import required_nodes, select_pages, separate_pages
 from zipfile import ZipFile
 from . import decodefig, vector_network
-from PIL import Image, UnidentifiedImageError
+from .fignode import FigNode
 
 
 def convert_fig(path: str, output: ZipFile) -> Tuple[dict, Dict[Sequence[int], dict]]:
     fig, fig_zip = decodefig.decode(path)  # type: ignore [no-untyped-call]
 
     if fig_zip and output:
-        shutil.copyfileobj(
-            fig_zip.open(f"thumbnail.png", "r"),
-            output.open(f"previews/preview.png", "w"),
-        )
+        with profiler.phase("zip.write"):
+            with fig_zip.open(f"thumbnail.png", "r") as src, output.open(
+                f"previews/preview.png", "w"
+            ) as dst:
+                shutil.copyfileobj(src, dst)
 
     # Load all nodes into a map
     id_map = {}
     override_map = {}
     root = None
 
-    for node in fig["nodeChanges"]:
-        node = transform_node(fig, node, fig_zip, output)  # type: ignore [no-untyped-call]
-        node_id = node["guid"]
-        id_map[node_id] = node
+    with profiler.phase("tree.load"):
+        nodes = fig["nodeChanges"]
+        for i, node in enumerate(nodes):
+            node = nodes[i] = transform_node(node)  # type: ignore [no-untyped-call]
+            node_id = node["guid"]
+            id_map[node_id] = node
 
-        if "overrideKey" in node:
-            override_map[node["overrideKey"]] = node
+            if "overrideKey" in node:
+                override_map[node["overrideKey"]] = node
 
-        if not root:
-            root = node_id
+            if not root:
+                root = node_id
 
     # Build the tree
-    tree = {"document": id_map[root]}
-    for node in id_map.values():
-        if "parent" not in node:
-            continue
+    with profiler.phase("tree.build"):
+        tree = {"document": id_map[root]}
+        for node in id_map.values():
+            if "parent" not in node:
+                continue
 
-        id_map[node["parent"]["guid"]]["children"].append(node)
+            id_map[node["parent"]["guid"]]["children"].append(node)
 
     # Sort children
-    for node in id_map.values():
-        node["children"].sort(key=lambda n: n["parent"]["position"])
+    with profiler.phase("tree.sort"):
+        for node in id_map.values():
+            node["children"].sort(key=lambda n: n["parent"]["position"])
 
     id_map.update(override_map)
 
+    # Only decode vectors and convert images of the nodes used by the selected pages
+    required = None
+    if config.pages or config.shard:
+        fig_pages, components_page = separate_pages(tree["document"]["children"])
+        selected_pages, _ = select_pages(fig_pages, config.pages, config.shard)
+        required = required_nodes(selected_pages, id_map)
+
+    with profiler.phase("transform"):
+        for node in fig["nodeChanges"]:
+            if required is None or node["guid"] in required:
+                decode_node(fig, node, fig_zip, output)  # type: ignore [no-untyped-call]
+
     return tree, id_map
 
 
-def transform_node(fig, node, fig_zip, output):
+def transform_node(node):
     node["children"] = []
 
     # Extract parent ID
@@ -59,29 +79,41 @@ def transform_node(fig, node, fig_zip, output):
         parent = node.pop("parentIndex")
         node["parent"] = {"guid": parent["guid"], "position": parent["position"]}
 
+    if config.compact_nodes:
+        return FigNode(node)
+
+    return node
+
+
+def decode_node(fig, node, fig_zip, output):
     if "vectorData" in node:
-        blob_id = node["vectorData"]["vectorNetworkBlob"]
-        scale = node["vectorData"]["normalizedSize"]
-        style_table_override = utils.get_style_table_override(node["vectorData"])
-        network = vector_network.decode(fig, blob_id, scale, style_table_override)
-        node["vectorNetwork"] = network
+        with profiler.phase("transform.vector"):
+            blob_id = node["vectorData"]["vectorNetworkBlob"]
+            scale = node["vectorData"]["normalizedSize"]
+            style_table_override = utils.get_style_table_override(node["vectorData"])
+            network = vector_network.decode(fig, blob_id, scale, style_table_override)
+            node["vectorNetwork"] = network
 
     # Images
     for paint in node.get("fillPaints", []):
         if "image" in paint:
-            fname = bytes(paint["image"]["hash"]).hex()
-            blob_id = paint["image"].get("dataBlob")
-            blob = bytes(fig["blobs"][blob_id]["bytes"]) if blob_id else None
-            paint["image"]["filename"] = convert_image(fname, blob, fig_zip, output)
+            with profiler.phase("transform.image"):
+                fname = bytes(paint["image"]["hash"]).hex()
+                blob_id = paint["image"].get("dataBlob")
+                blob = bytes(fig["blobs"][blob_id]["bytes"]) if blob_id is not None else None
+                paint["image"]["filename"] = convert_image(fname, blob, fig_zip, output)
 
     if "symbolData" in node:
-        for override in node["symbolData"].get("symbolOverrides", []):
-            for paint in override.get("fillPaints", []):
-                if "image" in paint:
-                    fname = bytes(paint["image"]["hash"]).hex()
-                    blob_id = paint["image"].get("dataBlob")
-                    blob = bytes(fig["blobs"][blob_id]["bytes"]) if blob_id else None
-                    paint["image"]["filename"] = convert_image(fname, blob, fig_zip, output)
+        with profiler.phase("transform.symbol_overrides"):
+            for override in node["symbolData"].get("symbolOverrides", []):
+                for paint in override.get("fillPaints", []):
+                    if "image" in paint:
+                        fname = bytes(paint["image"]["hash"]).hex()
+                        blob_id = paint["image"].get("dataBlob")
+                        blob = (
+                            bytes(fig["blobs"][blob_id]["bytes"]) if blob_id is not None else None
+                        )
+                        paint["image"]["filename"] = convert_image(fname, blob, fig_zip, output)
 
     return node
 
@@ -94,7 +126,12 @@ def convert_image(fname, blob, fig_zip, output):
     if img:
         return img
 
-    logging.debug(f"Converting image {fname}")
+    # PIL takes a while to import, only load it for documents with images
+    from PIL import Image, ImageFile, UnidentifiedImageError
+
+    ImageFile.LOAD_TRUNCATED_IMAGES = config.force_convert_images
+
+    logging.debug("Converting image %s", fname)
     try:
         if fig_zip is not None:
             fd = fig_zip.open(f"images/{fname}")
@@ -116,7 +153,8 @@ def convert_image(fname, blob, fig_zip, output):
             extension = ".png"
 
         fhash = utils.generate_file_ref(out.getbuffer())
-        output.open(f"images/{fhash}{extension}", "w").write(out.getbuffer())
+        with profiler.phase("zip.write"), output.open(f"images/{fhash}{extension}", "w") as f:
+            f.write(out.getbuffer())
         converted_images[fname] = f"{fhash}{extension}"
         return f"{fhash}{extension}"
     except UnidentifiedImageError as e:
@@ -0,0 +1,143 @@
+import sys
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, Optional, cast
+
+# Keys present in most nodes, stored in slots instead of a per-node dict
+HOT_KEYS = (
+    "guid",
+    "type",
+    "name",
+    "phase",
+    "visible",
+    "locked",
+    "opacity",
+    "blendMode",
+    "transform",
+    "size",
+    "mask",
+    "maskType",
+    "parent",
+    "children",
+    "horizontalConstraint",
+    "verticalConstraint",
+    "fillPaints",
+    "fillGeometry",
+    "strokePaints",
+    "strokeGeometry",
+    "strokeWeight",
+    "strokeAlign",
+    "strokeCap",
+    "strokeJoin",
+    "miterLimit",
+    "dashPattern",
+    "cornerRadius",
+    "cornerSmoothing",
+)
+
+# Enum values repeated in every node. Decoders may create a new string for each of them
+INTERNED_KEYS = frozenset(
+    [
+        "type",
+        "phase",
+        "blendMode",
+        "maskType",
+        "horizontalConstraint",
+        "verticalConstraint",
+        "strokeAlign",
+        "strokeCap",
+        "strokeJoin",
+    ]
+)
+
+_HOT_KEYS = frozenset(HOT_KEYS)
+
+
+class _Missing:
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "<missing>"
+
+
+_MISSING: Any = _Missing()
+
+
+class FigNode(MutableMapping):
+    """A fig node, using less memory than a dict.
+
+    The most common keys are stored in slots, and the rest in a dict that is only created when
+    needed. It can be used anywhere the converters expect a node dict, but accessing it is
+    slower"""
+
+    __slots__ = (*HOT_KEYS, "_extra")
+
+    def __init__(self, node: Dict[str, Any]) -> None:
+        for key in HOT_KEYS:
+            object.__setattr__(self, key, _MISSING)
+        self._extra: Optional[Dict[str, Any]] = None
+        for key, value in node.items():
+            self[key] = value
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _HOT_KEYS:
+            value = getattr(self, key)
+            if value is _MISSING:
+                raise KeyError(key)
+            return value
+
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in _HOT_KEYS:
+            value = getattr(self, key)
+            return default if value is _MISSING else value
+
+        if self._extra is None:
+            return default
+        return self._extra.get(key, default)
+
+    def __contains__(self, key: object) -> bool:
+        if key in _HOT_KEYS:
+            # Only str keys can be hot keys
+            return getattr(self, cast(str, key)) is not _MISSING
+        return self._extra is not None and key in self._extra
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in INTERNED_KEYS and type(value) is str:
+            value = sys.intern(value)
+
+        if key in _HOT_KEYS:
+            setattr(self, key, value)
+        elif self._extra is None:
+            self._extra = {key: value}
+        else:
+            self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in _HOT_KEYS:
+            if getattr(self, key) is _MISSING:
+                raise KeyError(key)
+            setattr(self, key, _MISSING)
+        elif self._extra is None:
+            raise KeyError(key)
+        else:
+            del self._extra[key]
+
+    def __iter__(self) -> Iterator[str]:
+        for key in HOT_KEYS:
+            if getattr(self, key) is not _MISSING:
+                yield key
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        hot = sum(getattr(self, key) is not _MISSING for key in HOT_KEYS)
+        return hot + (len(self._extra) if self._extra is not None else 0)
+
+    def __repr__(self) -> str:
+        return f"FigNode({dict(self)!r})"
+
+    def __reduce__(self) -> tuple:
+        return FigNode, (dict(self),)
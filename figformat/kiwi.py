@@ -4,6 +4,7 @@ from collections import OrderedDict
 import zlib
 import struct
 import io
+from converter.profiling import profiler
 
 
 class KiwiReader:
@@ -53,6 +54,54 @@ class KiwiReader:
         return string[:-1]
 
 
+# Single byte values, to avoid creating a bytes object for each byte written
+_BYTES = [bytes((i,)) for i in range(256)]
+
+
+class KiwiWriter:
+    def __init__(self, writer):
+        self._write = writer.write
+
+    def byte(self, value):
+        self._write(_BYTES[value])
+
+    def bytes(self, value):
+        self.uint(len(value))
+        self._write(bytes(value))
+
+    def bool(self, value):
+        self._write(_BYTES[1 if value else 0])
+
+    def uint(self, value):
+        if value < 128:
+            self._write(_BYTES[value])
+            return
+
+        data = bytearray()
+        while value >= 128:
+            data.append(value & 127 | 128)
+            value >>= 7
+        data.append(value)
+        self._write(data)
+
+    def float(self, value):
+        bits = ctypes.c_uint32.from_buffer(ctypes.c_float(value)).value
+        bits = ((bits >> 23) | (bits << 9)) & 0xFFFFFFFF
+
+        # Zero and denormals are written as a single byte
+        if bits & 255 == 0:
+            self._write(_BYTES[0])
+            return
+
+        self._write(bits.to_bytes(4, "little"))
+
+    def int(self, value):
+        self.uint(value << 1 if value >= 0 else ~value << 1 | 1)
+
+    def string(self, value):
+        self._write(value.encode("utf8") + b"\x00")
+
+
 class KiwiSchema:
     def __init__(self, reader):
         kw = KiwiReader(reader)
@@ -78,6 +127,21 @@ class KiwiSchema:
             "value": kw.uint(),
         }
 
+    def encode(self, writer):
+        kw = KiwiWriter(writer)
+
+        kw.uint(len(self.types))
+        for type in self.types:
+            kw.string(type["name"])
+            kw.byte(type["kind"])
+
+            kw.uint(len(type["fields"]))
+            for field in type["fields"].values():
+                kw.string(field["name"])
+                kw.int(field["type"])
+                kw.bool(field["array"])
+                kw.uint(field["value"])
+
 
 class KiwiDecoder:
     TYPES = ["bool", "byte", "int", "uint", "float", "string"]
@@ -141,9 +205,95 @@ class KiwiDecoder:
                     raise "Unknown"
 
 
+class KiwiEncoder:
+    """Writes objects in the format read by KiwiDecoder. Type converters turn the values of
+    each type back into what the decoder returns, e.g. GUID tuples into dicts"""
+
+    TYPES = KiwiDecoder.TYPES
+
+    def __init__(self, schema, type_converters):
+        self.schema = schema
+        self.type_converters = type_converters
+
+        # The decoded objects only have the field names
+        self._fields_by_name = [
+            {field["name"]: field for field in type["fields"].values()} for type in schema.types
+        ]
+
+    def encode(self, writer, root, obj):
+        kw = KiwiWriter(writer)
+        root_id = [i for i, t in enumerate(self.schema.types) if t["name"] == root][0]
+        self._encode_message(kw, root_id, obj)
+
+    def _encode_message(self, kw, type_id, obj):
+        fields = self._fields_by_name[type_id]
+        for name, value in obj.items():
+            field = fields.get(name)
+            if field is None:
+                raise ValueError(f"Unknown field {self.schema.types[type_id]['name']}.{name}")
+
+            kw.uint(field["value"])
+            self._encode_type(kw, field["type"], field["array"], value)
+
+        kw.uint(0)
+
+    def _encode_struct(self, kw, type_id, obj):
+        for f in self.schema.types[type_id]["fields"].values():
+            self._encode_type(kw, f["type"], f["array"], obj[f["name"]])
+
+    def _encode_enum(self, kw, type_id, value):
+        kw.uint(self._fields_by_name[type_id][value]["value"])
+
+    def _encode_type(self, kw, type_id, array, obj):
+        if array:
+            if type_id == -2:
+                # Fast path for byte arrays
+                kw.bytes(obj)
+                return
+
+            kw.uint(len(obj))
+            for item in obj:
+                self._encode_type(kw, type_id, False, item)
+            return
+
+        if type_id < 0:
+            primitive = self.TYPES[~type_id]
+            kw.__getattribute__(primitive)(obj)
+            return
+
+        type = self.schema.types[type_id]
+        type_converter = self.type_converters.get(type["name"])
+        if type_converter:
+            obj = type_converter(obj)
+
+        match type["kind"]:
+            case 0:
+                self._encode_enum(kw, type_id, obj)
+            case 1:
+                self._encode_struct(kw, type_id, obj)
+            case 2:
+                self._encode_message(kw, type_id, obj)
+            case other:
+                raise ValueError(f"Unknown kind {other}")
+
+
+SUPPORTED_VERSIONS = [15, 20]
+
+
 def decode(reader, type_converters):
-    SUPPORTED_VERSIONS = [15, 20]
+    schema = decode_schema(reader)
+
+    with profiler.phase("kiwi.inflate"):
+        segment_header = reader.read(4)
+        size = struct.unpack("<I", segment_header)[0]
+        data = io.BytesIO(zlib.decompress(reader.read(size), wbits=-15))
 
+    with profiler.phase("kiwi.decode"):
+        return KiwiDecoder(schema, type_converters).decode(data, "Message")
+
+
+def decode_schema(reader):
+    """Read the header and the schema of a .fig file, leaving the reader at the data segment"""
     header = reader.read(12)
     fig_version = struct.unpack("<I", header[8:12])[0]
     if fig_version not in SUPPORTED_VERSIONS:
@@ -151,12 +301,31 @@ def decode(reader, type_converters):
             f"Unsupported .fig version. File = {fig_version} / Supported = {SUPPORTED_VERSIONS}"
         )
 
-    segment_header = reader.read(4)
-    size = struct.unpack("<I", segment_header)[0]
-    data = io.BytesIO(zlib.decompress(reader.read(size), wbits=-15))
-    schema = KiwiSchema(data)
+    with profiler.phase("kiwi.inflate"):
+        segment_header = reader.read(4)
+        size = struct.unpack("<I", segment_header)[0]
+        data = io.BytesIO(zlib.decompress(reader.read(size), wbits=-15))
+
+    with profiler.phase("kiwi.schema"):
+        return KiwiSchema(data)
+
+
+def encode(writer, schema, message, type_converters={}, version=20):
+    """Write a .fig file (without the zip container) with the given schema and message"""
+    writer.write(b"fig-kiwi" + struct.pack("<I", version))
+
+    data = io.BytesIO()
+    schema.encode(data)
+    _write_segment(writer, data.getvalue())
+
+    data = io.BytesIO()
+    KiwiEncoder(schema, type_converters).encode(data, "Message", message)
+    _write_segment(writer, data.getvalue())
+
+
+def _write_segment(writer, data):
+    compressor = zlib.compressobj(wbits=-15)
+    compressed = compressor.compress(data) + compressor.flush()
 
-    segment_header = reader.read(4)
-    size = struct.unpack("<I", segment_header)[0]
-    data = io.BytesIO(zlib.decompress(reader.read(size), wbits=-15))
-    return KiwiDecoder(schema, type_converters).decode(data, "Message")
+    writer.write(struct.pack("<I", len(compressed)))
+    writer.write(compressed)
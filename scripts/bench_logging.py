@@ -0,0 +1,97 @@
+"""Measure the cost of logging in the node conversion loop.
+
+Converts a large synthetic tree with the default WARNING level and with every logging call
+replaced by a no-op, which is the lower bound for conversion with logging disabled.
+
+Usage: python scripts/bench_logging.py [number of layers]
+"""
+import gc
+import logging
+import os
+import sys
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from converter import tree, utils
+from converter.positioning import Matrix
+
+
+def make_node(guid: tuple, name: str, type_: str, **kw: object) -> dict:
+    return {
+        "size": {"x": 100, "y": 100},
+        "guid": guid,
+        "name": name,
+        "type": type_,
+        "transform": Matrix([[1, 0, 0], [0, 1, 0]]),
+        "locked": False,
+        "visible": True,
+        "horizontalConstraint": "SCALE",
+        "verticalConstraint": "SCALE",
+        "blendMode": "NORMAL",
+        "opacity": 1,
+        **kw,
+    }
+
+
+def make_tree(num_layers: int) -> dict:
+    groups = []
+    for g in range(num_layers // 10):
+        layers = []
+        for i in range(g * 10, g * 10 + 10):
+            # Layout grids outside artboards issue a conversion warning
+            kw = {"layoutGrids": [{}]} if i % 10 == 0 else {}
+            layers.append(make_node((1, i), f"Rectangle {i}", "ROUNDED_RECTANGLE", **kw))
+        groups.append(
+            make_node(
+                (2, g),
+                f"Group {g}",
+                "FRAME",
+                resizeToFit=True,
+                frameMaskDisabled=True,
+                children=layers,
+            )
+        )
+
+    return make_node((0, 0), "Root", "FRAME", resizeToFit=True, children=groups)
+
+
+def convert(fig_tree: dict) -> float:
+    utils.issued_warnings.clear()
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        tree.convert_node(fig_tree, "")
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def main():
+    num_layers = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    fig_tree = make_tree(num_layers)
+    print(f"Converting a tree with {num_layers} layers")
+
+    logging.basicConfig(level=logging.WARNING)
+    # Warm up the object ID cache, so every run does the same work
+    convert(fig_tree)
+
+    noop = mock.Mock(debug=lambda *args, **kw: None, info=lambda *args, **kw: None)
+    noop.root.isEnabledFor = lambda level: False
+    noop.DEBUG, noop.INFO = logging.DEBUG, logging.INFO
+
+    # Alternate both configurations, so changes in machine load affect them alike
+    silent = warning = float("inf")
+    for _ in range(11):
+        with mock.patch.object(tree, "logging", noop), mock.patch.object(utils, "logging", noop):
+            silent = min(silent, convert(fig_tree))
+        warning = min(warning, convert(fig_tree))
+
+    print(f"no logging {silent * 1000:8.1f} ms")
+    print(f"WARNING    {warning * 1000:8.1f} ms  ({(warning / silent - 1) * 100:+.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Measure the memory used by the objects of a large converted page, and by the decoded fig
+nodes with and without --compact-nodes.
+
+Usage: python scripts/bench_memory.py [number of layers]
+"""
+import gc
+import json
+import os
+import resource
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bench_logging import make_node
+from bench_serialize import make_page
+from figformat.fignode import FigNode
+
+
+def max_rss_mb() -> float:
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports kilobytes
+    return max_rss / 1e6 if sys.platform == "darwin" else max_rss / 1e3
+
+
+def traced_allocations(build):
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def decode_nodes(num_nodes: int, node_type=dict) -> list:
+    # Decoding creates new strings and containers for every node, like the kiwi decoder does
+    node = make_node((1, 0), "Rectangle", "ROUNDED_RECTANGLE", parent={"guid": (0, 0)})
+    encoded = json.dumps(node)
+    return [node_type(json.loads(encoded)) for _ in range(num_nodes)]
+
+
+def main():
+    num_layers = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    print(f"Building a page with {num_layers} layers")
+
+    gc.collect()
+    rss_before = max_rss_mb()
+    start = time.perf_counter()
+    page = make_page(num_layers)
+    elapsed = time.perf_counter() - start
+    print(f"time       {elapsed * 1000:8.1f} ms")
+    print(f"peak RSS   {max_rss_mb() - rss_before:8.1f} MB (process total {max_rss_mb():.1f} MB)")
+
+    # Measured separately, as tracing allocations slows down building the page a lot
+    del page
+    gc.collect()
+    tracemalloc.start()
+    page = make_page(num_layers)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"allocated  {current / 1e6:8.1f} MB (peak {peak / 1e6:.1f} MB)")
+    del page
+
+    print(f"Decoding {num_layers} fig nodes")
+    plain = traced_allocations(lambda: decode_nodes(num_layers))
+    compact = traced_allocations(lambda: decode_nodes(num_layers, FigNode))
+    print(f"dict       {plain / 1e6:8.1f} MB")
+    print(f"FigNode    {compact / 1e6:8.1f} MB  ({(compact / plain - 1) * 100:+.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
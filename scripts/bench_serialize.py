@@ -0,0 +1,140 @@
+"""Compare the serialization speed of a large page with the available serializers.
+
+Usage: python scripts/bench_serialize.py [number of layers]
+"""
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sketchformat.common import Point
+from sketchformat.layer_common import Rect
+from sketchformat.layer_group import Page, Group
+from sketchformat.layer_shape import Rectangle, Oval
+from sketchformat.style import Style, Fill, Border, Shadow, Color, BorderPosition, FillType
+from sketchformat.text import *
+
+
+def make_style(i: int) -> Style:
+    return Style(
+        do_objectID=f"STYLE-{i}",
+        fills=[Fill.Color(Color(red=i % 256 / 255, green=0.5, blue=0.25, alpha=1))],
+        borders=[Border(fillType=FillType.COLOR, position=BorderPosition.INSIDE, thickness=1)],
+        shadows=[Shadow(blurRadius=4, offsetX=0, offsetY=2, spread=0)],
+    )
+
+
+def make_text(i: int) -> Text:
+    attributes = EncodedAttributes(
+        MSAttributedStringFontAttribute=FontDescriptor(name="Inter-Regular", size=14),
+        MSAttributedStringColorAttribute=Color.Black(),
+        textStyleVerticalAlignmentKey=TextVerticalAlignment.TOP,
+        kerning=0,
+        paragraphStyle=ParagraphStyle(alignment=TextAlignment.LEFT),
+    )
+    return Text(
+        do_objectID=f"TEXT-{i}",
+        name=f"Text {i}",
+        frame=Rect(height=20, width=100, x=i % 100 * 10, y=i // 100 * 10),
+        resizingConstraint=63,
+        rotation=0,
+        style=make_style(i),
+        attributedString=AttributedString(
+            string=f"Label number {i}",
+            attributes=[StringAttribute(location=0, length=10, attributes=attributes)],
+        ),
+        glyphBounds=Bounds(Point(0, 0), Point(100, 20)),
+        textBehaviour=TextBehaviour.FIXED_WIDTH,
+    )
+
+
+def make_page(num_layers: int) -> Page:
+    groups = []
+    for g in range(num_layers // 10):
+        layers = []
+        for i in range(g * 10, g * 10 + 10):
+            frame = Rect(height=10.5, width=20.25, x=i % 100 * 30, y=i // 100 * 30)
+            if i % 3 == 0:
+                layers.append(make_text(i))
+            elif i % 3 == 1:
+                layers.append(
+                    Oval(
+                        do_objectID=f"OVAL-{i}",
+                        name=f"Oval {i}",
+                        frame=frame,
+                        resizingConstraint=63,
+                        rotation=0,
+                        style=make_style(i),
+                    )
+                )
+            else:
+                layers.append(
+                    Rectangle(
+                        do_objectID=f"RECT-{i}",
+                        name=f"Rectangle {i}",
+                        frame=frame,
+                        resizingConstraint=63,
+                        rotation=45,
+                        style=make_style(i),
+                    )
+                )
+        groups.append(
+            Group(
+                do_objectID=f"GROUP-{g}",
+                name=f"Group {g}",
+                frame=Rect(height=100, width=100, x=0, y=0),
+                resizingConstraint=63,
+                rotation=0,
+                style=Style(do_objectID=f"GROUP-STYLE-{g}"),
+                layers=layers,
+            )
+        )
+
+    return Page(
+        do_objectID="PAGE",
+        name="Page",
+        frame=Rect(height=0, width=0, x=0, y=0),
+        resizingConstraint=63,
+        rotation=0,
+        style=Style(do_objectID="PAGE-STYLE"),
+        layers=groups,
+    )
+
+
+def bench(name, serialize, page, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        out = io.BytesIO()
+        start = time.perf_counter()
+        serialize(page, out)
+        best = min(best, time.perf_counter() - start)
+
+    print(f"{name:<8} {best * 1000:8.1f} ms  {len(out.getvalue()) / 1e6:6.1f} MB")
+    return out.getvalue()
+
+
+def main():
+    num_layers = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    page = make_page(num_layers)
+    print(f"Serializing a page with {num_layers} layers")
+
+    outputs = {}
+    try:
+        from sketchformat.serialize import orjson as orjson_serializer
+
+        outputs["orjson"] = bench("orjson", orjson_serializer.serialize, page)
+    except ImportError:
+        print("orjson not installed")
+
+    from sketchformat.serialize import json as json_serializer
+
+    outputs["stdlib"] = bench("stdlib", json_serializer.serialize, page)
+
+    if "orjson" in outputs:
+        print("orjson and stdlib outputs are identical:", outputs["orjson"] == outputs["stdlib"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,511 @@
+"""Generate a synthetic .fig document, to benchmark and stress the conversion of large documents.
+
+Each page has a tree of frames with the given depth and fan-out, filled with a mix of node types.
+Instances use the symbols of the internal page, and override some of their texts and fills
+(fill overrides are not supported, so those instances are detached). The same options and seed
+always generate the same document.
+
+The kiwi schema is taken from an existing .fig file. Documents are written as a zip with the
+images and a thumbnail (.fig), or with --raw, as a bare kiwi file with the images in blobs.
+
+Usage: python scripts/generate_fig.py [options] output.fig
+"""
+import argparse
+import hashlib
+import io
+import math
+import os
+import random
+import struct
+import sys
+import zipfile
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from figformat import kiwi
+from PIL import Image
+
+NODE_TYPES = ["FRAME", "ROUNDED_RECTANGLE", "ELLIPSE", "TEXT", "VECTOR", "INSTANCE"]
+DEFAULT_MIX = "FRAME=2,ROUNDED_RECTANGLE=3,ELLIPSE=1,TEXT=2,VECTOR=1,INSTANCE=1"
+
+# Rectangles filled with one of the images, when there are images
+IMAGE_FILL_RATIO = 0.25
+
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut "
+    "labore et dolore magna aliqua enim ad minim veniam quis nostrud exercitation ullamco"
+).split()
+
+IDENTITY = {"m00": 1.0, "m01": 0.0, "m02": 0.0, "m10": 0.0, "m11": 1.0, "m12": 0.0}
+
+# Characters of the fractional indexes Figma uses to sort children
+POSITION_CHARS = "".join(chr(c) for c in range(33, 127))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generates a synthetic .fig document")
+    parser.add_argument("output")
+    parser.add_argument("--pages", type=int, default=3, help="number of pages (default = 3)")
+    parser.add_argument(
+        "--depth", type=int, default=3, help="levels of nested frames in each page (default = 3)"
+    )
+    parser.add_argument(
+        "--fan-out", type=int, default=6, help="children of each frame (default = 6)"
+    )
+    parser.add_argument(
+        "--mix",
+        default=DEFAULT_MIX,
+        help=f"relative weight of each node type (default = {DEFAULT_MIX})",
+    )
+    parser.add_argument(
+        "--text-length", type=int, default=40, help="characters of each text (default = 40)"
+    )
+    parser.add_argument(
+        "--vector-points", type=int, default=8, help="vertices of each vector (default = 8)"
+    )
+    parser.add_argument(
+        "--symbols", type=int, default=5, help="symbols used by instances (default = 5)"
+    )
+    parser.add_argument(
+        "--override-density",
+        type=float,
+        default=0.3,
+        help="probability of each symbol layer being overridden by an instance (default = 0.3)",
+    )
+    parser.add_argument(
+        "--images", type=int, default=4, help="number of different images (default = 4)"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--schema",
+        default=os.path.join(os.path.dirname(__file__), "..", "tests", "data", "structure.fig"),
+        help="take the kiwi schema from this .fig file (default = tests/data/structure.fig)",
+    )
+    parser.add_argument(
+        "--raw",
+        action="store_true",
+        help="write a bare kiwi file, with the images in blobs, instead of a zip",
+    )
+
+    args = parser.parse_args()
+    args.mix = parse_mix(args.mix)
+    return args
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for item in mix.split(","):
+        node_type, weight = item.split("=")
+        if node_type not in NODE_TYPES:
+            raise SystemExit(f"Unknown node type {node_type}, expected one of {NODE_TYPES}")
+        weights[node_type] = float(weight)
+
+    return weights
+
+
+def read_schema(path: str) -> kiwi.KiwiSchema:
+    with open(path, "rb") as f:
+        if f.read(2) == b"PK":
+            return kiwi.decode_schema(zipfile.ZipFile(path).open("canvas.fig"))
+
+        f.seek(0)
+        return kiwi.decode_schema(f)
+
+
+def position(index: int) -> str:
+    """Fractional index sorting children in order. Fixed length, so it sorts as a string"""
+    chars = []
+    for _ in range(3):
+        index, digit = divmod(index, len(POSITION_CHARS))
+        chars.append(POSITION_CHARS[digit])
+
+    return "".join(reversed(chars))
+
+
+def color(rng: random.Random) -> dict:
+    return {"r": rng.random(), "g": rng.random(), "b": rng.random(), "a": 1.0}
+
+
+def solid(rgba: dict) -> dict:
+    return {"type": "SOLID", "color": rgba, "opacity": 1.0, "visible": True, "blendMode": "NORMAL"}
+
+
+class Generator:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.nodes: List[dict] = []
+        self.blobs: List[dict] = []
+        # Image hash -> png data
+        self.images: Dict[bytes, bytes] = {}
+        self.image_blobs: Dict[bytes, int] = {}
+        # (symbol, size, layers that instances can override)
+        self.symbols: List[Tuple[dict, Tuple[float, float], List[dict]]] = []
+        self._next_id = 0
+
+        self._types = [t for t in args.mix if args.mix[t] > 0]
+        self._weights = [args.mix[t] for t in self._types]
+
+    def generate(self) -> dict:
+        for i in range(self.args.images):
+            self.add_image(i)
+
+        document = self.node({"sessionID": 0, "localID": 0}, "DOCUMENT", "Document")
+        self.nodes.append(document)
+
+        pages = [self.page(document, i, f"Page {i + 1}") for i in range(self.args.pages)]
+        internal = self.page(document, self.args.pages, "Internal Only Canvas")
+        internal.update(internalOnly=True, visible=False)
+
+        for i in range(self.args.symbols):
+            self.symbol(internal, i)
+
+        for page in pages:
+            for i in range(self.args.fan_out):
+                cols = math.ceil(math.sqrt(self.args.fan_out))
+                x, y = (i % cols) * 1100, (i // cols) * 1100
+                self.frame(page, i, f"Artboard {i + 1}", x, y, 1000, 1000, 1)
+
+        return {
+            "type": "NODE_CHANGES",
+            "sessionID": 0,
+            "ackID": 0,
+            "nodeChanges": self.nodes,
+            "blobs": self.blobs,
+        }
+
+    def guid(self) -> dict:
+        self._next_id += 1
+        return {"sessionID": 1, "localID": self._next_id}
+
+    def node(
+        self,
+        guid: dict,
+        node_type: str,
+        name: str,
+        parent: Optional[dict] = None,
+        index: int = 0,
+    ) -> dict:
+        node = {"guid": guid, "phase": "CREATED"}
+        if parent is not None:
+            node["parentIndex"] = {"guid": parent["guid"], "position": position(index)}
+        node.update(
+            type=node_type,
+            name=name,
+            visible=True,
+            opacity=1.0,
+            blendMode="PASS_THROUGH",
+            transform=IDENTITY,
+            mask=False,
+            maskType="ALPHA",
+        )
+        return node
+
+    def layer(
+        self,
+        parent: dict,
+        index: int,
+        node_type: str,
+        name: str,
+        x: float,
+        y: float,
+        width: float,
+        height: float,
+    ) -> dict:
+        node = self.node(self.guid(), node_type, name, parent, index)
+        node.update(
+            locked=False,
+            size={"x": width, "y": height},
+            transform={**IDENTITY, "m02": x, "m12": y},
+            dashPattern=[],
+            strokeWeight=1.0,
+            strokeAlign="INSIDE",
+            strokeCap="NONE",
+            strokeJoin="MITER",
+            fillPaints=[solid(color(self.rng))],
+            strokePaints=[],
+            horizontalConstraint="MIN",
+            verticalConstraint="MIN",
+            miterLimit=4.0,
+            cornerSmoothing=0.0,
+        )
+        self.nodes.append(node)
+        return node
+
+    def page(self, document: dict, index: int, name: str) -> dict:
+        page = self.node({"sessionID": 0, "localID": index + 1}, "CANVAS", name, document, index)
+        page.update(
+            backgroundOpacity=1.0,
+            backgroundColor={"r": 0.96, "g": 0.96, "b": 0.96, "a": 1.0},
+            backgroundEnabled=True,
+        )
+        self.nodes.append(page)
+        return page
+
+    def frame(
+        self,
+        parent: dict,
+        index: int,
+        name: str,
+        x: float,
+        y: float,
+        width: float,
+        height: float,
+        level: int,
+    ) -> dict:
+        frame = self.layer(parent, index, "FRAME", name, x, y, width, height)
+        frame.update(frameMaskDisabled=False, resizeToFit=False, cornerRadius=0.0)
+
+        # Children in a grid
+        cols = math.ceil(math.sqrt(self.args.fan_out))
+        cell_width, cell_height = width / cols, height / cols
+        for i in range(self.args.fan_out):
+            x = (i % cols) * cell_width + cell_width * 0.05
+            y = (i // cols) * cell_height + cell_height * 0.05
+            self.child(frame, i, x, y, cell_width * 0.9, cell_height * 0.9, level)
+
+        return frame
+
+    def child(
+        self,
+        parent: dict,
+        index: int,
+        x: float,
+        y: float,
+        width: float,
+        height: float,
+        level: int,
+    ) -> None:
+        node_type = self.rng.choices(self._types, self._weights)[0]
+        if node_type == "FRAME" and level >= self.args.depth:
+            node_type = "ROUNDED_RECTANGLE"
+        if node_type == "INSTANCE" and not self.symbols:
+            node_type = "ROUNDED_RECTANGLE"
+
+        name = f"{node_type.title()} {index + 1}"
+        match node_type:
+            case "FRAME":
+                self.frame(parent, index, name, x, y, width, height, level + 1)
+            case "ROUNDED_RECTANGLE":
+                self.rectangle(parent, index, name, x, y, width, height)
+            case "ELLIPSE":
+                self.layer(parent, index, "ELLIPSE", name, x, y, width, height)
+            case "TEXT":
+                self.text(parent, index, name, x, y, width, self.words())
+            case "VECTOR":
+                self.vector(parent, index, name, x, y, width, height)
+            case "INSTANCE":
+                self.instance(parent, index, name, x, y)
+
+    def rectangle(
+        self,
+        parent: dict,
+        index: int,
+        name: str,
+        x: float,
+        y: float,
+        width: float,
+        height: float,
+    ) -> dict:
+        rectangle = self.layer(parent, index, "ROUNDED_RECTANGLE", name, x, y, width, height)
+        rectangle["cornerRadius"] = self.rng.choice([0.0, 4.0, 8.0])
+        if self.images and self.rng.random() < IMAGE_FILL_RATIO:
+            rectangle["fillPaints"] = [self.image_paint(self.rng.choice(list(self.images)))]
+
+        return rectangle
+
+    def text(
+        self, parent: dict, index: int, name: str, x: float, y: float, width: float, chars: str
+    ) -> dict:
+        font_size = 12.0
+        text = self.layer(parent, index, "TEXT", name, x, y, width, font_size * 1.5)
+        text.update(
+            fillPaints=[solid({"r": 0.0, "g": 0.0, "b": 0.0, "a": 1.0})],
+            fontSize=font_size,
+            fontName={"family": "Inter", "style": "Regular", "postscript": "Inter-Regular"},
+            textAlignHorizontal="LEFT",
+            textAlignVertical="TOP",
+            textAutoResize="HEIGHT",
+            lineHeight={"value": 100.0, "units": "PERCENT"},
+            letterSpacing={"value": 0.0, "units": "PERCENT"},
+            textData=self.text_data(chars, font_size),
+        )
+        return text
+
+    def text_data(self, chars: str, font_size: float) -> dict:
+        advance = 0.6
+        return {
+            "characters": chars,
+            "glyphs": [
+                {
+                    "position": {"x": i * advance * font_size, "y": font_size},
+                    "styleID": 0,
+                    "fontSize": font_size,
+                    "firstCharacter": i,
+                    "advance": advance,
+                }
+                for i in range(len(chars))
+            ],
+            "lines": [
+                {
+                    "lineType": "PLAIN",
+                    "indentationLevel": 0,
+                    "directionality": "LTR",
+                    "directionalityIntent": "IMPLICIT",
+                }
+            ],
+        }
+
+    def words(self) -> str:
+        words: List[str] = []
+        while sum(len(w) + 1 for w in words) < self.args.text_length:
+            words.append(self.rng.choice(WORDS))
+
+        return " ".join(words)[: self.args.text_length] or "x"
+
+    def vector(
+        self,
+        parent: dict,
+        index: int,
+        name: str,
+        x: float,
+        y: float,
+        width: float,
+        height: float,
+    ) -> dict:
+        vector = self.layer(parent, index, "VECTOR", name, x, y, width, height)
+        vector["vectorData"] = {
+            "vectorNetworkBlob": self.add_blob(self.vector_network(width, height)),
+            "normalizedSize": {"x": width, "y": height},
+        }
+        return vector
+
+    def vector_network(self, width: float, height: float) -> bytes:
+        """A closed polygon with jittered vertices around an ellipse"""
+        num_points = max(self.args.vector_points, 2)
+        data = struct.pack("<III", num_points, num_points, 1)
+
+        for i in range(num_points):
+            angle = 2 * math.pi * i / num_points
+            radius = 0.5 * (0.7 + 0.3 * self.rng.random())
+            x = width * (0.5 + radius * math.cos(angle))
+            y = height * (0.5 + radius * math.sin(angle))
+            data += struct.pack("<Iff", 0, x, y)
+
+        # Straight segments, without tangents
+        for i in range(num_points):
+            data += struct.pack("<IIffIff", 0, i, 0, 0, (i + 1) % num_points, 0, 0)
+
+        # A single region, filled with the non-zero rule, with a loop of all the segments
+        data += struct.pack("<II", 1, 1)
+        data += struct.pack(f"<I{num_points}I", num_points, *range(num_points))
+        return data
+
+    def symbol(self, internal: dict, index: int) -> None:
+        size = (160.0, 40.0)
+        symbol = self.layer(internal, index, "SYMBOL", f"Symbol {index + 1}", 0, index * 60, *size)
+        symbol.update(frameMaskDisabled=True, resizeToFit=False, cornerRadius=0.0)
+
+        background = self.rectangle(symbol, 0, "Background", 0, 0, *size)
+        label = self.text(symbol, 1, "Label", 8, 8, size[0] - 16, f"Symbol {index + 1}")
+        self.symbols.append((symbol, size, [background, label]))
+
+    def instance(self, parent: dict, index: int, name: str, x: float, y: float) -> dict:
+        symbol, size, layers = self.rng.choice(self.symbols)
+        instance = self.layer(parent, index, "INSTANCE", name, x, y, *size)
+        instance.update(frameMaskDisabled=True, resizeToFit=False)
+
+        overrides = []
+        for layer in layers:
+            if self.rng.random() >= self.args.override_density:
+                continue
+
+            override: dict = {"guidPath": {"guids": [layer["guid"]]}}
+            if layer["type"] == "TEXT":
+                override["textData"] = self.text_data(self.words(), layer["fontSize"])
+            else:
+                override["fillPaints"] = [solid(color(self.rng))]
+            overrides.append(override)
+
+        instance["symbolData"] = {
+            "symbolID": symbol["guid"],
+            "symbolOverrides": overrides,
+            "uniformScaleFactor": 1.0,
+        }
+        # Layout of the symbol layers in the instance, used when detaching it
+        instance["derivedSymbolData"] = [
+            {
+                "guidPath": {"guids": [layer["guid"]]},
+                "size": layer["size"],
+                "transform": layer["transform"],
+            }
+            for layer in layers
+        ]
+        return instance
+
+    def add_blob(self, data: bytes) -> int:
+        self.blobs.append({"bytes": data})
+        return len(self.blobs) - 1
+
+    def add_image(self, index: int) -> None:
+        size = 64 + index % 4 * 32
+        image = Image.new("RGB", (size, size), tuple(self.rng.randrange(256) for _ in range(3)))
+        data = io.BytesIO()
+        image.save(data, format="png")
+
+        image_hash = hashlib.sha1(data.getvalue()).digest()
+        self.images[image_hash] = data.getvalue()
+        if self.args.raw:
+            self.image_blobs[image_hash] = self.add_blob(data.getvalue())
+
+    def image_paint(self, image_hash: bytes) -> dict:
+        image: dict = {"hash": image_hash, "name": image_hash.hex()[:8]}
+        if image_hash in self.image_blobs:
+            image["dataBlob"] = self.image_blobs[image_hash]
+
+        return {
+            "type": "IMAGE",
+            "opacity": 1.0,
+            "visible": True,
+            "blendMode": "NORMAL",
+            "transform": IDENTITY,
+            "image": image,
+            "imageScaleMode": "FILL",
+        }
+
+
+def thumbnail() -> bytes:
+    data = io.BytesIO()
+    Image.new("RGB", (400, 300), (245, 245, 245)).save(data, format="png")
+    return data.getvalue()
+
+
+def main() -> None:
+    args = parse_args()
+    schema = read_schema(args.schema)
+    generator = Generator(args)
+    message = generator.generate()
+
+    canvas = io.BytesIO()
+    kiwi.encode(canvas, schema, message)
+
+    if args.raw:
+        with open(args.output, "wb") as f:
+            f.write(canvas.getvalue())
+    else:
+        with zipfile.ZipFile(args.output, "w") as fig:
+            fig.writestr("canvas.fig", canvas.getvalue())
+            fig.writestr("thumbnail.png", thumbnail())
+            fig.writestr("meta.json", '{"file_name": "%s"}' % os.path.basename(args.output))
+            for image_hash, data in generator.images.items():
+                fig.writestr(f"images/{image_hash.hex()}", data)
+
+    print(
+        f"{len(message['nodeChanges'])} nodes, {len(generator.blobs)} blobs, "
+        f"{len(generator.images)} images, {os.path.getsize(args.output) / 1e6:.1f} MB"
+    )
+
+
+if __name__ == "__main__":
+    main()
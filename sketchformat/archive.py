@@ -0,0 +1,163 @@
+import io
+import logging
+import os
+import time
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, Optional, Tuple
+
+COMPRESSION_METHODS = ["stored", "deflate", "zstd-if-available"]
+# Highest compression level of each method
+MAX_DEFLATE_LEVEL = 9
+MAX_ZSTD_LEVEL = 22
+
+# Entries smaller than this are compressed on the main thread, as handing them to the pool
+# costs more than compressing them
+PARALLEL_THRESHOLD = 64 * 1024
+
+# (compress_type, data, file_size, crc)
+CompressedEntry = Tuple[int, bytes, int, int]
+
+
+class SketchArchive(zipfile.ZipFile):
+    """Write-only zip file that compresses entries in a thread pool.
+
+    Entries opened with `open(name, "w")` are buffered in memory and, once closed, compressed
+    in parallel (zlib releases the GIL). Compressed entries are written to the archive in the
+    same order they were closed, so the output does not depend on thread scheduling"""
+
+    def __init__(
+        self,
+        file: str,
+        compression: str = "deflate",
+        level: Optional[int] = None,
+        workers: Optional[int] = None,
+        allow_zip64: bool = True,
+    ):
+        super().__init__(file, "w", allowZip64=allow_zip64)
+        # ZipFile keeps its own flag, but it is not part of its public interface
+        self._allow_zip64 = allow_zip64
+        self._compress_type, self._compressor = _compressor(compression, level)
+        self._pending: Deque[Tuple[zipfile.ZipInfo, Future]] = deque()
+        self._max_pending = 2 * (workers or os.cpu_count() or 1)
+        self._workers = workers
+        # Started with the first entry compressed in parallel
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def open(self, name, mode="r", pwd=None, *, force_zip64=False):  # type: ignore [no-untyped-def]
+        if mode != "w":
+            return super().open(name, mode, pwd, force_zip64=force_zip64)
+
+        if isinstance(name, zipfile.ZipInfo):
+            zinfo = name
+        else:
+            zinfo = zipfile.ZipInfo(name, time.localtime(time.time())[:6])
+        if not zinfo.external_attr:
+            zinfo.external_attr = 0o600 << 16
+
+        return _EntryWriter(self, zinfo)
+
+    def close(self) -> None:
+        if self.fp is not None and self.mode == "w":
+            self.stop_threads()
+        super().close()
+
+    def stop_threads(self) -> None:
+        """Write the entries being compressed and stop the compression threads. Must be called
+        before forking, as the child processes could deadlock on locks held by the threads.
+        Threads are started again for the next entries"""
+        try:
+            while self._pending:
+                self._write_next()
+        finally:
+            if self._executor:
+                self._executor.shutdown()
+                self._executor = None
+
+    def _submit(self, zinfo: zipfile.ZipInfo, data: bytes) -> None:
+        future: Future = Future()
+        if not self._compressor:
+            future.set_result((zipfile.ZIP_STORED, data, len(data), zlib.crc32(data)))
+        elif len(data) < PARALLEL_THRESHOLD:
+            future.set_result(_compress(self._compress_type, self._compressor, data))
+        else:
+            if not self._executor:
+                self._executor = ThreadPoolExecutor(self._workers, thread_name_prefix="compress")
+            future = self._executor.submit(_compress, self._compress_type, self._compressor, data)
+        self._pending.append((zinfo, future))
+
+        # Write everything that is ready, keeping a bound on the memory used by pending entries
+        while self._pending and (
+            self._pending[0][1].done() or len(self._pending) > self._max_pending
+        ):
+            self._write_next()
+
+    def _write_next(self) -> None:
+        zinfo, future = self._pending.popleft()
+        compress_type, data, file_size, crc = future.result()
+
+        zinfo.compress_type = compress_type
+        zinfo.file_size = file_size
+        zinfo.compress_size = len(data)
+        zinfo.CRC = crc
+
+        zip64 = file_size > zipfile.ZIP64_LIMIT or len(data) > zipfile.ZIP64_LIMIT
+        if zip64 and not self._allow_zip64:
+            raise zipfile.LargeZipFile("Zip64 extensions are needed for large entries")
+
+        zinfo.header_offset = self.fp.tell()  # type: ignore [union-attr]
+        self.fp.write(zinfo.FileHeader(zip64))  # type: ignore [union-attr]
+        self.fp.write(data)  # type: ignore [union-attr]
+        self.filelist.append(zinfo)
+        self.NameToInfo[zinfo.filename] = zinfo
+        self.start_dir = self.fp.tell()  # type: ignore [union-attr]
+        self._didModify = True
+
+
+class _EntryWriter(io.BytesIO):
+    def __init__(self, archive: SketchArchive, zinfo: zipfile.ZipInfo):
+        super().__init__()
+        self._archive = archive
+        self._zinfo = zinfo
+
+    def close(self) -> None:
+        if not self.closed:
+            self._archive._submit(self._zinfo, self.getvalue())
+        super().close()
+
+
+def _compressor(compression: str, level: Optional[int]) -> Tuple[int, Optional[Callable]]:
+    if compression == "stored":
+        return zipfile.ZIP_STORED, None
+
+    if compression == "zstd-if-available":
+        try:
+            from compression import zstd  # type: ignore [import-not-found]
+
+            return zipfile.ZIP_ZSTANDARD, lambda data: zstd.compress(  # type: ignore [attr-defined]
+                data, level
+            )
+        except (ImportError, AttributeError):
+            logging.warning("Zstandard compression is not available, using deflate")
+
+    # Levels above the deflate ones are for zstd, when falling back to deflate
+    deflate_level = zlib.Z_DEFAULT_COMPRESSION if level is None else min(level, MAX_DEFLATE_LEVEL)
+
+    def deflate(data: bytes) -> bytes:
+        compressor = zlib.compressobj(deflate_level, zlib.DEFLATED, -15)
+        return compressor.compress(data) + compressor.flush()
+
+    return zipfile.ZIP_DEFLATED, deflate
+
+
+def _compress(compress_type: int, compressor: Callable, data: bytes) -> CompressedEntry:
+    crc = zlib.crc32(data)
+    compressed = compressor(data)
+
+    # Already compressed data (like most images) is stored as is
+    if len(compressed) >= len(data):
+        return zipfile.ZIP_STORED, data, len(data), crc
+
+    return compress_type, compressed, len(data), crc
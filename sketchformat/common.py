@@ -12,6 +12,8 @@ class Point:
         x: float
         y: float
 
+    __slots__ = ["x", "y"]
+
     def __init__(self, x: float, y: float) -> None:
         self.x = x
         self.y = y
@@ -1,18 +1,18 @@
-from .style import Color
-from dataclasses import dataclass, field
-from typing import List
+from .style import Color, Style
+from dataclasses import dataclass
+from typing import List, ClassVar
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class JsonFileReference:
-    _class: str = field(default="MSJSONFileReference")
+    _class: ClassVar[str] = "MSJSONFileReference"
     _ref_class: str
     _ref: str
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class FontReference:
-    _class: str = field(default="fontReference")
+    _class: ClassVar[str] = "fontReference"
     do_objectID: str
     fontData: JsonFileReference
     fontFamilyName: str
@@ -21,9 +21,17 @@ class FontReference:
     options: int = 3  # Embedded and used
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Swatch:
-    _class: str = field(default="swatch")
+    _class: ClassVar[str] = "swatch"
     do_objectID: str
     name: str
     value: Color
+
+
+@dataclass(kw_only=True, slots=True)
+class SharedStyle:
+    _class: ClassVar[str] = "sharedStyle"
+    do_objectID: str
+    name: str
+    value: Style
@@ -1,6 +1,6 @@
 from dataclasses import dataclass, field
 from enum import IntEnum
-from typing import Optional, List, Union
+from typing import Optional, List, Union, ClassVar
 
 from .prototype import FlowConnection
 from .style import Style, Color
@@ -50,9 +50,9 @@ class ResizeType(IntEnum):
     FLOAT = 2
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class ExportFormat:
-    _class: str = field(default="exportFormat")
+    _class: ClassVar[str] = "exportFormat"
     fileFormat: str
     name: str
     visibleScaleType: VisibleScaleType
@@ -61,18 +61,18 @@ class ExportFormat:
     scale: float = 1
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class ExportOptions:
-    _class: str = field(default="exportOptions")
+    _class: ClassVar[str] = "exportOptions"
     exportFormats: List[ExportFormat] = field(default_factory=list)
     includedLayerIds: List[str] = field(default_factory=list)
     layerOptions: ExportLayerOptions = ExportLayerOptions.ALL
     shouldTrim: bool = False
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Rect:
-    _class: str = field(default="rect")
+    _class: ClassVar[str] = "rect"
     height: float
     width: float
     x: float
@@ -80,7 +80,7 @@ class Rect:
     constrainProportions: bool = False
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class AbstractLayer:
     do_objectID: str
     frame: Rect
@@ -102,7 +102,7 @@ class AbstractLayer:
     shouldBreakMaskChain: bool = False
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class AbstractStyledLayer(AbstractLayer):
     style: Style
     hasClippingMask: bool = False
@@ -110,8 +110,8 @@ class AbstractStyledLayer(AbstractLayer):
     sharedStyleID: Optional[str] = None
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Slice(AbstractLayer):
-    _class: str = field(default="slice")
+    _class: ClassVar[str] = "slice"
     hasBackgroundColor: bool = False
     backgroundColor: Color = field(default_factory=Color.White)
@@ -2,7 +2,7 @@ from .layer_common import *
 from .common import WindingRule
 from .prototype import *
 from enum import IntEnum
-from typing import Any, Optional, List
+from typing import Any, Optional, List, ClassVar
 
 
 class LayoutAxis(IntEnum):
@@ -16,24 +16,24 @@ class LayoutAnchor(IntEnum):
     MAX = 2
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class RulerData:
-    _class: str = field(default="rulerData")
+    _class: ClassVar[str] = "rulerData"
     base: int = 0
     guides: List[int] = field(default_factory=list)
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class SimpleGrid:
-    _class: str = field(default="simpleGrid")
+    _class: ClassVar[str] = "simpleGrid"
     gridSize: int = 8
     thickGridTimes: int = 1
     isEnabled: bool = False
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class LayoutGrid:
-    _class: str = field(default="layoutGrid")
+    _class: ClassVar[str] = "layoutGrid"
     columnWidth: int = 0
     gutterHeight: int = 0
     gutterWidth: int = 0
@@ -48,21 +48,21 @@ class LayoutGrid:
     isEnabled: bool = True
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class FreeFormGroupLayout:
-    _class: str = field(default="MSImmutableFreeformGroupLayout")
+    _class: ClassVar[str] = "MSImmutableFreeformGroupLayout"
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class InferredGroupLayout:
-    _class: str = field(default="MSImmutableInferredGroupLayout")
+    _class: ClassVar[str] = "MSImmutableInferredGroupLayout"
     axis: LayoutAxis
     layoutAnchor: LayoutAnchor
     maxSize: int = 0
     minSize: int = 0
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class AbstractLayerGroup(AbstractStyledLayer):
     hasClickThrough: bool = False
     groupLayout: Union[FreeFormGroupLayout, InferredGroupLayout] = field(
@@ -71,29 +71,29 @@ class AbstractLayerGroup(AbstractStyledLayer):
     layers: List[AbstractLayer] = field(default_factory=list)
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Page(AbstractLayerGroup):
-    _class: str = field(default="page")
+    _class: ClassVar[str] = "page"
     horizontalRulerData: RulerData = field(default_factory=RulerData)
     verticalRulerData: RulerData = field(default_factory=RulerData)
     grid: SimpleGrid = field(default_factory=SimpleGrid)
     layout: Optional[LayoutGrid] = None
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class ShapeGroup(AbstractLayerGroup):
-    _class: str = field(default="shapeGroup")
+    _class: ClassVar[str] = "shapeGroup"
     windingRule: WindingRule = WindingRule.NON_ZERO  # Legacy, should match style.windingRule
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Group(AbstractLayerGroup):
-    _class: str = field(default="group")
+    _class: ClassVar[str] = "group"
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Artboard(AbstractLayerGroup):
-    _class: str = field(default="artboard")
+    _class: ClassVar[str] = "artboard"
     horizontalRulerData: RulerData = field(default_factory=RulerData)
     verticalRulerData: RulerData = field(default_factory=RulerData)
     grid: Optional[SimpleGrid] = None
@@ -112,32 +112,32 @@ class Artboard(AbstractLayerGroup):
     layerListExpandedType: LayerListStatus = LayerListStatus.EXPANDED
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class OverrideProperty:
-    _class: str = field(default="overrideProperty")
+    _class: ClassVar[str] = "overrideProperty"
     overrideName: str
     canOverride: bool
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class SymbolMaster(Artboard):
-    _class: str = field(default="symbolMaster")
+    _class: ClassVar[str] = "symbolMaster"
     allowsOverrides: bool = True
     includeBackgroundColorInInstance: bool = False
     symbolID: str
     overrideProperties: List[OverrideProperty] = field(default_factory=list)
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class OverrideValue:
-    _class: str = field(default="overrideValue")
+    _class: ClassVar[str] = "overrideValue"
     overrideName: str
     value: Any
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class SymbolInstance(AbstractStyledLayer):
-    _class: str = field(default="symbolInstance")
+    _class: ClassVar[str] = "symbolInstance"
     preservesSpaceWhenHidden: bool = False
     scale: float = 1
     symbolID: str
@@ -2,7 +2,7 @@ from .layer_common import AbstractStyledLayer
 from .common import Point
 from enum import IntEnum
 from dataclasses import dataclass, field, InitVar
-from typing import List, NamedTuple
+from typing import List, NamedTuple, ClassVar
 import math
 
 
@@ -27,9 +27,9 @@ class CurveMode(IntEnum):
     DISCONNECTED = 4
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class CurvePoint:
-    _class: str = field(default="curvePoint")
+    _class: ClassVar[str] = "curvePoint"
     curveFrom: Point
     curveTo: Point
     point: Point
@@ -61,7 +61,7 @@ class CurvePoint:
         )
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class AbstractShapeLayer(AbstractStyledLayer):
     isClosed: bool
     points: List[CurvePoint]
@@ -69,13 +69,13 @@ class AbstractShapeLayer(AbstractStyledLayer):
     pointRadiusBehaviour: PointRadiusBehaviour = PointRadiusBehaviour.V1
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class ShapePath(AbstractShapeLayer):
-    _class: str = field(default="shapePath")
+    _class: ClassVar[str] = "shapePath"
     edited: bool = True
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Rectangle(AbstractShapeLayer):
     class Corners(NamedTuple):
         topLeft: float
@@ -84,7 +84,7 @@ class Rectangle(AbstractShapeLayer):
         bottomLeft: float
 
     corners: InitVar[Corners] = Corners(0, 0, 0, 0)
-    _class: str = field(default="rectangle")
+    _class: ClassVar[str] = "rectangle"
     fixedRadius: float = 0.0
     hasConvertedToNewRoundCorners: bool = True
     needsConvertionToNewRoundCorners: bool = False
@@ -127,16 +127,16 @@ def oval_make_points() -> List[CurvePoint]:
     ]
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Oval(AbstractShapeLayer):
-    _class: str = field(default="oval")
+    _class: ClassVar[str] = "oval"
     points: List[CurvePoint] = field(default_factory=oval_make_points)
     isClosed: bool = True
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Star(AbstractShapeLayer):
-    _class: str = field(default="star")
+    _class: ClassVar[str] = "star"
     radius: float
     numberOfPoints: float
     isClosed: bool = True
@@ -158,9 +158,9 @@ class Star(AbstractShapeLayer):
             self.points.append(CurvePoint.Straight(Point(x2, y2)))
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Polygon(AbstractShapeLayer):
-    _class: str = field(default="polygon")
+    _class: ClassVar[str] = "polygon"
     numberOfPoints: float
     points: List[CurvePoint] = field(default_factory=list)
     isClosed: bool = True
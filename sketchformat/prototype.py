@@ -1,7 +1,7 @@
 from .common import Point
 from dataclasses import dataclass, field
 from enum import IntEnum
-from typing import Optional
+from typing import Optional, ClassVar
 
 
 class OverlayBackgroundInteraction(IntEnum):
@@ -22,9 +22,9 @@ class AnimationType(IntEnum):
     SLIDE_FROM_TOP = 3
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class FlowOverlaySettings:
-    _class: str = field(default="MSImmutableFlowOverlaySettings")
+    _class: ClassVar[str] = "MSImmutableFlowOverlaySettings"
     overlayAnchor: Point
     sourceAnchor: Point
     offset: Point = field(default_factory=lambda: Point(0, 0))
@@ -57,9 +57,9 @@ class FlowOverlaySettings:
         return FlowOverlaySettings(overlayAnchor=anchor, sourceAnchor=anchor)
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class FlowConnection:
-    _class: str = field(default="MSImmutableFlowConnection")
+    _class: ClassVar[str] = "MSImmutableFlowConnection"
     destinationArtboardID: str
     overlaySettings: Optional[FlowOverlaySettings]
     animationType: AnimationType = AnimationType.NONE
@@ -67,9 +67,9 @@ class FlowConnection:
     shouldCloseExistingOverlays: bool = False
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class PrototypeViewport:
-    _class: str = field(default="MSImmutablePrototypeViewport")
+    _class: ClassVar[str] = "MSImmutablePrototypeViewport"
     name: str
     size: Point
     # libraryID: str = 'EB972BCC-0467-4E50-998E-0AC5A39517F0'
@@ -0,0 +1,135 @@
+"""Read back the Sketch objects written by the serializers, from the parsed JSON.
+
+Values are decoded according to the type annotations of the dataclass fields. Layers, whose
+type is only known from their `_class`, are looked up by it. Decoding and serializing again
+writes the same JSON"""
+import dataclasses
+import enum
+import typing
+from .plan import class_name, field_plan
+from sketchformat import common, document, layer_common, layer_group, layer_shape
+from sketchformat import prototype, style, text
+from typing import Any, Callable, Dict, List, Optional, Type, TypeVar
+
+T = TypeVar("T")
+
+Decoder = Callable[[Any], Any]
+
+_decoders: Dict[Any, Decoder] = {}
+_class_decoders: Dict[type, Decoder] = {}
+
+
+def decode(cls: Type[T], value: Any) -> T:
+    return _decoder(cls)(value)
+
+
+def _decoder(tp: Any) -> Decoder:
+    decoder = _decoders.get(tp)
+    if decoder is None:
+        decoder = _decoders[tp] = _make_decoder(tp)
+
+    return decoder
+
+
+def _make_decoder(tp: Any) -> Decoder:
+    origin = typing.get_origin(tp)
+    if origin is list:
+        (item_type,) = typing.get_args(tp)
+        item_decoder = _decoder(item_type)
+        return lambda value: [item_decoder(item) for item in value]
+    elif origin is typing.Union:
+        return _union_decoder([t for t in typing.get_args(tp) if t is not type(None)])
+    elif tp is common.Point:
+        return _decode_point
+    elif tp is text.Bounds:
+        return lambda value: text.Bounds(*(_decode_point(p) for p in _split_braces(value)))
+    elif isinstance(tp, type) and issubclass(tp, enum.Enum):
+        return tp
+    elif isinstance(tp, type) and dataclasses.is_dataclass(tp):
+        # Can be a subclass, like the layers of a group
+        return _union_decoder([tp])
+    elif tp in (bool, int, float, str, Any) or origin is dict or tp is dict:
+        return lambda value: value
+    else:
+        raise TypeError(f"Cannot decode values of type {tp}")
+
+
+def _union_decoder(types: List[Any]) -> Decoder:
+    """Decode values that can be of several classes, telling them apart by their `_class`"""
+    classes = {class_name(t): t for t in types if dataclasses.is_dataclass(t)}
+    default = types[0]
+
+    def decode_union(value: Any) -> Any:
+        if type(value) is dict and "_class" in value:
+            # Placeholder annotations (like style.TextStyle) are replaced by the actual class
+            cls = classes.get(value["_class"]) or _CLASSES[value["_class"]]
+            return _class_decoder(cls)(value)
+        elif dataclasses.is_dataclass(default):
+            return _class_decoder(default)(value)
+        else:
+            return _decoder(default)(value)
+
+    return decode_union
+
+
+def _class_decoder(cls: type) -> Decoder:
+    decoder = _class_decoders.get(cls)
+    if decoder is None:
+        decoder = _class_decoders[cls] = _make_class_decoder(cls)
+
+    return decoder
+
+
+def _make_class_decoder(cls: type) -> Decoder:
+    hints = typing.get_type_hints(cls)
+    plan = [(name, key, _decoder(hints[name])) for name, key in field_plan(cls)]
+
+    def decode_dataclass(value: dict) -> Any:
+        # Restore the fields as they were, without running __init__ or __post_init__. Fields
+        # that are not in the JSON were None
+        obj: Any = object.__new__(cls)
+        for name, key, decoder in plan:
+            field_value = value.get(key)
+            object.__setattr__(obj, name, None if field_value is None else decoder(field_value))
+        return obj
+
+    return decode_dataclass
+
+
+def _decode_point(value: str) -> common.Point:
+    x, y = value[1:-1].split(", ")
+    return common.Point(_number(x), _number(y))
+
+
+def _split_braces(value: str) -> List[str]:
+    # "{{x, y}, {w, h}}" -> ["{x, y}", "{w, h}"]
+    inner = value[1:-1]
+    middle = inner.index("}, {") + 1
+    return [inner[:middle], inner[middle + 2 :]]
+
+
+def _number(value: str) -> Any:
+    # Points keep the type of their coordinates, ints are written without a decimal point
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def _find_classes() -> Dict[str, type]:
+    classes: Dict[Optional[str], type] = {}
+    for module in [common, document, layer_common, layer_group, layer_shape, prototype, style]:
+        for obj in vars(module).values():
+            if isinstance(obj, type) and dataclasses.is_dataclass(obj):
+                classes.setdefault(class_name(obj), obj)
+    for obj in vars(text).values():
+        # text.TextStyle replaces the style.TextStyle placeholder
+        if isinstance(obj, type) and dataclasses.is_dataclass(obj):
+            classes[class_name(obj)] = obj
+
+    classes.pop(None, None)
+    return classes  # type: ignore [return-value]
+
+
+# Dataclasses by their `_class`
+_CLASSES = _find_classes()
@@ -1,30 +1,185 @@
-import codecs
-import json
-from dataclasses import asdict, is_dataclass
+import json.encoder
+from dataclasses import is_dataclass
+from .plan import class_name, field_plan, shared_defaults
+from typing import Any, Callable, Dict, IO, List, Tuple
 
+# The C implementation when available. It is not in the typeshed stubs
+encode_basestring: Callable[[str], str] = getattr(json.encoder, "encode_basestring")
 
-def clean_obj(items):
-    return {
-        # Remove _ suffix for reserved keywords
-        k[:-1] if k.endswith("_") else k: v
-        for (k, v) in items
-        # Skip optional fields that are not present
-        if v is not None
-    }
+# Lists and dicts nested deeper than this are not encoded recursively, to stay well within the
+# recursion limit. They are left as an empty chunk and encoded later by dumps (see _defer)
+MAX_DEPTH = 100
 
 
-def convert_object(obj):
-    if is_dataclass(obj):
-        return asdict(obj, dict_factory=clean_obj)
+class _State:
+    """State of a single dumps call, passed along to every encoder"""
+
+    __slots__ = ["depth", "deferred"]
+
+    def __init__(self) -> None:
+        self.depth = 0
+        # (list or dict, chunks, index of the chunk to replace) of the values encoded later
+        self.deferred: List[Tuple[Any, List[str], int]] = []
+
+
+# Encoders write JSON fragments to a list of chunks, which is joined once at the end
+Encoder = Callable[[Any, List[str], _State], None]
+
+_encoders: Dict[type, Encoder] = {}
+
+
+def encode(obj: Any, out: List[str], state: _State) -> None:
+    encoder = _encoders.get(type(obj))
+    if encoder is None:
+        encoder = _make_encoder(type(obj))
+        _encoders[type(obj)] = encoder
+
+    encoder(obj, out, state)
+
+
+def dumps(obj: Any) -> str:
+    state = _State()
+    out: List[str] = []
+    encode(obj, out, state)
+
+    # Deferred values can defer their own nested values, which are appended to the list
+    deferred = state.deferred
+    i = 0
+    while i < len(deferred):
+        value, chunks, index = deferred[i]
+        value_out: List[str] = []
+        state.depth = 0
+        encode(value, value_out, state)
+        deferred[i] = (value_out, chunks, index)
+        i += 1
+
+    # The nested values are replaced first, so each value is complete when it is joined
+    for value_out, chunks, index in reversed(deferred):
+        chunks[index] = "".join(value_out)
+
+    return "".join(out)
+
+
+def serialize(obj: Any, file: IO[bytes]) -> None:
+    # Write emoji directly, without surrogate pairs
+    file.write(dumps(obj).encode("utf-8"))
+
+
+def _make_encoder(cls: type) -> Encoder:
+    if issubclass(cls, str):
+        return lambda obj, out, state: out.append(encode_basestring(obj))
+    elif issubclass(cls, bool):
+        return lambda obj, out, state: out.append("true" if obj else "false")
+    elif issubclass(cls, int):
+        # Also takes care of IntEnums, which are written as their value
+        return lambda obj, out, state: out.append(int.__repr__(obj))
+    elif issubclass(cls, float):
+        return _encode_float
+    elif cls is type(None):
+        return lambda obj, out, state: out.append("null")
+    elif issubclass(cls, (list, tuple)):
+        return _encode_list
+    elif issubclass(cls, dict):
+        return _encode_dict
+    elif is_dataclass(cls):
+        return _compile_dataclass_encoder(cls)
+    elif hasattr(cls, "to_json"):
+        return lambda obj, out, state: encode(obj.to_json(), out, state)
+    else:
+        raise TypeError(f"Object of type {cls.__name__} is not JSON serializable")
+
+
+def _encode_float(obj: float, out: List[str], state: _State) -> None:
+    # Same output as the built-in json module
+    if obj != obj:
+        out.append("NaN")
+    elif obj == float("inf"):
+        out.append("Infinity")
+    elif obj == -float("inf"):
+        out.append("-Infinity")
+    else:
+        out.append(float.__repr__(obj))
+
+
+def _defer(obj: Any, out: List[str], state: _State) -> None:
+    out.append("")
+    state.deferred.append((obj, out, len(out) - 1))
+
+
+def _encode_list(obj: list, out: List[str], state: _State) -> None:
+    if not obj:
+        out.append("[]")
+        return
+    if state.depth >= MAX_DEPTH:
+        _defer(obj, out, state)
+        return
+
+    state.depth += 1
+    separator = "["
+    for item in obj:
+        out.append(separator)
+        encode(item, out, state)
+        separator = ","
+    out.append("]")
+    state.depth -= 1
+
+
+def _encode_dict(obj: dict, out: List[str], state: _State) -> None:
+    if not obj:
+        out.append("{}")
+        return
+    if state.depth >= MAX_DEPTH:
+        _defer(obj, out, state)
+        return
+
+    state.depth += 1
+    separator = "{"
+    for key, value in obj.items():
+        out.append(separator)
+        out.append(encode_basestring(key if isinstance(key, str) else str(key)))
+        out.append(":")
+        encode(value, out, state)
+        separator = ","
+    out.append("}")
+    state.depth -= 1
+
+
+def _compile_dataclass_encoder(cls: type) -> Encoder:
+    """Generate a function that writes instances of a dataclass directly as JSON.
+
+    The class `_class` is written first, followed by the fields in declaration order, skipping
+    optional fields that are not present. Shared defaults are encoded once, when compiling"""
+    plan = field_plan(cls)
+    class_ = class_name(cls)
+    defaults = shared_defaults(cls)
+
+    lines = ["def encode_dataclass(obj, out, state):"]
+    if class_ is None:
+        lines += ["    separator = '{'"]
     else:
-        return obj.to_json()
+        prefix = "{" + encode_basestring("_class") + ":" + encode_basestring(class_)
+        lines += [f"    out.append({prefix!r})", "    separator = ','"]
 
+    namespace = {"encode": encode}
+    for name, key in plan:
+        key = encode_basestring(key)
+        lines += [f"    value = obj.{name}"]
+        if name in defaults:
+            namespace[f"default_{name}"] = defaults[name]
+            lines += [
+                f"    if value is default_{name}:",
+                f"        out.append(separator + {key + ':' + dumps(defaults[name])!r})",
+                f"        separator = ','",
+                f"    elif value is not None:",
+            ]
+        else:
+            lines += [f"    if value is not None:"]
+        lines += [
+            f"        out.append(separator + {key + ':'!r})",
+            f"        encode(value, out, state)",
+            f"        separator = ','",
+        ]
+    lines += [f"    out.append('{{}}' if separator == '{{' else '}}')"]
 
-def serialize(obj, file):
-    writer = codecs.getwriter("utf-8")(file)
-    json.dump(
-        obj,
-        writer,
-        default=convert_object,
-        ensure_ascii=False,  # Write emoji directly, without surrogate pairs
-    )
+    exec("\n".join(lines), namespace)
+    return namespace["encode_dataclass"]
@@ -1,25 +1,65 @@
-import io
-import logging
 import orjson
-from dataclasses import dataclass, field
-from typing import Optional, IO
+from dataclasses import is_dataclass
+from typing import Any, Callable, Dict, IO
+from . import json
+from .plan import class_name, field_plan, shared_defaults
 
 
 def serialize(obj: object, file: IO[bytes]) -> None:
-    file.write(orjson.dumps(obj, default=lambda x: x.to_json()))
+    try:
+        data = orjson.dumps(obj, default=to_dict, option=orjson.OPT_PASSTHROUGH_DATACLASS)
+    except orjson.JSONEncodeError:
+        # orjson cannot write deeply nested layers (about 120 nested groups). The built-in
+        # serializer writes the same output
+        data = json.dumps(obj).encode("utf-8")
+    file.write(data)
 
 
-# Check if orjson is patched
-@dataclass
-class Test:
-    _class: str = field(default="rectangle")
-    optional: Optional[str] = None
+# orjson does not know about the `_class` constants, the field names of reserved keywords or
+# which None values to skip, so dataclasses are passed through and converted to dicts here
+_converters: Dict[type, Callable[[Any], Any]] = {}
 
 
-b = io.BytesIO()
-serialize(Test(), b)
-b.seek(0)
-if b.read() != b'{"_class":"rectangle"}':
-    b.seek(0)
-    logging.debug("Unpatched orjson detected. Falling back to built-in json")
-    raise Exception()
+def to_dict(obj: Any) -> Any:
+    converter = _converters.get(type(obj))
+    if converter is None:
+        converter = _make_converter(type(obj))
+        _converters[type(obj)] = converter
+
+    return converter(obj)
+
+
+def _make_converter(cls: type) -> Callable[[Any], Any]:
+    if not is_dataclass(cls):
+        return lambda obj: obj.to_json()
+
+    class_ = class_name(cls)
+
+    lines = [
+        "def to_dict(obj):",
+        "    d = {}" if class_ is None else f"    d = {{'_class': {class_!r}}}",
+    ]
+    namespace: Dict[str, Any] = {}
+    defaults = shared_defaults(cls)
+    for name, key in field_plan(cls):
+        lines += [f"    value = obj.{name}"]
+        if name in defaults:
+            # Converted once to plain JSON types, that orjson writes without calling back
+            namespace[f"default_{name}"] = defaults[name]
+            namespace[f"default_{name}_json"] = orjson.loads(
+                orjson.dumps(
+                    defaults[name], default=to_dict, option=orjson.OPT_PASSTHROUGH_DATACLASS
+                )
+            )
+            lines += [
+                f"    if value is default_{name}:",
+                f"        d[{key!r}] = default_{name}_json",
+                f"    elif value is not None:",
+            ]
+        else:
+            lines += [f"    if value is not None:"]
+        lines += [f"        d[{key!r}] = value"]
+    lines += ["    return d"]
+
+    exec("\n".join(lines), namespace)
+    return namespace["to_dict"]
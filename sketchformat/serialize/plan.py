@@ -0,0 +1,30 @@
+from dataclasses import fields, is_dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def json_key(name: str) -> str:
+    # Remove _ suffix for reserved keywords
+    return name[:-1] if name.endswith("_") else name
+
+
+def field_plan(cls: type) -> List[Tuple[str, str]]:
+    """(attribute, json key) pairs of a dataclass, in the order they must be written"""
+    return [(f.name, json_key(f.name)) for f in fields(cls)]
+
+
+def class_name(cls: type) -> Optional[str]:
+    """The `_class` of a dataclass, when it is a class constant instead of a field. It is written
+    before the fields"""
+    if any(f.name == "_class" for f in fields(cls)):
+        return None
+    return getattr(cls, "_class", None)
+
+
+def shared_defaults(cls: type) -> Dict[str, Any]:
+    """Fields whose default is a frozen instance shared by all objects. Serializers can prepare
+    their output once, and reuse it for every object that keeps the default"""
+    return {
+        f.name: f.default
+        for f in fields(cls)
+        if is_dataclass(f.default) and f.default.__dataclass_params__.frozen  # type: ignore
+    }
@@ -1,7 +1,7 @@
 from .common import Point, WindingRule
-from dataclasses import dataclass, field, InitVar
+from dataclasses import dataclass, field
 from enum import IntEnum
-from typing import Optional, List
+from typing import Optional, List, ClassVar
 
 
 class LineCapStyle(IntEnum):
@@ -80,9 +80,9 @@ class BlurType(IntEnum):
     BACKGROUND = 3
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Color:
-    _class: str = field(default="color")
+    _class: ClassVar[str] = "color"
     red: float
     green: float
     blue: float
@@ -114,19 +114,19 @@ class Color:
         return Color(red=0.592, green=0.592, blue=0.592, alpha=1)
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class GradientStop:
-    _class: str = field(default="gradientStop")
+    _class: ClassVar[str] = "gradientStop"
     color: Color
     position: float
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Gradient:
-    _class: str = field(default="gradient")
+    _class: ClassVar[str] = "gradient"
     gradientType: GradientType = GradientType.LINEAR
     elipseLength: float = 0
-    from_: InitVar[Point] = Point(0.5, 0)
+    from_: Point = field(default_factory=lambda: Point(0.5, 0))
     to: Point = field(default_factory=lambda: Point(0.5, 1))
     stops: List[GradientStop] = field(
         default_factory=lambda: [
@@ -135,9 +135,6 @@ class Gradient:
         ]
     )
 
-    def __post_init__(self, from_):
-        setattr(self, "from", from_)
-
     @staticmethod
     def Linear(from_: Point, to: Point, stops: List[GradientStop]) -> "Gradient":
         return Gradient(gradientType=GradientType.LINEAR, from_=from_, to=to, stops=stops)
@@ -159,23 +156,28 @@ class Gradient:
         return Gradient(gradientType=GradientType.ANGULAR, stops=stops)
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True, frozen=True)
 class ContextSettings:
-    _class: str = field(default="graphicsContextSettings")
+    _class: ClassVar[str] = "graphicsContextSettings"
     blendMode: BlendMode = BlendMode.NORMAL
     opacity: float = 1
 
 
-@dataclass(kw_only=True)
+# Most styles use the default settings, options and blur, so a single instance of each is shared.
+# They are frozen: converters replace them instead of modifying them
+DEFAULT_CONTEXT_SETTINGS = ContextSettings()
+
+
+@dataclass(kw_only=True, slots=True)
 class Image:
-    _class: str = field(default="MSJSONFileReference")
+    _class: ClassVar[str] = "MSJSONFileReference"
     _ref_class: str = field(default="MSImageData")
     _ref: str
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Fill:
-    _class: str = field(default="fill")
+    _class: ClassVar[str] = "fill"
     fillType: FillType
     isEnabled: bool = True
     color: Color = field(default_factory=Color.DefaultFill)
@@ -183,7 +185,7 @@ class Fill:
     noiseIntensity: float = 0
     patternFillType: PatternFillType = PatternFillType.TILE
     patternTileScale: float = 1
-    contextSettings: ContextSettings = field(default_factory=ContextSettings)
+    contextSettings: ContextSettings = DEFAULT_CONTEXT_SETTINGS
     gradient: Gradient = field(default_factory=Gradient)
     image: Optional[Image] = None
 
@@ -211,15 +213,15 @@ class Fill:
         )
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Border:
-    _class: str = field(default="border")
+    _class: ClassVar[str] = "border"
     fillType: FillType
     position: BorderPosition
     thickness: int
     isEnabled: bool = True
     color: Color = field(default_factory=Color.DefaultBorder)
-    contextSettings: ContextSettings = field(default_factory=ContextSettings)
+    contextSettings: ContextSettings = DEFAULT_CONTEXT_SETTINGS
     gradient: Gradient = field(default_factory=Gradient)
 
     @staticmethod
@@ -235,9 +237,9 @@ class Border:
         )
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True, frozen=True)
 class ColorControls:
-    _class: str = field(default="colorControls")
+    _class: ClassVar[str] = "colorControls"
     isEnabled: bool = False
     brightness: float = 0
     contrast: float = 1
@@ -245,18 +247,24 @@ class ColorControls:
     saturation: float = 1
 
 
-@dataclass(kw_only=True)
+DEFAULT_COLOR_CONTROLS = ColorControls()
+
+
+@dataclass(kw_only=True, slots=True, frozen=True)
 class BorderOptions:
-    _class: str = field(default="borderOptions")
+    _class: ClassVar[str] = "borderOptions"
     isEnabled: bool = True
     lineCapStyle: LineCapStyle = LineCapStyle.BUTT
     lineJoinStyle: LineJoinStyle = LineJoinStyle.MITER
     dashPattern: List[int] = field(default_factory=list)
 
 
-@dataclass(kw_only=True)
+DEFAULT_BORDER_OPTIONS = BorderOptions()
+
+
+@dataclass(kw_only=True, slots=True, frozen=True)
 class Blur:
-    _class: str = field(default="blur")
+    _class: ClassVar[str] = "blur"
     isEnabled: bool = True
     center: Point = field(default_factory=lambda: Point(0.5, 0.5))
     motionAngle: float = 0
@@ -266,45 +274,48 @@ class Blur:
 
     @staticmethod
     def Disabled() -> "Blur":
-        return Blur(isEnabled=False)
+        return DISABLED_BLUR
+
+
+DISABLED_BLUR = Blur(isEnabled=False)
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Shadow:
-    _class: str = field(default="shadow")
+    _class: ClassVar[str] = "shadow"
     blurRadius: float
     offsetX: float
     offsetY: float
     spread: float
     isEnabled: bool = True
     color: Color = field(default_factory=Color.Translucent)
-    contextSettings: ContextSettings = field(default_factory=ContextSettings)
+    contextSettings: ContextSettings = DEFAULT_CONTEXT_SETTINGS
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class InnerShadow(Shadow):
-    _class: str = field(default="innerShadow")
+    _class: ClassVar[str] = "innerShadow"
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class TextStyle:
     pass
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Style:
-    _class: str = field(default="style")
+    _class: ClassVar[str] = "style"
     do_objectID: str
-    borderOptions: BorderOptions = field(default_factory=BorderOptions)
+    borderOptions: BorderOptions = DEFAULT_BORDER_OPTIONS
     borders: List[Border] = field(default_factory=list)
     fills: List[Fill] = field(default_factory=list)
     miterLimit: int = 10
     windingRule: WindingRule = WindingRule.NON_ZERO
-    contextSettings: ContextSettings = field(default_factory=ContextSettings)
-    colorControls: ColorControls = field(default_factory=ColorControls)
+    contextSettings: ContextSettings = DEFAULT_CONTEXT_SETTINGS
+    colorControls: ColorControls = DEFAULT_COLOR_CONTROLS
     startMarkerType: MarkerType = MarkerType.NONE
     endMarkerType: MarkerType = MarkerType.NONE
-    blur: Blur = field(default_factory=Blur.Disabled)
+    blur: Blur = DISABLED_BLUR
     textStyle: Optional[TextStyle] = None
     shadows: List[Shadow] = field(default_factory=list)
     innerShadows: List[InnerShadow] = field(default_factory=list)
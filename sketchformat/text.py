@@ -3,7 +3,7 @@ from .layer_common import AbstractStyledLayer
 from .style import Color
 from dataclasses import dataclass, field, InitVar
 from enum import IntEnum
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, ClassVar
 
 
 class TextVerticalAlignment(IntEnum):
@@ -37,6 +37,8 @@ class TextBehaviour(IntEnum):
 
 
 class Bounds:
+    __slots__ = ["pos", "size"]
+
     def __init__(self, pos: Point, size: Point):
         self.pos = pos
         self.size = size
@@ -45,17 +47,18 @@ class Bounds:
         return f"{{{self.pos.to_json()}, {self.size.to_json()}}}"
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class ParagraphStyle:
-    _class: str = field(default="paragraphStyle")
+    _class: ClassVar[str] = "paragraphStyle"
     alignment: TextAlignment
     minimumLineHeight: Optional[float] = None
     maximumLineHeight: Optional[float] = None
+    paragraphSpacing: Optional[float] = None
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class FontDescriptor:
-    _class: str = field(default="fontDescriptor")
+    _class: ClassVar[str] = "fontDescriptor"
     name: InitVar[str]
     size: InitVar[float]
     attributes: Dict = field(default_factory=dict)
@@ -64,7 +67,7 @@ class FontDescriptor:
         self.attributes = {"name": name, "size": size}
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class EncodedAttributes:
     MSAttributedStringFontAttribute: FontDescriptor
     MSAttributedStringColorAttribute: Color
@@ -76,24 +79,24 @@ class EncodedAttributes:
     strikethroughStyle: Optional[UnderlineStyle] = None
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class StringAttribute:
-    _class: str = field(default="stringAttribute")
+    _class: ClassVar[str] = "stringAttribute"
     location: int
     length: int
     attributes: EncodedAttributes
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class AttributedString:
-    _class: str = field(default="attributedString")
+    _class: ClassVar[str] = "attributedString"
     string: str
     attributes: List[StringAttribute]
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Text(AbstractStyledLayer):
-    _class: str = field(default="text")
+    _class: ClassVar[str] = "text"
     attributedString: AttributedString
     glyphBounds: Bounds
     textBehaviour: TextBehaviour
@@ -102,8 +105,8 @@ class Text(AbstractStyledLayer):
     lineSpacingBehaviour: int = 2  # This is more or less a version number
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class TextStyle:
-    _class: str = field(default="textStyle")
+    _class: ClassVar[str] = "textStyle"
     encodedAttributes: EncodedAttributes
     verticalAlignment: TextVerticalAlignment
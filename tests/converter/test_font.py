@@ -0,0 +1,91 @@
+import io
+import pytest
+from .test_text import TEXT_BASE
+from converter import font, instance, text
+from converter.config import config
+from converter.context import context
+from fontTools.fontBuilder import FontBuilder
+from fontTools.pens.ttGlyphPen import TTGlyphPen
+from fontTools.ttLib import TTFont
+
+
+def make_font(characters: str = "ABC") -> bytes:
+    glyphs = [".notdef", *characters]
+    fb = FontBuilder(1000, isTTF=True)
+    fb.setupGlyphOrder(glyphs)
+    fb.setupCharacterMap({ord(c): c for c in characters})
+
+    pen = TTGlyphPen(None)
+    pen.moveTo((0, 0))
+    pen.lineTo((0, 500))
+    pen.lineTo((500, 500))
+    pen.closePath()
+    fb.setupGlyf({g: pen.glyph() for g in glyphs})
+
+    fb.setupHorizontalMetrics({g: (500, 0) for g in glyphs})
+    fb.setupHorizontalHeader(ascent=800, descent=-200)
+    fb.setupNameTable({"familyName": "Test", "styleName": "Regular"})
+    fb.setupOS2()
+    fb.setupPost()
+
+    out = io.BytesIO()
+    fb.save(out)
+    return out.getvalue()
+
+
+@pytest.fixture
+def cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(font, "fonts_cache_dir", str(tmp_path))
+    return tmp_path
+
+
+def test_subset_font(cache_dir):
+    data = make_font()
+    subset = font.subset_font(data, {ord("A"), ord("C")})
+
+    subset_font = TTFont(io.BytesIO(subset))
+    assert set(subset_font.getBestCmap().keys()) == {ord("A"), ord("C")}
+    assert subset_font["name"].getBestFamilyName() == "Test"
+    assert len(subset) < len(data)
+
+
+def test_subset_is_deterministic_and_cached(cache_dir):
+    data = make_font()
+    first = font.subset_font(data, {ord("B")})
+    assert len(list((cache_dir / "subsets").iterdir())) == 1
+
+    second = font.subset_font(data, {ord("B")})
+    assert first == second
+    assert len(list((cache_dir / "subsets").iterdir())) == 1
+
+    font.subset_font(data, {ord("A"), ord("B")})
+    assert len(list((cache_dir / "subsets").iterdir())) == 2
+
+
+@pytest.mark.parametrize(
+    "text_case, characters, expected",
+    [("UPPER", "ab", "ABab"), ("LOWER", "AB", "ABab"), ("TITLE", "aB", "ABab")],
+)
+def test_subset_keeps_text_case(cache_dir, monkeypatch, text_case, characters, expected):
+    monkeypatch.setattr(config, "subset_fonts", True)
+    monkeypatch.setattr(context, "record_font", lambda _: "Test-Regular")
+    fig_text = {
+        **TEXT_BASE,
+        "fontName": {"family": "Test", "style": "Regular"},
+        "textCase": text_case,
+        "textData": {"characters": characters},
+    }
+    context.init(None, {fig_text["guid"]: fig_text})
+
+    text.override_characters_style(fig_text)
+    assert context.page_state().codepoints == {("Test", "Regular"): {ord(c) for c in expected}}
+
+    # Text overrides in instances are rendered with the same case
+    context.init(None, {fig_text["guid"]: fig_text})
+    instance.record_override_characters(fig_text["guid"], characters)
+    context.merge_page(context.page_state())
+    assert context.font_codepoints(("Test", "Regular")) == {ord(c) for c in expected}
+
+    subset = font.subset_font(make_font(), context.font_codepoints(("Test", "Regular")))
+    cmap = TTFont(io.BytesIO(subset)).getBestCmap()
+    assert {chr(c) for c in cmap} == set(expected) & {"A", "B", "C"}
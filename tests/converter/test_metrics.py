@@ -0,0 +1,58 @@
+import logging
+import pytest
+from collections import Counter
+from converter import metrics, utils
+from converter.context import context
+from zipfile import ZipFile
+
+
+@pytest.fixture
+def clean_warnings(monkeypatch):
+    monkeypatch.setattr(utils, "issued_warnings", {})
+    monkeypatch.setattr(utils, "warning_counts", Counter())
+    monkeypatch.setattr(utils, "warning_samples", {})
+    monkeypatch.setattr(utils, "WARNING_SAMPLE_SIZE", 2)
+
+
+def node(i):
+    return {"guid": (1, i), "type": "INSTANCE", "name": f"Instance {i}"}
+
+
+def test_warnings_are_counted_once_per_node(clean_warnings):
+    for i in range(3):
+        utils.log_conversion_warning("SYM003", node(i), props=["fillPaints"])
+        utils.log_conversion_warning("SYM003", node(i), props=["fillPaints"])
+    utils.log_conversion_warning("SYM001", node(0))
+
+    assert utils.warning_counts == {"SYM003": 3, "SYM001": 1}
+    assert utils.warning_samples == {"SYM003": [(1, 0), (1, 1)], "SYM001": [(1, 0)]}
+
+
+def test_warning_message_is_formatted_when_logged(clean_warnings, caplog):
+    with caplog.at_level(logging.INFO):
+        utils.log_conversion_warning("SYM002", node(0), props=["fillPaints"])
+
+    assert caplog.messages == [
+        "[SYM002] INSTANCE 'Instance 0' overrides unsupported properties: ['fillPaints']. "
+        "The override will be ignored"
+    ]
+
+
+def test_collect(clean_warnings, tmp_path):
+    context.init(None, {})
+    utils.log_conversion_warning("SYM001", node(0))
+
+    with ZipFile(tmp_path / "out.sketch", "w") as output:
+        output.writestr("document.json", "{}")
+
+    result = metrics.collect(output, 2)
+    assert result["warnings"] == {
+        "SYM001": {
+            "count": 1,
+            "message": utils.WARNING_MESSAGES["SYM001"],
+            "sample_guids": ["1:0"],
+        }
+    }
+    assert result["images"] == 2
+    assert result["entries"] == {"document.json": {"size": 2, "compressed_size": 2}}
+    assert "phases" in result
@@ -1,6 +1,9 @@
 from converter import positioning
 from converter.errors import Fig2SketchWarning
 from math import nan
+from sketchformat.layer_common import Rect
+from sketchformat.layer_shape import Rectangle
+from sketchformat.style import Style
 import pytest
 
 
@@ -28,3 +31,26 @@ def test_0_size():
 
     pos = positioning.convert(fig)
     assert pos["frame"].height == 0.1
+
+
+def layer(x, y, width, height, rotation):
+    return Rectangle(
+        do_objectID="RECT",
+        name="Rectangle",
+        frame=Rect(x=x, y=y, width=width, height=height),
+        resizingConstraint=63,
+        rotation=rotation,
+        style=Style(do_objectID="STYLE"),
+    )
+
+
+def test_bbox_from_frame():
+    assert positioning.bbox_from_frame(layer(10, 20, 30, 40, 0)) == (10, 40, 20, 60)
+    assert positioning.bbox_from_frame(layer(10, 20, 30, 40, 90)) == pytest.approx((5, 45, 25, 55))
+
+
+def test_group_bbox():
+    layers = [layer(10, 20, 30, 40, 0), layer(10, 20, 30, 40, 90), layer(-5, 0, 1, 1, 0)]
+
+    assert positioning.group_bbox(layers) == pytest.approx((-5, 45, 0, 60))
+    assert positioning.group_bbox([]) == (0, 0, 0, 0)
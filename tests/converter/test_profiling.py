@@ -0,0 +1,78 @@
+import time
+from converter.profiling import Profiler
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler()
+    with profiler.phase("convert.page", "Page 1"):
+        with profiler.phase("convert.node"):
+            pass
+
+    assert profiler.report()["phases"] == {}
+    # Disabled phases do not allocate
+    assert profiler.phase("convert.page") is profiler.phase("zip.write")
+
+
+def test_phases_and_items():
+    profiler = Profiler()
+    profiler.enable()
+
+    for page in ["Page 1", "Page 2", "Page 1"]:
+        with profiler.phase("convert.page", page):
+            with profiler.phase("fonts.fetch"):
+                pass
+
+    phases = profiler.report()["phases"]
+    assert phases["convert.page"]["calls"] == 3
+    assert phases["fonts.fetch"]["calls"] == 3
+    assert "items" not in phases["fonts.fetch"]
+    assert {k: v["calls"] for k, v in phases["convert.page"]["items"].items()} == {
+        "Page 1": 2,
+        "Page 2": 1,
+    }
+    assert phases["convert.page"]["wall"] >= phases["fonts.fetch"]["wall"]
+
+
+def test_cprofile_single_phase(tmp_path):
+    profiler = Profiler()
+    profiler.enable("convert.page")
+
+    with profiler.phase("convert.page"):
+        # Re-entering the profiled phase must not fail
+        with profiler.phase("convert.page"):
+            sum(range(100))
+    with profiler.phase("serialize.page"):
+        pass
+
+    profiler.write_cprofile(str(tmp_path / "out.prof"))
+    assert (tmp_path / "out.prof").exists()
+
+
+def convert(node):
+    pass
+
+
+def test_node_stats_and_slowest_nodes():
+    profiler = Profiler(slowest_nodes=2)
+    profiler.enable()
+
+    page = {"guid": (0, 1), "name": "Page 1", "children": [{}, {}, {}]}
+    profiler.start_node(page, "CANVAS")
+    for i in range(3):
+        rect = {"guid": (1, i), "name": f"Rect {i}"}
+        profiler.start_node(rect, "RECTANGLE")
+        time.sleep(0.001 * i)
+        profiler.end_node(rect, "RECTANGLE", convert)
+    profiler.end_node(page, "CANVAS", convert)
+
+    report = profiler.report()
+    node_types = {n["type"]: n for n in report["node_types"]}
+    assert node_types["RECTANGLE"]["count"] == 3
+    assert node_types["RECTANGLE"]["converter"] == f"{__name__}.convert"
+    assert node_types["CANVAS"]["self_time"] < node_types["CANVAS"]["total_time"]
+    assert node_types["CANVAS"]["total_time"] >= node_types["RECTANGLE"]["total_time"]
+
+    slowest = report["slowest_nodes"]
+    assert [n["guid"] for n in slowest] == ["1:2", "1:1"]
+    assert slowest[0]["page"] == "Page 1"
+    assert slowest[0]["children"] == 0
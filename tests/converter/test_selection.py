@@ -0,0 +1,147 @@
+import copy
+import pytest
+from converter.context import context
+from converter.selection import PageNotFound, required_nodes, select_pages, shared_nodes
+
+
+def node(guid, type_, children=[], **kw):
+    return {"guid": guid, "type": type_, "name": f"{type_} {guid[1]}", "children": children, **kw}
+
+
+# Page 1 uses a symbol defined in page 2, with a nested instance of a symbol in page 3
+SYMBOL_2 = node((0, 31), "SYMBOL", [node((0, 32), "VECTOR")])
+SYMBOL_1 = node(
+    (0, 21),
+    "SYMBOL",
+    [node((0, 22), "INSTANCE", symbolData={"symbolID": (0, 31), "symbolOverrides": []})],
+)
+STYLE = node((0, 40), "RECTANGLE", fillPaints=[])
+PAGE_1 = node(
+    (0, 1),
+    "CANVAS",
+    [
+        node(
+            (0, 11),
+            "INSTANCE",
+            symbolData={"symbolID": (0, 21), "symbolOverrides": []},
+            inheritFillStyleID=(0, 40),
+        ),
+        node(
+            (0, 12),
+            "FRAME",
+            prototypeInteractions=[{"actions": [{"transitionNodeID": (0, 23)}]}],
+        ),
+    ],
+)
+PAGE_2 = node((0, 2), "CANVAS", [SYMBOL_1, node((0, 23), "FRAME", [node((0, 24), "VECTOR")])])
+PAGE_3 = node((0, 3), "CANVAS", [SYMBOL_2, node((0, 33), "VECTOR")])
+PAGES = [PAGE_1, PAGE_2, PAGE_3]
+
+
+def id_map(pages=PAGES):
+    nodes = {}
+    stack = [*pages, STYLE]
+    while stack:
+        n = stack.pop()
+        nodes[n["guid"]] = n
+        stack += n["children"]
+    return nodes
+
+
+class TestSelectPages:
+    def test_no_selection(self):
+        assert select_pages(PAGES, None) == (PAGES, [])
+
+    def test_by_name_guid_and_index(self):
+        assert select_pages(PAGES, ["CANVAS 3", "0:1"]) == ([PAGE_1, PAGE_3], [PAGE_2])
+        assert select_pages(PAGES, ["1"]) == ([PAGE_2], [PAGE_1, PAGE_3])
+
+    def test_names_take_precedence(self):
+        page = node((0, 4), "CANVAS", name="0")
+        assert select_pages([*PAGES, page], ["0"]) == ([page], PAGES)
+
+    def test_not_found(self):
+        with pytest.raises(PageNotFound):
+            select_pages(PAGES, ["Missing"])
+
+        with pytest.raises(PageNotFound):
+            select_pages(PAGES, ["3"])
+
+    def test_shards(self):
+        assert select_pages(PAGES, None, (1, 2)) == ([PAGE_1, PAGE_3], [PAGE_2])
+        assert select_pages(PAGES, None, (2, 2)) == ([PAGE_2], [PAGE_1, PAGE_3])
+        assert select_pages(PAGES, None, (3, 4)) == ([PAGE_3], [PAGE_1, PAGE_2])
+        assert select_pages(PAGES, None, (4, 4)) == ([], PAGES)
+
+        # Shards split the selected pages
+        assert select_pages(PAGES, ["0", "2"], (2, 2)) == ([PAGE_3], [PAGE_1, PAGE_2])
+
+
+def test_required_nodes():
+    required = required_nodes([PAGE_1], id_map())
+
+    assert required == {
+        # Page 1
+        (0, 1),
+        (0, 11),
+        (0, 12),
+        # Shared style
+        (0, 40),
+        # Symbols, with their children
+        (0, 21),
+        (0, 22),
+        (0, 31),
+        (0, 32),
+        # Prototype destination, without its children
+        (0, 23),
+    }
+
+
+def test_required_nodes_referenced_before_their_parent():
+    # The link is visited before the frame it links to, which still needs its children
+    frame = node((0, 51), "FRAME", [node((0, 52), "VECTOR")])
+    link = node(
+        (0, 53), "FRAME", prototypeInteractions=[{"actions": [{"transitionNodeID": (0, 51)}]}]
+    )
+    page = node((0, 5), "CANVAS", [frame, link])
+
+    assert required_nodes([page], id_map([page])) == {(0, 5), (0, 51), (0, 52), (0, 53)}
+
+
+def test_required_nodes_only_follow_references():
+    # Other properties can hold pairs of numbers that look like guids
+    other = node((0, 61), "VECTOR")
+    page = node((0, 6), "CANVAS", [node((0, 62), "VECTOR", vectorSize=(0, 61))])
+
+    assert required_nodes([page], id_map([page, other])) == {(0, 6), (0, 62)}
+
+
+def test_shared_nodes():
+    shared = shared_nodes(PAGES, id_map())
+
+    assert shared == {
+        # Pages
+        (0, 1),
+        (0, 2),
+        (0, 3),
+        # Symbols used by other pages, with their children
+        (0, 21),
+        (0, 22),
+        (0, 31),
+        (0, 32),
+        # Prototype destination
+        (0, 23),
+    }
+
+
+def test_release_page():
+    pages = copy.deepcopy(PAGES)
+    nodes = id_map(pages)
+    context.init(None, nodes)
+    context.find_shared_nodes(pages)
+
+    for page in pages:
+        context.release_page(page)
+
+    assert [page["children"] for page in pages] == [[], [], []]
+    assert set(nodes) == shared_nodes(PAGES, id_map()) | {(0, 40)}
@@ -0,0 +1,154 @@
+import dataclasses
+from .base import *
+from converter import shared_style
+from converter.context import context
+from sketchformat.layer_common import Rect
+from sketchformat.layer_group import Group
+from sketchformat.layer_shape import Rectangle
+from sketchformat.text import AttributedString, Bounds, Point, Text, TextBehaviour
+
+
+def rectangle(i, color=None):
+    fills = [Fill.Color(color)] if color else []
+    return Rectangle(
+        do_objectID=f"RECT-{i}",
+        name=f"Rectangle {i}",
+        frame=Rect(height=10, width=10, x=0, y=0),
+        resizingConstraint=63,
+        rotation=0,
+        style=Style(do_objectID=f"STYLE-{i}", fills=fills),
+    )
+
+
+def text(i, color):
+    return Text(
+        do_objectID=f"TEXT-{i}",
+        name=f"Text {i}",
+        frame=Rect(height=10, width=10, x=0, y=0),
+        resizingConstraint=63,
+        rotation=0,
+        style=Style(do_objectID=f"TEXT-STYLE-{i}", fills=[Fill.Color(color)]),
+        attributedString=AttributedString(string="text", attributes=[]),
+        glyphBounds=Bounds(Point(0, 0), Point(10, 10)),
+        textBehaviour=TextBehaviour.FIXED_WIDTH,
+    )
+
+
+def group(layers):
+    return Group(
+        do_objectID="GROUP",
+        name="Group",
+        frame=Rect(height=10, width=10, x=0, y=0),
+        resizingConstraint=63,
+        rotation=0,
+        style=Style(do_objectID="GROUP-STYLE"),
+        layers=layers,
+    )
+
+
+@pytest.fixture(autouse=True)
+def empty_context():
+    context.init(None, {})
+
+
+def test_repeated_styles_are_shared():
+    red = [rectangle(0, SKETCH_COLOR[0]), rectangle(1, SKETCH_COLOR[0])]
+    nested_red = rectangle(2, SKETCH_COLOR[0])
+    green = rectangle(3, SKETCH_COLOR[1])
+
+    shared_style.share_repeated_styles([group([*red, group([nested_red]), green])])
+
+    [shared] = context.shared_styles()
+    assert shared.name == "Rectangle 0"
+    assert shared.value.fills == red[0].style.fills
+    assert shared.value.do_objectID not in ["STYLE-0", "STYLE-1", "STYLE-2"]
+    assert [r.sharedStyleID for r in [*red, nested_red]] == [shared.do_objectID] * 3
+    assert green.sharedStyleID is None
+
+    # Layer styles keep their own IDs
+    assert [r.style.do_objectID for r in red] == ["STYLE-0", "STYLE-1"]
+
+
+def test_default_styles_are_not_shared():
+    layers = [rectangle(0), rectangle(1)]
+
+    shared_style.share_repeated_styles(layers)
+
+    assert context.shared_styles() == []
+    assert [r.sharedStyleID for r in layers] == [None, None]
+
+
+def test_styles_are_shared_when_written_the_same():
+    # An opacity of 1.0 is written differently than the default opacity of 1
+    layers = [rectangle(0), rectangle(1), rectangle(2)]
+    for r in layers[1:]:
+        r.style.contextSettings = dataclasses.replace(r.style.contextSettings, opacity=1.0)
+
+    shared_style.share_repeated_styles(layers)
+
+    [shared] = context.shared_styles()
+    assert [r.sharedStyleID for r in layers] == [None, shared.do_objectID, shared.do_objectID]
+
+
+def test_negative_zero_is_not_zero():
+    layers = [rectangle(i, SKETCH_COLOR[0]) for i in range(4)]
+    for r in layers[2:]:
+        r.style.fills[0].color = dataclasses.replace(r.style.fills[0].color, red=-0.0)
+    for r in layers[:2]:
+        r.style.fills[0].color = dataclasses.replace(r.style.fills[0].color, red=0.0)
+
+    shared_style.share_repeated_styles(layers)
+
+    zero, negative_zero = context.shared_styles()
+    assert zero.do_objectID != negative_zero.do_objectID
+    assert [r.sharedStyleID for r in layers] == [zero.do_objectID] * 2 + [
+        negative_zero.do_objectID
+    ] * 2
+
+
+def test_shared_style_id_does_not_depend_on_the_layers():
+    first = [rectangle(0, SKETCH_COLOR[2]), rectangle(1, SKETCH_COLOR[2])]
+    second = [rectangle(2, SKETCH_COLOR[2]), rectangle(3, SKETCH_COLOR[2])]
+
+    shared_style.share_repeated_styles(first)
+    context.start_page()
+    shared_style.share_repeated_styles(second)
+
+    assert first[0].sharedStyleID == second[0].sharedStyleID
+
+
+def test_repeated_text_styles_are_shared():
+    texts = [text(0, SKETCH_COLOR[0]), text(1, SKETCH_COLOR[0])]
+    rectangles = [rectangle(2, SKETCH_COLOR[0]), rectangle(3, SKETCH_COLOR[0])]
+
+    shared_style.share_repeated_styles([*texts, *rectangles])
+
+    [shared] = context.shared_text_styles()
+    assert shared.name == "Text 0"
+    assert [t.sharedStyleID for t in texts] == [shared.do_objectID] * 2
+    assert rectangles[0].sharedStyleID not in [None, shared.do_objectID]
+
+
+def test_text_styles_are_shared_by_name():
+    context.init(None, {(7, 8): {"guid": (7, 8), "name": "Heading"}})
+    texts = [text(0, SKETCH_COLOR[0]), text(1, SKETCH_COLOR[0]), text(2, SKETCH_COLOR[1])]
+
+    unknown = text(3, SKETCH_COLOR[0])
+
+    for t in texts:
+        shared_style.share_text_style({"inheritTextStyleID": (7, 8)}, t)
+    shared_style.share_text_style({"inheritTextStyleID": (9, 9)}, unknown)
+
+    # Different colors with the same text style get different shared styles
+    [heading, heading_color] = context.shared_text_styles()
+    assert heading.name == heading_color.name == "Heading"
+    assert [t.sharedStyleID for t in texts] == [
+        heading.do_objectID,
+        heading.do_objectID,
+        heading_color.do_objectID,
+    ]
+    assert unknown.sharedStyleID is None
+
+    # Texts already linked to a text style are not shared again
+    shared_style.share_repeated_styles(texts)
+    assert len(context.shared_text_styles()) == 2
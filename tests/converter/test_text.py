@@ -1,6 +1,7 @@
 import pytest
 from .base import *
 from converter.text import *
+from converter.text import _cached_text_style
 from converter.context import context
 
 TEXT_BASE = {
@@ -144,3 +145,35 @@ class TestOverrideStyles:
         assert c0.attributes.MSAttributedStringFontAttribute == FontDescriptor(
             name="Roboto-Normal", size=12
         )
+
+
+@pytest.mark.usefixtures("mock_fonts")
+class TestTextStyle:
+    def test_same_properties_reuse_style(self):
+        style = _cached_text_style(TEXT_BASE)
+
+        assert _cached_text_style({**TEXT_BASE, "guid": (1, 2)}) is style
+        assert _cached_text_style({**TEXT_BASE, "fontSize": 14}) is not style
+        assert (
+            _cached_text_style({**TEXT_BASE, "letterSpacing": {"units": "PIXELS", "value": 1}})
+            is not style
+        )
+
+    def test_converted_style_can_be_modified(self):
+        style = text_style(TEXT_BASE)
+        style.encodedAttributes.paragraphStyle.paragraphSpacing = 10
+
+        other = text_style({**TEXT_BASE, "guid": (1, 2)})
+        assert other.encodedAttributes.paragraphStyle.paragraphSpacing is None
+
+        attributes = override_characters_style({**TEXT_BASE, "textData": {"characters": "a"}})
+        attributes[0].attributes.kerning = 5
+        assert text_style(TEXT_BASE).encodedAttributes.kerning == 0
+
+    def test_reused_style_warnings(self, warnings):
+        fig_text = {**TEXT_BASE, "textCase": "TITLE"}
+        text_style(fig_text)
+        text_style({**fig_text, "guid": (1, 2)})
+
+        warnings.assert_any_call("TXT004", fig_text)
+        warnings.assert_any_call("TXT004", {**fig_text, "guid": (1, 2)})
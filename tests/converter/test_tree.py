@@ -0,0 +1,94 @@
+import importlib
+import logging
+from .base import *
+from converter import convert, tree
+from converter.context import context
+from converter.errors import Fig2SketchWarning
+
+FIG_RECT = {**FIG_BASE, "type": "ROUNDED_RECTANGLE"}
+
+
+def nested_groups(depth, leaf):
+    node = leaf
+    for i in range(depth):
+        node = {
+            **FIG_BASE,
+            "guid": (0, i),
+            "name": f"Group {i}",
+            "type": "FRAME",
+            "resizeToFit": True,
+            "frameMaskDisabled": True,
+            "children": [node],
+        }
+    return node
+
+
+def test_deep_nesting():
+    depth = 10000
+    g = tree.convert_node(nested_groups(depth, FIG_RECT), "")
+
+    levels = 0
+    while g._class == "group":
+        assert len(g.layers) == 1
+        g = g.layers[0]
+        levels += 1
+
+    assert levels == depth
+    assert g._class == "rectangle"
+
+
+@pytest.mark.parametrize("serializer", ["json", "orjson"])
+def test_deep_nesting_page(serializer, monkeypatch):
+    if serializer == "orjson":
+        pytest.importorskip("orjson")
+    module = importlib.import_module(f"sketchformat.serialize.{serializer}")
+    monkeypatch.setattr(convert, "serialize", module.serialize)
+    depth = 10000
+    fig_page = {
+        **FIG_BASE,
+        "type": "CANVAS",
+        "backgroundColor": FIG_COLOR[0],
+        "backgroundOpacity": 1,
+        "children": [nested_groups(depth, FIG_RECT)],
+    }
+    context.init(None, {})
+
+    result = convert.convert_page(fig_page)
+
+    assert result.data.count(b'{"_class":"group"') == depth
+
+
+def test_child_order():
+    fig_group = nested_groups(1, FIG_RECT)
+    fig_group["children"] = [{**FIG_RECT, "name": f"Rect {i}"} for i in range(5)]
+
+    g = tree.convert_node(fig_group, "")
+
+    assert [l.name for l in g.layers] == [f"Rect {i}" for i in range(5)]
+
+
+def test_failed_children_are_skipped(monkeypatch, warnings, caplog):
+    def convert(fig_node):
+        if fig_node["name"] == "warning":
+            raise Fig2SketchWarning("POS001")
+        if fig_node["name"] == "error":
+            raise Exception("Broken")
+        return rectangle_convert(fig_node)
+
+    rectangle_convert = tree.CONVERTERS["ROUNDED_RECTANGLE"]
+    monkeypatch.setitem(tree.CONVERTERS, "ROUNDED_RECTANGLE", convert)
+
+    fig_group = nested_groups(1, FIG_RECT)
+    fig_group["children"] = [
+        {**FIG_RECT, "name": "warning"},
+        {**FIG_RECT, "name": "ok"},
+        nested_groups(3, {**FIG_RECT, "name": "error"}),
+    ]
+
+    with caplog.at_level(logging.ERROR):
+        g = tree.convert_node(fig_group, "")
+
+    assert [l.name for l in g.layers] == ["ok", "Group 2"]
+    warnings.assert_any_call("POS001", fig_group)
+    assert "ROUNDED_RECTANGLE: error" in caplog.text
+    assert "Exception: Broken" in caplog.text
@@ -1,4 +1,5 @@
 from converter import user
+from converter.page import summarize
 from sketchformat.layer_group import Page, Rect, Style
 from sketchformat.layer_shape import Oval
 
@@ -24,7 +25,7 @@ class TestDefaultViewport:
             ],
         )
 
-        view = user.default_viewport(p)
+        view = user.default_viewport(summarize(p))
 
         assert view["zoomValue"] == 72
         assert view["scrollOrigin"].x == 240
@@ -50,7 +51,7 @@ class TestDefaultViewport:
             ],
         )
 
-        view = user.default_viewport(p)
+        view = user.default_viewport(summarize(p))
 
         assert view["zoomValue"] == 0.144
         assert view["scrollOrigin"].x == 599.28
@@ -67,7 +68,7 @@ class TestDefaultViewport:
             layers=[],
         )
 
-        view = user.default_viewport(p)
+        view = user.default_viewport(summarize(p))
 
         assert view["zoomValue"] == 1
         assert view["scrollOrigin"].x == 0
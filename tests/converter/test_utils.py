@@ -0,0 +1,18 @@
+from converter import utils
+from converter.config import config
+
+
+def test_object_id_depends_on_salt(monkeypatch):
+    monkeypatch.setattr(config, "salt", b"1234")
+    first = utils.gen_object_id((1, 2), b"style")
+    assert utils.gen_object_id([1, 2], b"style") == first
+    assert utils.gen_object_id((1, 2)) != first
+
+    monkeypatch.setattr(config, "salt", b"5678")
+    assert utils.gen_object_id((1, 2), b"style") != first
+
+
+def test_object_ids(monkeypatch):
+    monkeypatch.setattr(config, "salt", b"1234")
+    guids = [(1, 2), (3, 4)]
+    assert utils.gen_object_ids(guids) == [utils.gen_object_id(guid) for guid in guids]
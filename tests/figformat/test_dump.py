@@ -0,0 +1,90 @@
+import base64
+import json
+import pytest
+from converter.positioning import Matrix
+from figformat import dump
+from figformat.fignode import FigNode
+
+HASH = list(range(20))
+
+
+def node(guid, type_, children, **kw):
+    return {"guid": guid, "type": type_, "children": children, **kw}
+
+
+def fig_tree():
+    rectangle = node(
+        (0, 3),
+        "RECTANGLE",
+        [],
+        transform=Matrix([[1, 0, 10], [0, 1, 20], [0, 0, 1]]),
+        fillPaints=[{"type": "IMAGE", "image": {"hash": HASH, "name": "image"}}],
+    )
+    page = node((0, 1), "CANVAS", [FigNode(rectangle), node((0, 4), "FRAME", [])])
+    return {"document": node((0, 0), "DOCUMENT", [page])}
+
+
+IMAGE_PAINT = {
+    "type": "IMAGE",
+    "image": {"hash": {"base64": base64.b64encode(bytes(HASH)).decode()}, "name": "image"},
+}
+
+
+def test_nested(tmp_path):
+    dump.dump(fig_tree(), tmp_path / "fig.json")
+
+    fig = json.loads((tmp_path / "fig.json").read_text())
+    rectangle = fig["document"]["children"][0]["children"][0]
+    assert rectangle == {
+        "guid": [0, 3],
+        "type": "RECTANGLE",
+        "transform": [[1, 0, 10], [0, 1, 20], [0, 0, 1]],
+        "fillPaints": [IMAGE_PAINT],
+        "children": [],
+    }
+    assert fig["document"]["children"][0]["children"][1]["guid"] == [0, 4]
+
+
+def test_nested_without_orjson(tmp_path, monkeypatch):
+    dump.dump(fig_tree(), tmp_path / "orjson.json")
+    monkeypatch.setattr(dump, "orjson", None)
+    dump.dump(fig_tree(), tmp_path / "json.json")
+
+    assert json.loads((tmp_path / "orjson.json").read_text()) == json.loads(
+        (tmp_path / "json.json").read_text()
+    )
+
+
+def test_flat_and_ndjson(tmp_path):
+    dump.dump(fig_tree(), tmp_path / "fig.json", "flat")
+    dump.dump(fig_tree(), tmp_path / "fig.ndjson", "ndjson")
+
+    nodes = json.loads((tmp_path / "fig.json").read_text())["nodes"]
+    assert [(n["guid"], n["children"]) for n in nodes] == [
+        ([0, 0], [[0, 1]]),
+        ([0, 1], [[0, 3], [0, 4]]),
+        ([0, 3], []),
+        ([0, 4], []),
+    ]
+    assert nodes[2]["fillPaints"] == [IMAGE_PAINT]
+
+    lines = (tmp_path / "fig.ndjson").read_text().splitlines()
+    assert [json.loads(line) for line in lines] == nodes
+
+
+def test_blobs_dir(tmp_path):
+    dump.dump(fig_tree(), tmp_path / "fig.json", "flat", str(tmp_path / "blobs"))
+
+    nodes = json.loads((tmp_path / "fig.json").read_text())["nodes"]
+    blob = nodes[2]["fillPaints"][0]["image"]["hash"]["blob"]
+    assert (tmp_path / "blobs" / blob).read_bytes() == bytes(HASH)
+
+
+def test_msgpack(tmp_path):
+    msgpack = pytest.importorskip("msgpack")
+    dump.dump(fig_tree(), tmp_path / "fig.msgpack", "msgpack")
+
+    with open(tmp_path / "fig.msgpack", "rb") as f:
+        nodes = list(msgpack.Unpacker(f))
+    assert [n["guid"] for n in nodes] == [[0, 0], [0, 1], [0, 3], [0, 4]]
+    assert nodes[2]["fillPaints"][0]["image"]["hash"] == bytes(HASH)
@@ -0,0 +1,89 @@
+import copy
+import pickle
+import pytest
+from figformat.fignode import FigNode
+
+
+def make_node():
+    return FigNode(
+        {
+            "guid": (0, 1),
+            "type": "ROUNDED_RECTANGLE",
+            "name": "Rectangle",
+            "size": {"x": 10, "y": 20},
+            "layoutGrids": [],
+        }
+    )
+
+
+def test_mapping_access():
+    node = make_node()
+
+    assert node["type"] == "ROUNDED_RECTANGLE"
+    assert node["layoutGrids"] == []
+    assert node.get("opacity") is None
+    assert node.get("opacity", 1) == 1
+    assert node.get("cornerRadius", 0) == 0
+    assert "size" in node and "layoutGrids" in node
+    assert "opacity" not in node and "textData" not in node
+    assert len(node) == 5
+    assert dict(node) == {
+        "guid": (0, 1),
+        "type": "ROUNDED_RECTANGLE",
+        "name": "Rectangle",
+        "size": {"x": 10, "y": 20},
+        "layoutGrids": [],
+    }
+
+    with pytest.raises(KeyError):
+        node["opacity"]
+    with pytest.raises(KeyError):
+        node["textData"]
+
+
+def test_update_and_delete():
+    node = make_node()
+
+    node["opacity"] = 0.5
+    node["textData"] = {"characters": "ABC"}
+    node.setdefault("children", []).append("child")
+    del node["size"]
+    del node["layoutGrids"]
+
+    assert dict(node) == {
+        "guid": (0, 1),
+        "type": "ROUNDED_RECTANGLE",
+        "name": "Rectangle",
+        "opacity": 0.5,
+        "children": ["child"],
+        "textData": {"characters": "ABC"},
+    }
+    with pytest.raises(KeyError):
+        del node["size"]
+    with pytest.raises(KeyError):
+        del node["layoutGrids"]
+
+
+def test_enum_values_are_interned():
+    a = FigNode({"type": "".join(["FR", "AME"]), "name": "".join(["Fr", "ame"])})
+    b = FigNode({"type": "".join(["FR", "AME"]), "name": "".join(["Fr", "ame"])})
+
+    assert a["type"] is b["type"]
+    assert a["name"] is not b["name"]
+
+
+def test_copy_and_pickle():
+    node = make_node()
+
+    for other in [copy.deepcopy(node), pickle.loads(pickle.dumps(node))]:
+        assert isinstance(other, FigNode)
+        assert other == node
+        assert other["size"] is not node["size"]
+
+
+def test_match_mapping_pattern():
+    match make_node():
+        case {"type": "ROUNDED_RECTANGLE", "size": {"x": x}}:
+            assert x == 10
+        case _:
+            pytest.fail("Did not match")
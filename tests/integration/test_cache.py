@@ -0,0 +1,151 @@
+import io
+import logging
+import pytest
+from ..converter.test_font import make_font
+from .test_parallel import PAGES, fixed_salt, multi_page_fig
+from converter import convert, font, utils
+from converter.cache import PageCache
+from converter.config import config
+from collections import Counter
+from figformat import fig2tree
+from zipfile import ZipFile
+
+
+def convert_entries(tmp_path, monkeypatch, name, cache_dir=None, rename=None, edit=None):
+    """Convert the multi-page document, counting the converted pages"""
+    monkeypatch.setattr(fig2tree, "converted_images", {})
+    fig, id_map = multi_page_fig(tmp_path)
+    if rename:
+        page = fig["document"]["children"][rename]
+        page["children"][0]["name"] = "Renamed"
+    if edit:
+        edit(fig)
+
+    monkeypatch.setattr(utils, "issued_warnings", {})
+    monkeypatch.setattr(utils, "warning_counts", Counter())
+    monkeypatch.setattr(config, "cache_dir", cache_dir and str(cache_dir))
+    converted = []
+    convert_page = convert.convert_page
+    monkeypatch.setattr(
+        convert, "convert_page", lambda p: converted.append(p["name"]) or convert_page(p)
+    )
+
+    with ZipFile(tmp_path / f"{name}.sketch", "w") as output:
+        convert.convert_fig_tree_to_sketch(fig, id_map, output)
+
+    with ZipFile(tmp_path / f"{name}.sketch") as sketch:
+        entries = {name: sketch.read(name) for name in sketch.namelist()}
+
+    return entries, converted, dict(utils.warning_counts)
+
+
+def test_only_changed_pages_are_converted(tmp_path, fixed_salt, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    uncached, _, uncached_warnings = convert_entries(tmp_path, monkeypatch, "uncached")
+
+    first, converted, _ = convert_entries(tmp_path, monkeypatch, "first", cache_dir)
+    assert len(converted) == PAGES
+    assert first == uncached
+
+    second, converted, warnings = convert_entries(tmp_path, monkeypatch, "second", cache_dir)
+    assert converted == []
+    assert second == uncached
+    assert warnings == uncached_warnings
+
+    renamed, converted, _ = convert_entries(tmp_path, monkeypatch, "renamed", cache_dir, 2)
+    assert converted == ["Page 3"]
+    assert renamed == convert_entries(tmp_path, monkeypatch, "expected", None, 2)[0]
+    assert renamed != uncached
+
+
+def test_salt_is_part_of_the_key(tmp_path, fixed_salt, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    convert_entries(tmp_path, monkeypatch, "first", cache_dir)
+
+    monkeypatch.setattr(config, "salt", b"5678")
+    _, converted, _ = convert_entries(tmp_path, monkeypatch, "second", cache_dir)
+    assert len(converted) == PAGES
+
+
+def test_parallel_conversion_is_cached(tmp_path, fixed_salt, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    serial, _, _ = convert_entries(tmp_path, monkeypatch, "serial", cache_dir)
+
+    # Pages converted in worker processes are not counted, count the cached pages instead
+    monkeypatch.setattr(config, "jobs", 3)
+    cached, _, _ = convert_entries(tmp_path, monkeypatch, "cached", cache_dir)
+    assert cached == serial
+    assert len(list(cache_dir.glob("*.json"))) == PAGES
+
+    renamed, _, _ = convert_entries(tmp_path, monkeypatch, "renamed", cache_dir, 1)
+    assert len(list(cache_dir.glob("*.json"))) == PAGES + 1
+    monkeypatch.setattr(config, "jobs", 1)
+    assert renamed == convert_entries(tmp_path, monkeypatch, "expected", None, 1)[0]
+
+
+def test_cached_pages_subset_fonts_the_same(tmp_path, fixed_salt, monkeypatch):
+    monkeypatch.setattr(font, "fonts_cache_dir", str(tmp_path / "fonts"))
+    monkeypatch.setattr(font, "get_webfont", lambda *_: (io.BytesIO(make_font("ABCXYZ")), "Test"))
+    monkeypatch.setattr(config, "subset_fonts", True)
+
+    def override_characters(pages):
+        # The text override of the first instance, which is XYZ in all the pages
+        def edit(fig):
+            for page in fig["document"]["children"][pages]:
+                instance = page["children"][1]["children"][0]
+                instance["symbolData"]["symbolOverrides"][0]["textData"]["characters"] = "ABC"
+
+        return edit
+
+    def fonts(entries):
+        return {name: data for name, data in entries.items() if name.startswith("fonts/")}
+
+    # Only the last page does not use X, Y and Z
+    cache_dir = tmp_path / "cache"
+    last_page = override_characters(slice(PAGES - 1, PAGES))
+    convert_entries(tmp_path, monkeypatch, "first", cache_dir, edit=last_page)
+
+    # Now no page uses them. The last page is loaded from the cache
+    all_pages = override_characters(slice(0, PAGES))
+    cached, converted, _ = convert_entries(
+        tmp_path, monkeypatch, "cached", cache_dir, edit=all_pages
+    )
+    assert len(converted) == PAGES - 1
+    expected, _, _ = convert_entries(tmp_path, monkeypatch, "expected", edit=all_pages)
+    assert fonts(cached) == fonts(expected) != {}
+
+
+def test_cached_warnings_are_logged(tmp_path, fixed_salt, monkeypatch, caplog):
+    caplog.set_level(logging.INFO)
+    cache_dir = tmp_path / "cache"
+
+    def logged_warnings():
+        messages = [record.getMessage() for record in caplog.records]
+        caplog.clear()
+        return [message for message in messages if message.startswith("[")]
+
+    convert_entries(tmp_path, monkeypatch, "first", cache_dir)
+    converted_warnings = logged_warnings()
+    assert converted_warnings != []
+
+    _, converted, _ = convert_entries(tmp_path, monkeypatch, "second", cache_dir)
+    assert converted == []
+    # The overridden properties are not saved with the page
+    assert logged_warnings() == [
+        message.replace("['fillPaints']", "(not cached)") for message in converted_warnings
+    ]
+
+
+def test_node_digest_covers_large_arrays(tmp_path):
+    np = pytest.importorskip("numpy")
+    # Abbreviated by repr
+    blob = np.zeros(2000, dtype=np.uint8)
+    changed = blob.copy()
+    changed[1000] = 1
+
+    # Digests are kept by guid, so each node is digested by a new cache
+    digests = {
+        PageCache(str(tmp_path), {})._node_digest({"guid": (0, 1), "blob": value})
+        for value in [blob, changed, blob.astype(np.int16), blob.tobytes()]
+    }
+    assert len(digests) == 4
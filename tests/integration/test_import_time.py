@@ -0,0 +1,40 @@
+import re
+import subprocess
+import sys
+
+# Modules needed to parse the arguments and start a conversion
+STARTUP_IMPORTS = (
+    "import fig2sketch; from figformat import fig2tree; from converter import convert"
+)
+
+# Only imported when a document needs them (images, fonts or downloads)
+LAZY_MODULES = ["PIL", "fontTools", "ssl", "urllib.request", "certifi"]
+
+
+def import_times(code=STARTUP_IMPORTS):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    times = {}
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)", line)
+        if match:
+            times[match.group(4)] = (int(match.group(2)), len(match.group(3)))
+
+    return times
+
+
+def startup_import_times():
+    # Ignore whatever the interpreter imports on its own (site, .pth files, etc.)
+    interpreter = import_times("pass")
+    return {k: v for k, v in import_times().items() if k not in interpreter}
+
+
+def test_lazy_modules_are_not_imported():
+    times = startup_import_times()
+    for module in LAZY_MODULES:
+        assert module not in times
@@ -0,0 +1,165 @@
+import copy
+import json
+import multiprocessing
+import pytest
+import threading
+from converter import convert, tree, utils
+from converter.config import config
+from figformat import fig2tree
+from sketchformat.archive import SketchArchive
+from zipfile import ZipFile
+
+PAGES = 4
+
+
+def remap_guids(node, guids, offset):
+    if type(node) is dict:
+        return {k: remap_guids(v, guids, offset) for k, v in node.items()}
+    elif type(node) is list:
+        return [remap_guids(v, guids, offset) for v in node]
+    elif isinstance(node, tuple) and node in guids:
+        return (node[0] + offset, node[1])
+    else:
+        return node
+
+
+def subtree_guids(node):
+    guids = {node["guid"]}
+    for child in node["children"]:
+        guids |= subtree_guids(child)
+    return guids
+
+
+def multi_page_fig(tmp_path):
+    """Build a document with several copies of the test page, all of them using a symbol
+    in the internal page"""
+    with ZipFile(tmp_path / "images.zip", "w") as images:
+        fig, id_map = fig2tree.convert_fig("tests/data/structure.fig", images)
+
+    page, internal_page = fig["document"]["children"]
+    symbol = id_map[(1, 37)]
+    page["children"][1]["children"].remove(symbol)
+    internal_page["children"].append(symbol)
+
+    guids = subtree_guids(page)
+    for i in range(1, PAGES):
+        page_copy = remap_guids(copy.deepcopy(page), guids, 1000 * i)
+        page_copy["name"] = f"Page {i + 1}"
+        fig["document"]["children"].insert(i, page_copy)
+
+        stack = [page_copy]
+        while stack:
+            node = stack.pop()
+            id_map[node["guid"]] = node
+            stack += node["children"]
+
+    return fig, id_map
+
+
+def convert_entries(tmp_path, jobs, monkeypatch):
+    # Images are only written to the first output that uses them
+    monkeypatch.setattr(fig2tree, "converted_images", {})
+    fig, id_map = multi_page_fig(tmp_path)
+    monkeypatch.setattr(utils, "issued_warnings", {})
+    config.jobs = jobs
+
+    with SketchArchive(str(tmp_path / f"out{jobs}.sketch")) as output:
+        # Compressed in a thread, like the images written while reading the fig document
+        with output.open("images/large", "w") as f:
+            f.write(bytes(range(256)) * 4000)
+        convert.convert_fig_tree_to_sketch(fig, id_map, output)
+
+    with ZipFile(tmp_path / f"out{jobs}.sketch") as sketch:
+        return {name: sketch.read(name) for name in sketch.namelist()}
+
+
+@pytest.fixture
+def fixed_salt(monkeypatch):
+    monkeypatch.setattr(config, "salt", b"1234")
+    monkeypatch.setattr(config, "jobs", 1)
+
+
+def test_parallel_output_matches_serial(tmp_path, fixed_salt, monkeypatch):
+    serial = convert_entries(tmp_path, 1, monkeypatch)
+    parallel = convert_entries(tmp_path, 3, monkeypatch)
+
+    # All the pages and the symbols page
+    assert len([name for name in serial if name.startswith("pages/")]) == PAGES + 1
+    assert list(serial.keys()) == list(parallel.keys())
+    for name in serial:
+        assert serial[name] == parallel[name], name
+
+
+def test_workers_are_forked_without_compression_threads(tmp_path, fixed_salt, monkeypatch):
+    threads_at_fork = []
+    get_context = multiprocessing.get_context
+
+    def recording_get_context(method):
+        threads_at_fork.append([t.name for t in threading.enumerate()])
+        return get_context(method)
+
+    monkeypatch.setattr(convert.multiprocessing, "get_context", recording_get_context)
+    convert_entries(tmp_path, 3, monkeypatch)
+
+    [threads] = threads_at_fork
+    assert not [name for name in threads if name.startswith("compress")]
+
+
+def test_serial_conversion_converts_symbols_once(tmp_path, fixed_salt, monkeypatch):
+    converted = []
+    convert_symbol = tree.CONVERTERS["SYMBOL"]
+
+    def counting_convert(fig_symbol):
+        converted.append(fig_symbol["guid"])
+        return convert_symbol(fig_symbol)
+
+    monkeypatch.setitem(tree.CONVERTERS, "SYMBOL", counting_convert)
+    convert_entries(tmp_path, 1, monkeypatch)
+
+    # All the pages use the symbol in the internal page
+    assert converted == [(1, 37)]
+
+
+def test_serial_conversion_keeps_nodes_used_by_later_pages(tmp_path, fixed_salt, monkeypatch):
+    monkeypatch.setattr(fig2tree, "converted_images", {})
+    monkeypatch.setattr(utils, "issued_warnings", {})
+    with ZipFile(tmp_path / "images.zip", "w") as images:
+        fig, id_map = fig2tree.convert_fig("tests/data/structure.fig", images)
+
+    # Page 2 uses the symbol in a frame of page 1, from a frame that is linked to from a
+    # node after it, so the frame is first found as a prototype destination
+    page = fig["document"]["children"][0]
+    page_copy = remap_guids(copy.deepcopy(page), subtree_guids(page) - {(1, 37)}, 1000)
+    page_copy["name"] = "Page 2"
+    groups, frame = page_copy["children"]
+    frame["children"] = [c for c in frame["children"] if c["guid"] != (1, 37)]
+    groups["prototypeInteractions"] = [
+        {
+            "isDeleted": False,
+            "event": {"interactionType": "ON_CLICK"},
+            "actions": [
+                {
+                    "navigationType": "NAVIGATE",
+                    "connectionType": "INTERNAL_NODE",
+                    "transitionNodeID": frame["guid"],
+                }
+            ],
+        }
+    ]
+    page_copy["children"] = [frame, groups]
+    fig["document"]["children"].insert(1, page_copy)
+
+    stack = [page_copy]
+    while stack:
+        node = stack.pop()
+        id_map[node["guid"]] = node
+        stack += node["children"]
+
+    with ZipFile(tmp_path / "out.sketch", "w") as output:
+        convert.convert_fig_tree_to_sketch(fig, id_map, output)
+
+    # The instances in page 2 are not skipped, the symbol is not released with page 1
+    with ZipFile(tmp_path / "out.sketch") as sketch:
+        page_data = json.loads(sketch.read(f"pages/{utils.gen_object_id(page_copy['guid'])}.json"))
+    names = [layer["name"] for layer in page_data["layers"][0]["layers"]]
+    assert names[:2] == ["Component 2", "Component 3"]
@@ -0,0 +1,86 @@
+import pytest
+from .test_parallel import PAGES, fixed_salt, multi_page_fig
+from converter import convert, shard, utils
+from converter.config import config
+from figformat import fig2tree
+from zipfile import ZipFile
+
+
+def read_entries(path):
+    with ZipFile(path) as sketch:
+        return {name: sketch.read(name) for name in sketch.namelist()}
+
+
+def convert_shards(tmp_path, monkeypatch, count):
+    paths = []
+    for index in range(1, count + 1):
+        monkeypatch.setattr(fig2tree, "converted_images", {})
+        monkeypatch.setattr(utils, "issued_warnings", {})
+        fig, id_map = multi_page_fig(tmp_path)
+        monkeypatch.setattr(config, "shard", (index, count))
+
+        path = tmp_path / f"{index}.shard"
+        with ZipFile(path, "w") as output:
+            shard.convert_shard(fig, id_map, output)
+        paths.append(str(path))
+        monkeypatch.setattr(config, "shard", None)
+
+    return paths
+
+
+def merge_shards(tmp_path, monkeypatch, paths):
+    monkeypatch.setattr(utils, "issued_warnings", {})
+    with ZipFile(tmp_path / "merged.sketch", "w") as output:
+        shard.merge(paths, output)
+
+    return read_entries(tmp_path / "merged.sketch")
+
+
+def test_merged_shards_match_a_full_conversion(tmp_path, fixed_salt, monkeypatch):
+    monkeypatch.setattr(fig2tree, "converted_images", {})
+    monkeypatch.setattr(utils, "issued_warnings", {})
+    fig, id_map = multi_page_fig(tmp_path)
+    with ZipFile(tmp_path / "full.sketch", "w") as output:
+        convert.convert_fig_tree_to_sketch(fig, id_map, output)
+    full = read_entries(tmp_path / "full.sketch")
+    full_warnings = utils.issued_warnings
+
+    paths = convert_shards(tmp_path, monkeypatch, 3)
+
+    # The first shard has the first and the last page, the others one page each
+    for path, pages in zip(paths, [2, 1, 1]):
+        entries = read_entries(path)
+        assert len([name for name in entries if name.startswith("pages/")]) == pages
+        assert shard.MANIFEST in entries
+        assert "document.json" not in entries
+
+    # Shards can be given in any order, and the merge does not depend on the configuration
+    monkeypatch.setattr(config, "salt", b"5678")
+    merged = merge_shards(tmp_path, monkeypatch, list(reversed(paths)))
+    assert merged == full
+    assert utils.issued_warnings == full_warnings
+    assert len([name for name in merged if name.startswith("pages/")]) == PAGES + 1
+
+
+def test_missing_shards(tmp_path, fixed_salt, monkeypatch):
+    paths = convert_shards(tmp_path, monkeypatch, 3)
+
+    with pytest.raises(shard.ShardError, match="Missing shards 2/3"):
+        merge_shards(tmp_path, monkeypatch, [paths[0], paths[2]])
+
+    with pytest.raises(shard.ShardError, match="Expected 3 different shards"):
+        merge_shards(tmp_path, monkeypatch, [*paths, paths[1]])
+
+
+def test_shards_must_match(tmp_path, fixed_salt, monkeypatch):
+    paths = convert_shards(tmp_path, monkeypatch, 2)
+
+    monkeypatch.setattr(config, "salt", b"5678")
+    (tmp_path / "other").mkdir()
+    other_salt = convert_shards(tmp_path / "other", monkeypatch, 2)
+
+    with pytest.raises(shard.ShardError, match="different options or salts"):
+        merge_shards(tmp_path, monkeypatch, [paths[0], other_salt[1]])
+
+    with pytest.raises(shard.ShardError, match="not a fig2sketch shard"):
+        merge_shards(tmp_path, monkeypatch, [paths[0], str(tmp_path / "images.zip")])
@@ -16,6 +16,26 @@ def sketch_doc(tmp_path_factory):
         yield sketch
 
 
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["--compression-level=0"],
+        ["--compression-level=fast"],
+        ["--compression-level=10"],
+        ["--compression=zstd-if-available", "--compression-level=23"],
+    ],
+)
+def test_invalid_compression_level(args):
+    with pytest.raises(SystemExit):
+        fig2sketch.parse_args(["tests/data/structure.fig", "out.sketch", *args])
+
+
+@pytest.mark.parametrize("jobs", ["0", "-2", "many"])
+def test_invalid_jobs(jobs):
+    with pytest.raises(SystemExit):
+        fig2sketch.parse_args(["tests/data/structure.fig", "out.sketch", "--jobs", jobs])
+
+
 def test_user(sketch_doc):
     with sketch_doc.open("user.json") as user_json:
         user = json.load(user_json)
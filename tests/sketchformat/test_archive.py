@@ -0,0 +1,86 @@
+import os
+import pytest
+import threading
+import zipfile
+from sketchformat.archive import SketchArchive
+
+ENTRIES = [
+    ("pages/a.json", b'{"layers":[]}' * 20000),
+    ("small.json", b"{}"),
+    ("images/random", os.urandom(100000)),
+    ("pages/b.json", b'{"_class":"page"}' * 50000),
+]
+
+
+def write_archive(path, **kwargs):
+    with SketchArchive(str(path), **kwargs) as archive:
+        for name, data in ENTRIES:
+            with archive.open(name, "w") as f:
+                f.write(data)
+
+
+@pytest.mark.parametrize("compression", ["stored", "deflate", "zstd-if-available"])
+def test_roundtrip(tmp_path, compression):
+    write_archive(tmp_path / "out.sketch", compression=compression)
+
+    with zipfile.ZipFile(tmp_path / "out.sketch") as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == [name for name, _ in ENTRIES]
+        for name, data in ENTRIES:
+            assert archive.read(name) == data
+
+
+def test_compression_methods(tmp_path):
+    write_archive(tmp_path / "deflate.sketch", compression="deflate", level=1)
+    write_archive(tmp_path / "stored.sketch", compression="stored")
+
+    with zipfile.ZipFile(tmp_path / "deflate.sketch") as archive:
+        types = {info.filename: info.compress_type for info in archive.infolist()}
+        assert types["pages/a.json"] == zipfile.ZIP_DEFLATED
+        assert types["pages/b.json"] == zipfile.ZIP_DEFLATED
+        # Incompressible data is stored
+        assert types["images/random"] == zipfile.ZIP_STORED
+
+    with zipfile.ZipFile(tmp_path / "stored.sketch") as archive:
+        assert {info.compress_type for info in archive.infolist()} == {zipfile.ZIP_STORED}
+
+    assert os.path.getsize(tmp_path / "deflate.sketch") < os.path.getsize(
+        tmp_path / "stored.sketch"
+    )
+
+
+def test_zstd_levels(tmp_path):
+    # Also valid when falling back to deflate
+    write_archive(tmp_path / "out.sketch", compression="zstd-if-available", level=22)
+
+    with zipfile.ZipFile(tmp_path / "out.sketch") as archive:
+        assert archive.testzip() is None
+
+
+def test_stop_threads(tmp_path):
+    with SketchArchive(str(tmp_path / "out.sketch")) as archive:
+        for name, data in ENTRIES[:2]:
+            with archive.open(name, "w") as f:
+                f.write(data)
+        archive.stop_threads()
+        assert not [t for t in threading.enumerate() if t.name.startswith("compress")]
+
+        # Threads are started again for the next entries
+        for name, data in ENTRIES[2:]:
+            with archive.open(name, "w") as f:
+                f.write(data)
+
+    with zipfile.ZipFile(tmp_path / "out.sketch") as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == [name for name, _ in ENTRIES]
+
+
+def test_deterministic_output(tmp_path):
+    write_archive(tmp_path / "a.sketch", workers=1)
+    write_archive(tmp_path / "b.sketch", workers=8)
+
+    with zipfile.ZipFile(tmp_path / "a.sketch") as a, zipfile.ZipFile(tmp_path / "b.sketch") as b:
+        for info_a, info_b in zip(a.infolist(), b.infolist()):
+            assert info_a.filename == info_b.filename
+            assert info_a.header_offset == info_b.header_offset
+            assert info_a.CRC == info_b.CRC
@@ -0,0 +1,203 @@
+import io
+import json
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional
+from sketchformat.common import Point
+from sketchformat.layer_common import Rect
+from sketchformat.layer_group import Group
+from sketchformat.layer_shape import Rectangle
+from sketchformat.style import *
+from sketchformat.serialize import json as json_serializer
+from sketchformat.serialize.decode import decode
+from sketchformat.serialize.json import dumps, serialize
+
+
+@dataclass(kw_only=True)
+class Keyword:
+    _class: str = field(default="keyword")
+    from_: str
+    optional: Optional[str] = None
+
+
+def test_dataclass_keys():
+    assert dumps(Keyword(from_="x")) == '{"_class":"keyword","from":"x"}'
+    assert dumps(Keyword(from_="x", optional="y")) == (
+        '{"_class":"keyword","from":"x","optional":"y"}'
+    )
+
+
+def test_primitives():
+    assert dumps([True, None, 1, 0.5, "ñ🏳️‍🌈", {"a": []}]) == '[true,null,1,0.5,"ñ🏳️‍🌈",{"a":[]}]'
+    assert dumps([float("nan"), float("inf")]) == "[NaN,Infinity]"
+
+
+def test_to_json_objects():
+    assert dumps(Point(1, 2.5)) == '"{1, 2.5}"'
+
+
+def test_gradient_from():
+    gradient = Gradient.Linear(
+        from_=Point(0, 0),
+        to=Point(1, 1),
+        stops=[GradientStop(color=Color.Black(), position=0)],
+    )
+    obj = json.loads(dumps(gradient))
+    assert obj["from"] == "{0, 0}"
+    assert obj["to"] == "{1, 1}"
+
+
+def test_layer():
+    rect = Rectangle(
+        do_objectID="ID",
+        name="rect",
+        frame=Rect(height=10, width=20, x=1, y=2),
+        resizingConstraint=63,
+        rotation=0,
+        style=Style(do_objectID="STYLE", fills=[Fill.Color(Color.White())]),
+    )
+    out = io.BytesIO()
+    serialize(rect, out)
+    obj = json.loads(out.getvalue())
+
+    assert list(obj)[0] == "_class"
+    assert obj["_class"] == "rectangle"
+    assert obj["booleanOperation"] == -1
+    assert obj["frame"] == {
+        "_class": "rect",
+        "height": 10,
+        "width": 20,
+        "x": 1,
+        "y": 2,
+        "constrainProportions": False,
+    }
+    assert "flow" not in obj
+    assert obj["style"]["fills"][0]["color"] == {
+        "_class": "color",
+        "red": 1,
+        "green": 1,
+        "blue": 1,
+        "alpha": 1,
+    }
+    assert [p["point"] for p in obj["points"]] == ["{0, 0}", "{0, 1}", "{1, 1}", "{1, 0}"]
+
+
+def test_shared_defaults():
+    style = Style(
+        do_objectID="STYLE", shadows=[Shadow(blurRadius=1, offsetX=0, offsetY=0, spread=0)]
+    )
+    copies = Style(
+        do_objectID="STYLE",
+        shadows=[
+            Shadow(blurRadius=1, offsetX=0, offsetY=0, spread=0, contextSettings=ContextSettings())
+        ],
+        borderOptions=BorderOptions(),
+        contextSettings=ContextSettings(),
+        colorControls=ColorControls(),
+        blur=Blur(isEnabled=False),
+    )
+
+    assert style.blur is Blur.Disabled()
+    assert dumps(style) == dumps(copies)
+
+
+def test_orjson_matches_stdlib():
+    orjson = pytest.importorskip("orjson")
+    from sketchformat.serialize import orjson as orjson_serializer
+
+    gradient = Gradient.Linear(
+        from_=Point(0, 0),
+        to=Point(1, 1),
+        stops=[GradientStop(color=Color.Black(), position=0)],
+    )
+    rect = Rectangle(
+        do_objectID="ID",
+        name="rect",
+        frame=Rect(height=10, width=20.5, x=1, y=2),
+        resizingConstraint=63,
+        rotation=0,
+        style=Style(do_objectID="STYLE", fills=[Fill.Gradient(gradient, isEnabled=True)]),
+    )
+    out = io.BytesIO()
+    orjson_serializer.serialize(rect, out)
+
+    assert out.getvalue() == dumps(rect).encode()
+
+
+def test_decode():
+    gradient = Gradient.Linear(
+        from_=Point(0, 0.5),
+        to=Point(1, 1),
+        stops=[GradientStop(color=Color.Black(), position=0)],
+    )
+    rect = Rectangle(
+        do_objectID="ID",
+        name="rect",
+        frame=Rect(height=10, width=20.5, x=1, y=2),
+        resizingConstraint=63,
+        rotation=0,
+        style=Style(do_objectID="STYLE", fills=[Fill.Gradient(gradient, isEnabled=True)]),
+    )
+    group = nested_groups(2)
+    group.layers.append(rect)
+
+    decoded = decode(Group, json.loads(dumps(group)))
+
+    assert dumps(decoded) == dumps(group)
+    assert isinstance(decoded.layers[1], Rectangle)
+    assert decoded.layers[1].style.fills[0].gradient.from_ == Point(0, 0.5)
+    assert decoded.layers[1].style.fills[0].fillType == FillType.GRADIENT
+
+
+def nested_groups(depth):
+    layer = Rectangle(
+        do_objectID="ID",
+        name="rect",
+        frame=Rect(height=10, width=20, x=1, y=2),
+        resizingConstraint=63,
+        rotation=0,
+        style=Style(do_objectID="STYLE"),
+    )
+    for i in range(depth):
+        layer = Group(
+            do_objectID=f"GROUP {i}",
+            name=f"Group {i}",
+            frame=Rect(height=10, width=20, x=0, y=0),
+            resizingConstraint=63,
+            rotation=0,
+            style=Style(do_objectID="STYLE"),
+            layers=[layer],
+        )
+    return layer
+
+
+def test_deep_nesting(monkeypatch):
+    assert dumps(nested_groups(2000)).count('{"_class":"group"') == 2000
+
+    # Deeper values are encoded later, with the same result
+    group = nested_groups(150)
+    deferred = dumps(group)
+    monkeypatch.setattr(json_serializer, "MAX_DEPTH", 1000)
+    assert dumps(group) == deferred
+
+
+def test_deep_nesting_in_threads():
+    groups = [nested_groups(depth) for depth in [150, 250, 350, 450]]
+    expected = [dumps(group) for group in groups]
+
+    with ThreadPoolExecutor(4) as executor:
+        for _ in range(5):
+            assert list(executor.map(dumps, groups)) == expected
+
+
+def test_orjson_deep_nesting():
+    pytest.importorskip("orjson")
+    from sketchformat.serialize import orjson as orjson_serializer
+
+    # orjson cannot write this many levels, the built-in serializer takes over
+    group = nested_groups(200)
+    out = io.BytesIO()
+    orjson_serializer.serialize(group, out)
+
+    assert out.getvalue() == dumps(group).encode()